@@ -0,0 +1,63 @@
+"""Benchmark: as-you-type suggestions for the cuisine, name and address fields.
+
+Types random cuisines, restaurant names and addresses of the dataset one character at a time and
+times the suggestions for every prefix (prefix_index.PrefixIndex.complete), against the 16.7 ms
+of a frame at 60 Hz; then counts the suggested addresses the gazetteer places (by their street,
+or by their postal code), without network geocoding. For comparison, it also times the cuisine
+list the finder window used to build on every open (computations.get_all_cuisines).
+
+Run with:
+    python bench_autocomplete.py [values per field]
+"""
+import random
+import sys
+import time
+
+import cli
+import computations
+from gazetteer import get_gazetteer
+from prefix_index import get_prefix_indexes
+
+FRAME_MS = 1000 / 60
+
+
+def main(count: int) -> None:
+    """Run the benchmark."""
+    computations.get_restaurant_table()
+    start = time.perf_counter()
+    indexes = get_prefix_indexes()
+    print(f'built the indexes in {(time.perf_counter() - start) * 1000:.0f} ms')
+
+    rng = random.Random(1)
+    for field in ('cuisines', 'names', 'addresses'):
+        index = getattr(indexes, field)
+        timings = []
+        for value in rng.choices(index.values, k=count):
+            for end in range(1, len(value) + 1):
+                start = time.perf_counter()
+                index.complete(value[:end])
+                timings.append((time.perf_counter() - start) * 1000)
+        print(f'{field:9}: {len(timings):6} prefixes, p50 {cli.percentile(timings, 50):.3f} ms, p99 '
+              f'{cli.percentile(timings, 99):.3f} ms, max {max(timings):.3f} ms '
+              f'({sum(t > FRAME_MS for t in timings)} over a frame)')
+
+    gazetteer = get_gazetteer()
+    matches = [gazetteer.lookup(a) for a in indexes.addresses.values]
+    exact = sum(1 for m in matches if m is not None and m.kind == 'address')
+    placed = sum(1 for m in matches if m is not None)
+    print(f'suggested addresses placed by the gazetteer: {placed}/{len(matches)} ({exact} by their street, the '
+          f'rest by postal code or area)')
+
+    start = time.perf_counter()
+    for _ in range(20):
+        ['Any'] + computations.get_all_cuisines()
+    old = (time.perf_counter() - start) / 20 * 1000
+    start = time.perf_counter()
+    for _ in range(20):
+        ['Any'] + indexes.cuisines.most_common()
+    new = (time.perf_counter() - start) / 20 * 1000
+    print(f'cuisine list per window open: get_all_cuisines {old:.3f} ms, prefix index {new:.3f} ms')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
@@ -0,0 +1,86 @@
+"""Benchmark: multi-select price range and cuisine filters on ~1M synthetic rows.
+
+Uses the synthetic dataset of bench_tree.py (every restaurant repeated scale times; 146 times is
+about 1M rows) and times, for a few multi-criteria filters:
+    - the bitmap indexes (OR within a criterion, AND across criteria, then row numbers)
+    - boolean masks built from the code columns with numpy.isin
+    - the decision tree, traversed once per (price range, cuisine) combination and merged
+and checks that they select the same rows.
+
+Run with:
+    python bench_bitmap.py [scale]
+"""
+import sys
+import time
+
+import numpy as np
+
+import computations
+from bench_tree import synthetic_table
+from bitmap_index import BitmapIndex
+
+FILTERS = [(['Under $10', '$11-30'], ['Thai', 'Vietnamese']),
+           (['$11-30'], ['Pizza', 'Italian', 'Burgers', 'Sandwiches']),
+           (None, ['Japanese', 'Korean', 'Chinese']),
+           (['$31-60', 'Above $61'], None)]
+
+
+def best_of(repeat: int, fn: callable) -> tuple[float, object]:
+    """Return the fastest of repeat runs of fn(), in seconds, and its result."""
+    best, result = float('inf'), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main(scale: int) -> None:
+    """Run the benchmark on a dataset scale times the size of trt_rest.csv."""
+    table = synthetic_table(scale)
+    print(f'{len(table):,} rows')
+    start = time.perf_counter()
+    prices = BitmapIndex(table.price_codes, len(table.price_ranges))
+    cuisines = BitmapIndex(table.cuisine_codes, len(table.cuisines))
+    print(f'bitmap build:   {(time.perf_counter() - start) * 1000:8.1f} ms, '
+          f'{(prices.nbytes + cuisines.nbytes) / 2 ** 20:.1f} MB')
+    start = time.perf_counter()
+    tree = computations.Tree('', [])
+    price_names = [table.price_ranges[c] for c in table.price_codes.tolist()]
+    cuisine_names = [table.cuisines[c] for c in table.cuisine_codes.tolist()]
+    for i in range(len(table)):
+        tree.insert_sequence([price_names[i], cuisine_names[i], i])
+    print(f'tree build:     {(time.perf_counter() - start) * 1000:8.1f} ms')
+
+    for price, cuisine in FILTERS:
+        price_codes = None if price is None else [table.price_ranges.index(p) for p in price]
+        cuisine_codes = None if cuisine is None else [table.cuisines.index(c) for c in cuisine]
+        all_prices = table.price_ranges if price is None else price
+        all_cuisines = table.cuisines if cuisine is None else cuisine
+
+        def with_bitmaps() -> np.ndarray:
+            return prices.rows(prices.any_of(price_codes) & cuisines.any_of(cuisine_codes))
+
+        def with_isin() -> np.ndarray:
+            mask = np.ones(len(table), dtype=bool)
+            if price_codes is not None:
+                mask &= np.isin(table.price_codes, price_codes)
+            if cuisine_codes is not None:
+                mask &= np.isin(table.cuisine_codes, cuisine_codes)
+            return np.flatnonzero(mask)
+
+        def with_tree() -> np.ndarray:
+            parts = [np.array(tree.traverse_dec_tree([p, c]), dtype=np.int64)
+                     for p in all_prices for c in all_cuisines]
+            return np.sort(np.concatenate(parts))
+
+        t_bitmap, rows = best_of(5, with_bitmaps)
+        t_isin, expected = best_of(5, with_isin)
+        t_tree, from_tree = best_of(2, with_tree)
+        assert rows.tolist() == expected.tolist() == from_tree.tolist()
+        print(f'{price or "Any"} x {cuisine or "Any"}: {len(rows):,} rows')
+        print(f'  bitmaps {t_bitmap * 1000:7.2f} ms   isin {t_isin * 1000:7.2f} ms   tree {t_tree * 1000:7.2f} ms')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 146)
@@ -0,0 +1,72 @@
+"""Benchmark: the distance engine on 10k, 100k and 1M points around Toronto.
+
+For each size, times:
+    - the previous per-point math.acos loop (10k points only, it takes seconds beyond that)
+    - distances.one_to_many in float64 and float32
+    - distances.many_to_many from 100 origins, chunked, in float64 and float32
+and reports the largest float32 error, and the largest difference between haversine and the
+previous spherical law of cosines.
+
+Run with:
+    python bench_distances.py
+"""
+import math
+import time
+
+import numpy as np
+
+import distances
+
+SIZES = [10_000, 100_000, 1_000_000]
+ORIGINS = 100
+
+
+def acos_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """The previous distance formula (spherical law of cosines)."""
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    return math.acos(min(1.0, math.sin(lat1) * math.sin(lat2) + math.cos(lat1) * math.cos(lat2)
+                         * math.cos(lon2 - lon1))) * 6371
+
+
+def best_of(repeat: int, fn: callable) -> float:
+    """Return the fastest of repeat runs of fn(), in seconds."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main() -> None:
+    """Run the benchmark."""
+    rng = np.random.default_rng(0)
+    user = (43.6532, -79.3832)
+    for n in SIZES:
+        lats = rng.uniform(43.58, 43.85, n)
+        lons = rng.uniform(-79.64, -79.12, n)
+        print(f'{n:>9,} points')
+        exact = distances.one_to_many(*user, lats, lons)
+        if n <= 10_000:
+            loop = best_of(3, lambda: [acos_km(user[0], user[1], lat, lon) for lat, lon in zip(lats, lons)])
+            print(f'  acos loop:                 {loop * 1000:9.2f} ms')
+            old = np.array([acos_km(user[0], user[1], lat, lon) for lat, lon in zip(lats, lons)])
+            print(f'  max |haversine - acos|:    {np.abs(exact - old).max() * 1e6:9.2f} mm')
+        lats32, lons32 = lats.astype(np.float32), lons.astype(np.float32)
+        t64 = best_of(5, lambda: distances.one_to_many(*user, lats, lons))
+        t32 = best_of(5, lambda: distances.one_to_many(*user, lats32, lons32, dtype=np.float32))
+        error = np.abs(distances.one_to_many(*user, lats32, lons32, dtype=np.float32) - exact).max()
+        print(f'  one_to_many float64:       {t64 * 1000:9.2f} ms')
+        print(f'  one_to_many float32:       {t32 * 1000:9.2f} ms   (max error {error * 1e6:.1f} mm)')
+
+        origin_lats, origin_lons = lats[:ORIGINS], lons[:ORIGINS]
+        for dtype in (np.float64, np.float32):
+            def reduce_nearest() -> None:
+                for _, block in distances.iter_many_to_many(origin_lats, origin_lons, lats, lons, dtype=dtype):
+                    block.min(axis=1)
+            t = best_of(2, reduce_nearest)
+            print(f'  {ORIGINS} x {n:,} chunked {dtype.__name__}: {t * 1000:9.2f} ms')
+
+
+if __name__ == '__main__':
+    main()
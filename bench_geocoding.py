@@ -0,0 +1,83 @@
+"""Benchmark: geocoding lookups through the geocoding service.
+
+Uses a stand-in geocoder with a fixed network latency (so it runs offline) and reports:
+    - a cold lookup (one network round trip)
+    - the same address spelled differently (answered from the cache)
+    - eight identical lookups started at once (merged into one network request)
+    - the per-source latency the service recorded
+    - lookups of addresses the offline gazetteer can place, through computations.get_coords
+
+Run with:
+    python bench_geocoding.py [latency in seconds]
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+
+import computations
+import geocoding
+
+
+class _Location:
+    """What a geopy geocoder returns: the raw Nominatim result."""
+
+    def __init__(self, lat: float, lon: float) -> None:
+        self.raw = {'lat': str(lat), 'lon': str(lon)}
+
+
+class SlowGeocoder:
+    """A stand-in for Nominatim that answers every address after latency seconds."""
+
+    def __init__(self, latency: float) -> None:
+        self.latency = latency
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def geocode(self, address: str) -> _Location:
+        """Return a made-up location for address."""
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.latency)
+        return _Location(43.65 + len(address) / 10000, -79.38)
+
+
+def run_benchmark(latency: float = 0.3) -> None:
+    """Print the cost of each kind of lookup."""
+    with tempfile.TemporaryDirectory() as tmp:
+        geocoder = SlowGeocoder(latency)
+        service = geocoding.GeocodingService(os.path.join(tmp, 'geocode.sqlite3'), geocoder=geocoder)
+        geocoding.set_geocoding_service(service)
+
+        for address in ['100 Queen Street West, Toronto, Ontario', '100 queen st w toronto on']:
+            start = time.perf_counter()
+            service.geocode(address)
+            print(f'{address!r:45}: {(time.perf_counter() - start) * 1000:7.1f} ms')
+
+        threads = [threading.Thread(target=service.geocode, args=('40 St George St, Toronto',)) for _ in range(8)]
+        start = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        print(f'8 identical lookups at once: {(time.perf_counter() - start) * 1000:7.1f} ms')
+        print(f'network requests made: {geocoder.calls}')
+        for source, stats in service.stats().items():
+            print(f"  {source:8}: {stats['count']:3} lookups, mean {stats['mean_ms']:8.2f} ms")
+
+        computations.get_coords('691 Yonge Street, Toronto, Ontario')  # build the gazetteer
+        calls = geocoder.calls
+        queries = ['691 Yonge Street, Toronto, Ontario', '691 Yong St', '1 Unknown Rd, Toronto, ON M5R 1A9',
+                   'Yorkdale Shopping Centre']
+        start = time.perf_counter()
+        for query in queries:
+            computations.get_coords(query)
+        elapsed = (time.perf_counter() - start) / len(queries)
+        print(f'gazetteer lookups: {elapsed * 1000:7.3f} ms each, {geocoder.calls - calls} network requests')
+        geocoding.set_geocoding_service(None)
+        service.close()
+
+
+if __name__ == '__main__':
+    run_benchmark(float(sys.argv[1]) if len(sys.argv) > 1 else 0.3)
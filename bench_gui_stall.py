@@ -0,0 +1,102 @@
+"""Benchmark: how long a search stalls the Tk event loop, on the Tk thread vs on the search worker.
+
+Runs a real Tcl event loop (tkinter.Tcl(), so no display is needed) with a StallMonitor ticking
+every 20 ms, and starts the same search from an after() callback, the way a button command
+would:
+    - before: geocoding and computations.search_restaurants called directly in the callback
+    - after: the search submitted to search_worker.SearchWorker, its events polled with after()
+
+The address is not in the dataset, so it goes to a stand-in geocoder with a fixed latency, and
+the search asks for a star rating, so every candidate's page is fetched from a local fake Yelp
+(fake_yelp.FakeYelpServer) with a fixed latency. Caches start empty for both runs.
+
+Run with:
+    python bench_gui_stall.py [geocoder latency] [Yelp latency]
+"""
+import sys
+import time
+import tkinter as tk
+
+import computations
+import geocoding
+import rating_cache
+import result_cache
+from bench_geocoding import SlowGeocoder
+from fake_yelp import FakeYelpServer
+from restaurant_table import StringColumn
+from search_worker import SearchWorker
+from stall_monitor import StallMonitor
+
+ADDRESS = '1 Nowhere Lane, Toronto'
+ANSWERS = {'cuisine': 'Pizza', 'price': '$11-30', 'distance': 'Above 5 km', 'star': '3 stars'}
+
+
+def fresh_caches(geocoder_latency: float) -> None:
+    """Replace the geocoding, rating and search caches with empty, in-memory ones."""
+    geocoding.set_geocoding_service(geocoding.GeocodingService(':memory:', geocoder=SlowGeocoder(geocoder_latency)))
+    rating_cache.set_rating_cache(rating_cache.RatingCache(':memory:'))
+    result_cache.set_search_cache(None)
+
+
+def run_loop(interp: tk.Tcl, monitor: StallMonitor, start: callable) -> tuple[float, int]:
+    """Run interp's event loop, with start scheduled first, until start's search is done.
+    Return the seconds until then and the number of results.
+    """
+    state = {'results': None}
+    monitor.reset()
+    monitor.start()
+    began = time.perf_counter()
+    interp.after(30, lambda: start(state))
+    while state['results'] is None:
+        interp.tk.dooneevent()
+    elapsed = time.perf_counter() - began
+    # let the tick that was due during the last callback run, so its lateness is counted
+    settled = []
+    interp.after(2 * monitor.interval_ms, lambda: settled.append(True))
+    while not settled:
+        interp.tk.dooneevent()
+    monitor.stop()
+    return elapsed, state['results']
+
+
+def main(geocoder_latency: float, yelp_latency: float) -> None:
+    """Run the benchmark."""
+    table = computations.get_restaurant_table()
+    ratings = {f'biz-{i}': 1 + (i % 9) / 2 for i in range(len(table))}
+    with FakeYelpServer(ratings, latency=yelp_latency, filler_bytes=2000) as server:
+        table.yelp_urls = StringColumn.from_values(server.url(f'biz-{i}') for i in range(len(table)))
+        interp = tk.Tcl()
+        monitor = StallMonitor(interp, interval_ms=20)
+
+        def on_tk_thread(state: dict) -> None:
+            user = computations.User()
+            computations.get_user_info(user, location=ADDRESS, **ANSWERS)
+            results = computations.search_restaurants(user)
+            results.page(0)
+            state['results'] = len(results)
+
+        worker = SearchWorker()
+
+        def on_worker(state: dict) -> None:
+            worker.submit(ADDRESS, **ANSWERS)
+
+            def poll() -> None:
+                def handle(event: object) -> None:
+                    if event.kind == 'done':
+                        state['results'] = len(event.payload[1])
+                worker.poll(handle)
+                if worker.busy():
+                    interp.after(50, poll)
+            interp.after(50, poll)
+
+        for name, start in [('on the Tk thread', on_tk_thread), ('on the search worker', on_worker)]:
+            fresh_caches(geocoder_latency)
+            elapsed, found = run_loop(interp, monitor, start)
+            summary = monitor.summary()
+            print(f'{name:21}: {found} results in {elapsed:5.2f} s; event loop stalled {summary["stalls"]} times, '
+                  f'longest {summary["max_ms"]:7.1f} ms, total {summary["total_ms"]:7.1f} ms')
+        worker.close()
+
+
+if __name__ == '__main__':
+    main(float(sys.argv[1]) if len(sys.argv) > 1 else 0.5, float(sys.argv[2]) if len(sys.argv) > 2 else 0.1)
@@ -0,0 +1,67 @@
+"""Benchmark: memory per restaurant and time to materialise a result set.
+
+Compares one computations.Restaurant object per row (the previous load_data) with the
+RestaurantTable column store and its RestaurantRow views.
+
+Run with:
+    python bench_memory.py
+"""
+import time
+import tracemalloc
+
+import computations
+from restaurant_table import RestaurantTable
+
+
+def load_data_objects(user: computations.User) -> list:
+    """The previous computations.load_data: one Restaurant object per row."""
+    data = computations.get_data()
+    lats = data['Restaurant Latitude'].to_numpy(dtype=float)
+    longs = data['Restaurant Longitude'].to_numpy(dtype=float)
+    distances, buckets = computations.get_distances_from_user(lats, longs, (user.latitude, user.longitude))
+    columns = zip(data['Restaurant Name'].tolist(), data['Category'].tolist(), data['Restaurant Address'].tolist(),
+                  data['Restaurant Phone'].tolist(), data['Restaurant Price Range'].tolist(),
+                  data['Restaurant Website'].tolist(), lats.tolist(), longs.tolist(), distances.tolist(),
+                  buckets.tolist())
+    return [computations.Restaurant(name=name, coordinates=(lat, long), cuisine=cuisine, contact=(phone, web),
+                                    price_range=pr, address=address, star_rating=0.0,
+                                    distance=(computations.DISTANCE_BUCKETS[b], round(dis, 4)))
+            for name, cuisine, address, phone, pr, web, lat, long, dis, b in columns]
+
+
+def _measure(func) -> tuple[object, int, float]:
+    """Return (result, bytes allocated and still alive, seconds) for func()."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current, elapsed
+
+
+def run_benchmark() -> None:
+    """Print memory per restaurant and materialisation time, before and after."""
+    data = computations.get_data()
+    user = computations.User()
+    user.latitude, user.longitude = 43.6532, -79.3832
+    n = len(data)
+
+    # The csv strings are shared with the DataFrame in the old layout, so count only what the
+    # objects add on top of it.
+    objects, obj_bytes, obj_time = _measure(lambda: load_data_objects(user))
+    del objects
+    table, table_bytes, table_time = _measure(lambda: RestaurantTable.from_frame(data))
+    computations.get_restaurant_table()
+    rows, row_bytes, row_time = _measure(lambda: computations.load_data(user))
+
+    print(f'{n} restaurants')
+    print(f'Restaurant objects:      {obj_bytes / n:7.0f} B/restaurant per search, {obj_time * 1000:7.1f} ms')
+    print(f'RestaurantRow views:     {row_bytes / n:7.0f} B/restaurant per search, {row_time * 1000:7.1f} ms')
+    print(f'RestaurantTable (once):  {table.nbytes() / n:7.0f} B/restaurant (column data), '
+          f'{table_bytes / n:.0f} B/restaurant allocated, built in {table_time * 1000:.1f} ms')
+    del rows
+
+
+if __name__ == '__main__':
+    run_benchmark()
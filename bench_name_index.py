@@ -0,0 +1,61 @@
+"""Benchmark: looking restaurants up by a misspelt name, trigram index vs comparing every name.
+
+Takes random restaurant names, misspells each (one character dropped, doubled or swapped with the
+next one), and looks them up:
+    - with difflib.get_close_matches over every distinct name (what the gazetteer does for streets)
+    - with name_index.TrigramIndex
+reporting the time per lookup and how often the right name comes first.
+
+Run with:
+    python bench_name_index.py [lookups]
+"""
+import difflib
+import random
+import sys
+import time
+
+import computations
+from name_index import TrigramIndex, normalize_name
+
+
+def misspell(name: str, rng: random.Random) -> str:
+    """Return name with one typo."""
+    if len(name) < 4:
+        return name
+    i = rng.randrange(1, len(name) - 1)
+    kind = rng.choice(['drop', 'double', 'swap'])
+    if kind == 'drop':
+        return name[:i] + name[i + 1:]
+    if kind == 'double':
+        return name[:i] + name[i] + name[i:]
+    return name[:i] + name[i + 1] + name[i] + name[i + 2:]
+
+
+def main(lookups: int) -> None:
+    """Run the benchmark."""
+    table = computations.get_restaurant_table()
+    names = [table.names[i] for i in range(len(table))]
+
+    start = time.perf_counter()
+    index = TrigramIndex(names)
+    print(f'built the index of {len(index)} distinct names in {(time.perf_counter() - start) * 1000:.0f} ms')
+
+    rng = random.Random(1)
+    wanted = [rng.choice(index.normalised) for _ in range(lookups)]
+    queries = [misspell(name, rng) for name in wanted]
+
+    start = time.perf_counter()
+    found = [difflib.get_close_matches(normalize_name(q), index.normalised, n=1, cutoff=0.0) for q in queries]
+    elapsed = time.perf_counter() - start
+    right = sum(bool(f) and f[0] == w for f, w in zip(found, wanted))
+    print(f'difflib, every name: {elapsed / lookups * 1000:8.3f} ms per lookup, right name first {right}/{lookups}')
+
+    start = time.perf_counter()
+    found = [index.search(q, limit=1) for q in queries]
+    elapsed = time.perf_counter() - start
+    right = sum(bool(f) and normalize_name(f[0].value) == w for f, w in zip(found, wanted))
+    print(f'trigram index:       {elapsed / lookups * 1000:8.3f} ms per lookup, right name first {right}/{lookups}')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500)
@@ -0,0 +1,63 @@
+"""Benchmark: ranking the matches of a dense search, first page vs sorting everything.
+
+Uses the synthetic dataset of bench_tree.py (every restaurant repeated scale times) and a search
+matching every restaurant under 'Above 5 km', then times:
+    - scoring the matches and sorting all of them (np.lexsort)
+    - scoring them and selecting the first page with ranking.top_k (argpartition)
+    - paging through the first 10 pages of a RankedResults
+    - the first page (as the results table shows it) after ordering by each column
+
+Run with:
+    python bench_ranking.py [scale]
+"""
+import sys
+import time
+
+import numpy as np
+
+import ranking
+from bench_tree import synthetic_table
+
+
+def main(scale: int) -> None:
+    """Run the benchmark on a dataset scale times the size of trt_rest.csv."""
+    table = synthetic_table(scale)
+    rng = np.random.default_rng(1)
+    rated = rng.random(len(table)) < 0.3
+    table.star_ratings[rated] = rng.integers(2, 11, int(rated.sum())) / 2
+    rows = np.arange(len(table))
+    distances = rng.uniform(5, 30, len(table))
+    print(f'{len(table):,} matches')
+
+    start = time.perf_counter()
+    results = ranking.RankedResults(table, rows, distances, '$11-30')
+    scoring = time.perf_counter() - start
+    print(f'scoring:                   {scoring * 1000:8.2f} ms')
+
+    start = time.perf_counter()
+    full = np.lexsort((rows, -results.scores))
+    sort_all = time.perf_counter() - start
+    start = time.perf_counter()
+    first = ranking.top_k(results.scores, ranking.PAGE_SIZE, rows)
+    top_page = time.perf_counter() - start
+    assert first.tolist() == full[:ranking.PAGE_SIZE].tolist()
+    print(f'sort every match:          {sort_all * 1000:8.2f} ms')
+    print(f'top_k first page:          {top_page * 1000:8.2f} ms  ({sort_all / top_page:.0f}x faster)')
+
+    start = time.perf_counter()
+    pages = [results.page(i) for i in range(10)]
+    paging = time.perf_counter() - start
+    assert [r[1] for page in pages for r in page] == full[:10 * ranking.PAGE_SIZE].tolist()
+    print(f'first 10 pages (as rows):  {paging * 1000:8.2f} ms')
+
+    for column in ranking.SORT_COLUMNS:
+        for descending in (True, False):
+            start = time.perf_counter()
+            results.order_by(column, descending)
+            results.top(50)
+            elapsed = time.perf_counter() - start
+            print(f'first 50 by {column:8} {"desc" if descending else "asc ":4}: {elapsed * 1000:8.2f} ms')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100)
@@ -0,0 +1,51 @@
+"""Benchmark: star-rating lookups with the persistent rating cache, against a local fake Yelp.
+
+Runs the same batch of lookups twice through computations.get_star_ratings: the first pass
+misses the cache and fetches every page from fake_yelp.FakeYelpServer, the second is answered
+from the cache. Also checks negative caching (pages with no rating) and eviction.
+
+Run with:
+    python bench_rating_cache.py [pages] [latency in seconds]
+"""
+import os
+import sys
+import tempfile
+import time
+
+import computations
+import rating_cache
+from fake_yelp import FakeYelpServer
+
+
+def run_benchmark(pages: int = 40, latency: float = 0.02) -> None:
+    """Print the time of a cold and a warm pass over pages lookups, and the cache counters."""
+    ratings = {f'biz-{i}': (None if i % 5 == 0 else round(1 + (i % 9) / 2, 1)) for i in range(pages)}
+    with tempfile.TemporaryDirectory() as tmp, FakeYelpServer(ratings, latency=latency) as server:
+        cache = rating_cache.RatingCache(os.path.join(tmp, 'ratings.sqlite3'))
+        rating_cache.set_rating_cache(cache)
+        urls = [server.url(slug) for slug in ratings]
+
+        start = time.perf_counter()
+        cold = computations.get_star_ratings(urls)
+        cold_time = time.perf_counter() - start
+        cold_requests = server.requests
+        start = time.perf_counter()
+        warm = computations.get_star_ratings(urls)
+        warm_time = time.perf_counter() - start
+
+        print(f'{pages} pages, {latency * 1000:.0f} ms server latency')
+        print(f'cold pass: {cold_time * 1000:8.1f} ms, {cold_requests} requests')
+        print(f'warm pass: {warm_time * 1000:8.1f} ms, {server.requests - cold_requests} requests')
+        print(f'same ratings: {cold == warm}, correct: {cold == list(ratings.values())}')
+        print(f'counters: {cache.stats()}')
+
+        small = rating_cache.RatingCache(':memory:', max_entries=pages // 2)
+        small.put_many([(url, 1.0) for url in urls])
+        print(f'bounded to {small.max_entries} entries: {len(small)} kept, {small.evictions} evicted')
+        rating_cache.set_rating_cache(None)
+        cache.close()
+
+
+if __name__ == '__main__':
+    run_benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 40,
+                  float(sys.argv[2]) if len(sys.argv) > 2 else 0.02)
@@ -0,0 +1,70 @@
+"""Benchmark: finding the star rating in large Yelp pages.
+
+Compares the previous extractor (count 'label=', then index() and slice the rest of the page on
+every miss) with rating_extractor's streaming scanner, on fake pages (fake_yelp.make_page) with
+many aria-labels before the rating. Also checks the two agree on a set of generated pages fed to
+the scanner in chunks of every size, so ratings split across chunk boundaries are covered.
+
+Run with:
+    python bench_rating_extract.py
+"""
+import random
+import time
+from typing import Optional
+
+from fake_yelp import make_page
+from rating_extractor import scan_star_rating
+
+
+def extract_star_rating_slicing(t: str) -> Optional[float]:
+    """The previous get_star_rating scan, kept as the baseline."""
+    num = t.count('label=')
+    while num > 0:
+        i = t.index('label=')
+        if t[i + 7] in '1234567890':
+            if t[i + 8] == '.':
+                return float(t[i + 7:i + 10])
+            else:
+                return float(t[i + 7])
+        else:
+            num -= 1
+            t = t[i + 1:]
+    return None
+
+
+def _chunks(page: str, size: int) -> list[str]:
+    """Return page split into chunks of the given size."""
+    return [page[i:i + size] for i in range(0, len(page), size)]
+
+
+def check_agreement(pages: int = 200, seed: int = 0) -> int:
+    """Return the number of (page, chunk size) pairs where the two extractors disagree."""
+    rng = random.Random(seed)
+    mismatches = 0
+    for _ in range(pages):
+        rating = rng.choice([None, 1.0, 2.5, 3, 4.5, 5.0])
+        page = make_page(rating, rng.randrange(0, 600))
+        expected = extract_star_rating_slicing(page)
+        for size in [1, 2, 3, 5, 7, 11, 64, len(page)]:
+            mismatches += scan_star_rating(_chunks(page, size)) != expected
+    return mismatches
+
+
+def run_benchmark() -> None:
+    """Print the agreement check and the time taken on large pages."""
+    print(f'disagreements on generated pages (all chunk sizes): {check_agreement()}')
+    for size in [100_000, 1_000_000, 4_000_000]:
+        for rating in [4.5, None]:
+            page = make_page(rating, size // 2)
+            start = time.perf_counter()
+            old = extract_star_rating_slicing(page)
+            old_time = time.perf_counter() - start
+            start = time.perf_counter()
+            new = scan_star_rating(_chunks(page, 16384))
+            new_time = time.perf_counter() - start
+            print(f'{len(page) / 1e6:5.1f} MB page, rating {str(rating):4}: slicing {old_time * 1000:9.1f} ms, '
+                  f'streaming {new_time * 1000:7.2f} ms ({old_time / new_time:6.0f}x), same: {old == new}')
+
+
+if __name__ == '__main__':
+    run_benchmark()
@@ -0,0 +1,47 @@
+"""Benchmark: rating every candidate of a search, one by one vs. with the concurrent fetcher.
+
+Serves pages from a local fake Yelp (fake_yelp.FakeYelpServer) with a configurable latency and
+rates the same candidates with a loop over computations.get_star_rating (what load_stars used
+to do) and with rating_fetcher.RatingFetcher. The rating cache is not involved.
+
+Run with:
+    python bench_rating_fetch.py [candidates] [latency in seconds] [budget in seconds]
+"""
+import sys
+import time
+
+import computations
+from fake_yelp import FakeYelpServer
+from rating_fetcher import RatingFetcher
+
+
+def run_benchmark(candidates: int = 120, latency: float = 0.1, budget: float = 8.0) -> None:
+    """Print the time taken to rate every candidate each way."""
+    ratings = {f'biz-{i}': (None if i % 7 == 0 else round(1 + (i % 9) / 2, 1)) for i in range(candidates)}
+    with FakeYelpServer(ratings, latency=latency) as server:
+        urls = [server.url(slug) for slug in ratings]
+        print(f'{candidates} candidates, {latency * 1000:.0f} ms server latency, {budget:.1f} s budget')
+
+        sequential_n = min(candidates, 15)
+        start = time.perf_counter()
+        sequential = [computations.get_star_rating(url) for url in urls[:sequential_n]]
+        sequential_time = (time.perf_counter() - start) / sequential_n * candidates
+        print(f'one by one:  {sequential_time:7.2f} s for all candidates '
+              f'(extrapolated from {sequential_n}; the old code stopped at 15)')
+
+        for workers, per_host in [(8, 8), (16, 8), (32, 16)]:
+            fetcher = RatingFetcher(max_workers=workers, per_host=per_host)
+            start = time.perf_counter()
+            fetched = fetcher.fetch_many(urls, budget=budget)
+            elapsed = time.perf_counter() - start
+            correct = all(fetched[url] == ratings[slug] for url, slug in zip(urls, ratings) if url in fetched)
+            print(f'concurrent ({workers} workers, {per_host} per host): {elapsed:7.2f} s, '
+                  f'{len(fetched)}/{candidates} rated, correct: {correct}, '
+                  f'same as one by one: {[fetched.get(u, r) for u, r in zip(urls, sequential)] == sequential}')
+            fetcher.close()
+
+
+if __name__ == '__main__':
+    run_benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 120,
+                  float(sys.argv[2]) if len(sys.argv) > 2 else 0.1,
+                  float(sys.argv[3]) if len(sys.argv) > 3 else 8.0)
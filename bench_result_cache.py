@@ -0,0 +1,54 @@
+"""Benchmark: the search result cache on a workload of repeated and tweaked searches.
+
+Simulates users at the addresses of bench_search.py, each repeating searches a few times and
+moving a few metres between them (so they stay in, or just cross, their geohash cell), and
+reports the time per uncached and per cached search, the hit ratio and the evictions. Every
+cached result is checked against an uncached SearchEngine.ranked.
+
+These searches ask for any star rating; for searches filtering on stars a miss also looks up (and
+possibly fetches) the star rating of every match, which a hit skips entirely.
+
+Run with:
+    python bench_result_cache.py
+"""
+import time
+
+import numpy as np
+
+import computations
+import engine
+from bench_search import QUERIES, USER_LOCATIONS
+from result_cache import SearchCache, set_search_cache
+
+
+def main() -> None:
+    """Run the benchmark."""
+    eng = engine.get_engine()
+    cache = SearchCache(max_entries=32)
+    set_search_cache(cache)
+    rng = np.random.default_rng(0)
+    user = computations.User()
+    times = {'hit': [], 'miss': []}
+    mismatches = 0
+    for _ in range(2000):
+        lat, lon = USER_LOCATIONS[rng.integers(len(USER_LOCATIONS))]
+        user.latitude = lat + rng.normal(0, 0.0003)
+        user.longitude = lon + rng.normal(0, 0.0003)
+        user.questions = list(QUERIES[rng.integers(len(QUERIES))])
+        hits = cache.hits
+        start = time.perf_counter()
+        results = computations.search_restaurants(user)
+        results.page(0)
+        times['hit' if cache.hits > hits else 'miss'].append(time.perf_counter() - start)
+        expected = eng.ranked(user.latitude, user.longitude, user.questions).rows.tolist()
+        mismatches += sorted(results.rows.tolist()) != expected
+    for kind, samples in times.items():
+        print(f'{kind}: {len(samples):5} searches, {np.median(samples) * 1000:.3f} ms median '
+              f'(p99 {np.percentile(samples, 99) * 1000:.3f} ms)')
+    print(cache.stats())
+    print(f'{mismatches} mismatches against SearchEngine.ranked')
+    set_search_cache(None)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+"""Benchmark: the per-search cost of the restaurant finder.
+
+Compares the original row-by-row loader (DATA.iloc[i] plus one scalar distance per row) with
+the vectorized loader, and the per-search rebuild of the decision tree with the query engine
+(engine.py), checking each pair returns the same restaurants.
+
+Run with:
+    python bench_search.py [repeats]
+"""
+import sys
+import time
+
+import computations
+import engine
+
+# A few user locations spread around the city, so every distance bucket gets exercised
+USER_LOCATIONS = [(43.6532, -79.3832), (43.7615, -79.4111), (43.6426, -79.3871), (43.7764, -79.2318)]
+
+QUERIES = [['$11-30', 'Pizza', '1-5 km', 'Any'], ['Under $10', 'Sandwiches', 'Above 5 km', 'Any'],
+           ['$11-30', 'Thai', 'Under 1 km', 'Any'], ['$31-60', 'Japanese', '1-5 km', 'Any']]
+
+
+def load_data_iloc(user: computations.User) -> list:
+    """The original implementation of computations.load_data, kept as the baseline."""
+    data = computations.get_data()
+    lst = []
+    for i in range(len(data)):
+        rest = data.iloc[i]
+        lat = rest['Restaurant Latitude']
+        long = rest['Restaurant Longitude']
+        dis = computations.get_distance_from_user(lat, long, (user.latitude, user.longitude))
+        lst.append(computations.Restaurant(name=rest['Restaurant Name'], coordinates=(float(lat), float(long)),
+                                           cuisine=rest.Category,
+                                           contact=(rest['Restaurant Phone'], rest['Restaurant Website']),
+                                           price_range=rest['Restaurant Price Range'],
+                                           address=rest['Restaurant Address'], star_rating=0.0, distance=dis))
+    return lst
+
+
+def _as_tuple(r: computations.Restaurant) -> tuple:
+    """Return the comparable contents of a restaurant."""
+    return (r.name, r.cuisine, r.price_range, r.address, r.star_rating, r.contact, r.coordinates, r.distance)
+
+
+def rebuild_search(user: computations.User) -> list:
+    """The original search: load every row and rebuild the whole decision tree."""
+    tree = computations.build_tree_w_rests(computations.load_data(user))
+    return tree.traverse_dec_tree(user.questions)
+
+
+def engine_search(search_engine: engine.SearchEngine, lat: float, lon: float, questions: list[str]) -> list:
+    """Return the restaurants SearchEngine.ranked finds, as (restaurant, row number) pairs in dataset order."""
+    results = search_engine.ranked(lat, lon, questions)
+    buckets = computations.get_distance_buckets(results.distances)
+    return [(r, r.row_id) for r in search_engine.table.rows(results.rows, results.distances, buckets)]
+
+
+def _make_user(lat: float, lon: float) -> computations.User:
+    """Return a user standing at (lat, lon)."""
+    user = computations.User()
+    user.latitude, user.longitude = lat, lon
+    return user
+
+
+def _time(func, repeats: int) -> float:
+    """Return the mean wall-clock time of func() in seconds."""
+    start = time.perf_counter()
+    for _ in range(repeats):
+        func()
+    return (time.perf_counter() - start) / repeats
+
+
+def run_benchmark(repeats: int = 3) -> None:
+    """Check equivalence, then print the per-search time of both loaders."""
+    computations.get_data()
+    for lat, lon in USER_LOCATIONS:
+        user = _make_user(lat, lon)
+        old = [_as_tuple(r) for r in load_data_iloc(user)]
+        new = [_as_tuple(r) for r in computations.load_data(user)]
+        mismatches = sum(a != b for a, b in zip(old, new)) + abs(len(old) - len(new))
+        print(f'user at ({lat}, {lon}): {len(new)} restaurants, {mismatches} mismatches')
+
+    user = _make_user(*USER_LOCATIONS[0])
+    old_time = _time(lambda: load_data_iloc(user), repeats)
+    new_time = _time(lambda: computations.load_data(user), repeats * 10)
+    print(f'row-by-row load_data:  {old_time * 1000:8.1f} ms per search')
+    print(f'vectorized load_data:  {new_time * 1000:8.1f} ms per search  ({old_time / new_time:.0f}x faster)')
+
+    build_start = time.perf_counter()
+    search_engine = engine.get_engine()
+    build_time = time.perf_counter() - build_start
+    mismatches = 0
+    for lat, lon in USER_LOCATIONS:
+        for questions in QUERIES:
+            user = _make_user(lat, lon)
+            user.questions = questions
+            old = [(_as_tuple(r), i) for r, i in rebuild_search(user)]
+            new = [(_as_tuple(r), i) for r, i in engine_search(search_engine, lat, lon, questions)]
+            mismatches += old != new
+    print(f'engine vs rebuild: {len(USER_LOCATIONS) * len(QUERIES)} searches, {mismatches} mismatches')
+
+    user = _make_user(*USER_LOCATIONS[0])
+    user.questions = QUERIES[0]
+    rebuild_time = _time(lambda: rebuild_search(user), repeats)
+    engine_time = _time(lambda: search_engine.ranked(user.latitude, user.longitude, user.questions), repeats * 100)
+    print(f'rebuild tree per search: {rebuild_time * 1000:8.2f} ms per search')
+    print(f'query engine:            {engine_time * 1000:8.2f} ms per search  ({rebuild_time / engine_time:.0f}x '
+          f'faster, one-off build {build_time * 1000:.0f} ms)')
+
+
+if __name__ == '__main__':
+    run_benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 3)
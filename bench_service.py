@@ -0,0 +1,103 @@
+"""Load test of the HTTP service (service.py): latency percentiles and throughput.
+
+Starts the service on a free local port, once with one worker process and once with several,
+and sends it requests from client threads, each over its own kept-alive connection:
+    - searches around random points near restaurants of the dataset (by latitude and longitude,
+      so no geocoding), with random cuisine, price and distance criteria
+    - every tenth request asks for the details of a random restaurant instead
+
+Run with:
+    python bench_service.py [workers] [requests] [clients]
+"""
+import http.client
+import json
+import random
+import subprocess
+import sys
+import threading
+import time
+
+import cli
+import computations
+
+CUISINES = ['Any', 'Pizza', 'Chinese', 'Japanese,Sushi', 'Italian,Pizza', 'Burgers']
+PRICES = ['Any', '$11-30', 'Under $10,$11-30', '$31-60']
+
+
+def paths(count: int, seed: int) -> list[str]:
+    """Return the paths of count random requests."""
+    from urllib.parse import urlencode
+
+    table = computations.get_restaurant_table()
+    rng = random.Random(seed)
+    result = []
+    for _ in range(count):
+        row = rng.randrange(len(table))
+        latitude = float(table.latitudes[row]) + rng.uniform(-0.01, 0.01)
+        longitude = float(table.longitudes[row]) + rng.uniform(-0.01, 0.01)
+        if rng.random() < 0.1:
+            result.append('/details?' + urlencode({'row': row, 'latitude': latitude, 'longitude': longitude}))
+        else:
+            result.append('/search?' + urlencode({
+                'latitude': latitude, 'longitude': longitude, 'cuisine': rng.choice(CUISINES),
+                'price': rng.choice(PRICES), 'distance': rng.choice(computations.DISTANCE_BUCKETS), 'limit': 10}))
+    return result
+
+
+def client(port: int, requests: list[str], latencies: list[float], failures: list[str]) -> None:
+    """Send the requests one after the other over one connection, recording their latencies."""
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    for path in requests:
+        start = time.perf_counter()
+        connection.request('GET', path)
+        response = connection.getresponse()
+        body = response.read()
+        latencies.append((time.perf_counter() - start) * 1000)
+        if response.status != 200 or (path.startswith('/search') and json.loads(body)['status'] != 'ok'):
+            failures.append(path)
+    connection.close()
+
+
+def load_test(workers: int, requests: list[str], clients: int) -> None:
+    """Start the service with the given number of workers, and report how it handles requests."""
+    service = subprocess.Popen([sys.executable, 'service.py', '--port', '0', '--workers', str(workers)],
+                               stdout=subprocess.PIPE, text=True)
+    try:
+        line = service.stdout.readline()
+        port = int(line.split(':')[2].split()[0])
+        # warm every worker up (the first search of a process imports what it needs)
+        warm = [[], []]
+        threads = [threading.Thread(target=client, args=(port, requests[:2 * workers], *warm)) for _ in range(clients)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        latencies, failures = [], []
+        shares = [requests[i::clients] for i in range(clients)]
+        threads = [threading.Thread(target=client, args=(port, share, latencies, failures)) for share in shares]
+        start = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - start
+        print(f'{workers} worker(s), {clients} clients: {len(latencies)} requests in {elapsed:.2f} s '
+              f'({len(latencies) / elapsed:7.1f} requests/s), p50 {cli.percentile(latencies, 50):6.2f} ms, '
+              f'p99 {cli.percentile(latencies, 99):7.2f} ms, {len(failures)} failed')
+    finally:
+        service.terminate()
+        service.wait()
+
+
+def main(workers: int, count: int, clients: int) -> None:
+    """Run the load test with one worker, then with the given number of workers."""
+    requests = paths(count, seed=1)
+    for n in sorted({1, workers}):
+        load_test(n, requests, clients)
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 4,
+         int(sys.argv[2]) if len(sys.argv) > 2 else 4000,
+         int(sys.argv[3]) if len(sys.argv) > 3 else 16)
@@ -0,0 +1,55 @@
+"""Benchmark: time to get the cleaned dataset at startup, csv path vs. snapshot path.
+
+Run with:
+    python bench_startup.py [repeats]
+"""
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+import snapshot
+
+
+def _best_of(repeats: int, func) -> float:
+    """Return the fastest wall-clock time of func() over repeats runs, in seconds."""
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run_benchmark(csv_path: str = 'trt_rest.csv', repeats: int = 5) -> None:
+    """Print the startup cost of each path of loading the dataset."""
+    with tempfile.TemporaryDirectory() as tmp:
+        snap = os.path.join(tmp, 'bench.snap')
+
+        csv_time = _best_of(repeats, lambda: snapshot.clean_data(pd.read_csv(csv_path)))
+
+        def cold() -> None:
+            if os.path.exists(snap):
+                os.remove(snap)
+            snapshot.load_clean_data(csv_path, snap)
+
+        cold_time = _best_of(repeats, cold)
+        snapshot.load_clean_data(csv_path, snap)
+        warm_time = _best_of(repeats, lambda: snapshot.load_clean_data(csv_path, snap))
+        digest = snapshot.file_digest(csv_path)
+        read_time = _best_of(repeats, lambda: snapshot.read_snapshot(snap, digest))
+        hash_time = _best_of(repeats, lambda: snapshot.file_digest(csv_path))
+
+        print(f'csv file:                {os.path.getsize(csv_path) / 1e6:.2f} MB')
+        print(f'snapshot file:           {os.path.getsize(snap) / 1e6:.2f} MB')
+        print(f'csv parse + clean:       {csv_time * 1000:8.1f} ms')
+        print(f'cold start (+ rebuild):  {cold_time * 1000:8.1f} ms')
+        print(f'warm start (snapshot):   {warm_time * 1000:8.1f} ms  ({csv_time / warm_time:.1f}x faster)')
+        print(f'  of which csv hashing:  {hash_time * 1000:8.1f} ms')
+        print(f'  of which decoding:     {read_time * 1000:8.1f} ms')
+
+
+if __name__ == '__main__':
+    run_benchmark(repeats=int(sys.argv[1]) if len(sys.argv) > 1 else 5)
@@ -0,0 +1,93 @@
+"""Benchmark: building the decision tree over a 10x synthetic dataset.
+
+The synthetic dataset repeats every restaurant of trt_rest.csv ten times, each copy moved by up
+to ~500 m, so every (price range, cuisine, distance) leaf is ten times larger than in the real
+data. The tree is built with build_tree_w_rests, once with the dict-indexed Tree and once with
+the previous Tree.insert_sequence (linear child scan, recursion on items[1:]).
+
+Run with:
+    python bench_tree.py [scale]
+"""
+import sys
+import time
+
+import numpy as np
+
+import computations
+from restaurant_table import RestaurantTable, StringColumn
+
+
+class LinearTree(computations.Tree):
+    """computations.Tree with the previous insert_sequence and traverse_dec_tree."""
+
+    def insert_sequence(self, items: list) -> None:
+        """Insert items, scanning the subtrees linearly at every level."""
+        if not items:
+            return
+        existing_subtree = None
+        for tree in self._subtrees:
+            if tree._root == items[0]:
+                existing_subtree = tree
+                break
+        if existing_subtree is None:
+            existing_subtree = LinearTree(items[0], [])
+            self._subtrees.append(existing_subtree)
+        existing_subtree.insert_sequence(items[1:])
+
+    def _find_child(self, item: object) -> object:
+        """Return the subtree whose root is item, scanning linearly."""
+        for child in self._subtrees:
+            if child._root == item:
+                return child
+        return None
+
+
+def synthetic_table(scale: int, seed: int = 0) -> RestaurantTable:
+    """Return the dataset repeated scale times, with every copy's coordinates jittered."""
+    base = computations.get_restaurant_table()
+    rng = np.random.default_rng(seed)
+    n = len(base) * scale
+
+    def repeat(col: StringColumn) -> StringColumn:
+        return StringColumn(np.tile(col.codes, scale), col.table)
+
+    cuisines = StringColumn(np.tile(base.cuisine_codes, scale), base.cuisines)
+    prices = StringColumn(np.tile(base.price_codes, scale), base.price_ranges)
+    return RestaurantTable(latitudes=np.tile(base.latitudes, scale) + rng.uniform(-0.0045, 0.0045, n),
+                           longitudes=np.tile(base.longitudes, scale) + rng.uniform(-0.006, 0.006, n),
+                           cuisines=cuisines, price_ranges=prices,
+                           text_columns={attr: repeat(getattr(base, attr))
+                                         for attr in ('names', 'addresses', 'phones', 'websites', 'yelp_urls')})
+
+
+def build(tree_class: type, rests: list) -> computations.Tree:
+    """Return the tree build_tree_w_rests builds for rests, using tree_class as the tree type."""
+    tree = tree_class('', [])
+    for i in range(len(rests)):
+        tree.insert_sequence([rests[i].price_range, rests[i].cuisine, rests[i].distance[0], (rests[i], i)])
+    return tree
+
+
+def run_benchmark(scale: int = 10) -> None:
+    """Print the build time of both trees and check they hold the same leaves."""
+    table = synthetic_table(scale)
+    distances, buckets = computations.get_distances_from_user(table.latitudes, table.longitudes,
+                                                              (43.6532, -79.3832))
+    rests = table.rows(range(len(table)), distances, buckets)
+    print(f'{len(rests)} restaurants ({scale}x the dataset)')
+
+    start = time.perf_counter()
+    new_tree = computations.build_tree_w_rests(rests)
+    new_time = time.perf_counter() - start
+    start = time.perf_counter()
+    old_tree = build(LinearTree, rests)
+    old_time = time.perf_counter() - start
+
+    answers = ['$11-30', 'Pizza', '1-5 km']
+    same = new_tree.traverse_dec_tree(answers) == old_tree.traverse_dec_tree(answers)
+    print(f'linear-scan Tree:  {old_time * 1000:9.1f} ms')
+    print(f'dict-indexed Tree: {new_time * 1000:9.1f} ms  ({old_time / new_time:.0f}x faster, same leaves: {same})')
+
+
+if __name__ == '__main__':
+    run_benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 10)
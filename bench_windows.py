@@ -0,0 +1,85 @@
+"""Benchmark: opening windows as new tk.Tk() roots vs as Toplevels of one root (windows.py).
+
+Simulates a long session in which a dialog (the More Info window, say) is opened and closed
+count times, and reports the time per open and how much the resident memory grew:
+    - before: each open is a new tk.Tk(), which is never freed while the program runs (as the
+      old windows were: each a new Tcl interpreter, some with their own mainloop)
+    - after: each open goes through WindowManager.open, reusing the dialog's Toplevel
+    - after, closing each time: WindowManager.open then WindowManager.close, so a new Toplevel is
+      created every time
+
+Creating Tk windows needs a display. Without one (no DISPLAY, as on a server), only the part of
+tk.Tk() that does not need one is measured: starting a new Tcl interpreter (tkinter.Tcl()),
+which every tk.Tk() does before loading Tk itself, so this underestimates the "before" cost.
+
+Run with:
+    python bench_windows.py [count]
+"""
+import os
+import sys
+import time
+import tkinter as tk
+
+from windows import WindowManager
+
+
+def resident_mb() -> float:
+    """Return the resident memory of this process, in MB (Linux only)."""
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2 ** 20
+
+
+def fill(window: tk.Misc) -> None:
+    """Put a few widgets in window, like a small dialog."""
+    for text in ('Location', 'Contact Information', 'Review Information'):
+        tk.Checkbutton(window, text=text).pack()
+    tk.Label(window, text='123 Fake St, Toronto').pack()
+
+
+def measure(name: str, count: int, open_one: callable) -> None:
+    """Report the time per call and the memory growth of calling open_one count times."""
+    memory = resident_mb()
+    start = time.perf_counter()
+    for i in range(count):
+        open_one(i)
+    elapsed = time.perf_counter() - start
+    print(f'{name:34}: {elapsed / count * 1000:7.2f} ms per open, resident memory +{resident_mb() - memory:6.1f} MB')
+
+
+def main(count: int) -> None:
+    """Run the benchmark."""
+    if not os.environ.get('DISPLAY') and sys.platform.startswith('linux'):
+        print('no display: timing only the Tcl interpreter each tk.Tk() starts')
+        interpreters = []
+        measure('new interpreter per window', count, lambda i: interpreters.append(tk.Tcl()))
+        return
+
+    roots = []
+
+    def new_root(i: int) -> None:
+        root = tk.Tk()
+        fill(root)
+        root.update()
+        roots.append(root)
+    measure('new tk.Tk() per window', count, new_root)
+    for root in roots:
+        root.destroy()
+
+    manager = WindowManager()
+    manager.root.update()
+
+    def reuse(i: int) -> None:
+        manager.open('info', f'Restaurant {i}', '', fill, rebuild=True)
+        manager.root.update()
+    measure('Toplevel, reused', count, reuse)
+
+    def open_and_close(i: int) -> None:
+        manager.open('info', f'Restaurant {i}', '', fill)
+        manager.root.update()
+        manager.close('info')
+    measure('Toplevel, closed after each open', count, open_and_close)
+    manager.root.destroy()
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100)
@@ -0,0 +1,93 @@
+"""Bitmap inverted index over a categorical column, for multi-select filters.
+
+For every value of the column (e.g. every cuisine) the index keeps a bitmap of the rows that have
+it, packed 64 rows to a numpy uint64 word. Selecting any of several values is the bitwise OR of
+their bitmaps, combining filters on different columns is a bitwise AND, and only the final bitmap
+is turned back into row numbers. On 1M rows a bitmap is 15 625 words (125 kB), so an OR or AND is
+a single pass over a few hundred kB.
+"""
+from __future__ import annotations
+
+from typing import Iterable, Optional
+
+import numpy as np
+
+
+class BitmapIndex:
+    """A bitmap of rows per value code of a column.
+
+    Instance Attributes:
+        - size: the number of rows indexed
+
+    Representation Invariants:
+        - self._bitmaps.shape == (number of values, ceil(self.size / 64))
+        - the bits of self._bitmaps past self.size are all 0
+
+    >>> index = BitmapIndex(np.array([0, 2, 1, 2, 0]), 3)
+    >>> index.rows(index.any_of([0, 2])).tolist()
+    [0, 1, 3, 4]
+    >>> index.rows(index.any_of([0]) & BitmapIndex(np.array([1, 1, 1, 0, 0]), 2).any_of([0])).tolist()
+    [4]
+    """
+    # Private Instance Attributes:
+    #   - _bitmaps: row i of value code c is bit i % 64 of word i // 64 of _bitmaps[c]
+    size: int
+    _bitmaps: np.ndarray
+
+    def __init__(self, codes: np.ndarray, n_values: int) -> None:
+        """Index a column given as the value code (0 to n_values - 1) of each row."""
+        codes = np.asarray(codes)
+        self.size = len(codes)
+        padded = -(-self.size // 64) * 64
+        self._bitmaps = np.zeros((n_values, padded // 64), dtype=np.uint64)
+        mask = np.zeros(padded, dtype=bool)
+        for code in range(n_values):
+            np.equal(codes, code, out=mask[:self.size])
+            self._bitmaps[code] = np.packbits(mask, bitorder='little').view(np.uint64)
+
+    @property
+    def nbytes(self) -> int:
+        """Return the memory used by the bitmaps, in bytes."""
+        return self._bitmaps.nbytes
+
+    def everything(self) -> np.ndarray:
+        """Return the bitmap of every row."""
+        mask = np.zeros(self._bitmaps.shape[1] * 64, dtype=bool)
+        mask[:self.size] = True
+        return np.packbits(mask, bitorder='little').view(np.uint64)
+
+    def any_of(self, codes: Optional[Iterable[int]]) -> np.ndarray:
+        """Return the bitmap of the rows having any of the value codes (every row if codes is None).
+        Codes outside the column's values match nothing.
+        """
+        if codes is None:
+            return self.everything()
+        codes = [c for c in codes if 0 <= c < len(self._bitmaps)]
+        if not codes:
+            return np.zeros(self._bitmaps.shape[1], dtype=np.uint64)
+        return np.bitwise_or.reduce(self._bitmaps[codes], axis=0)
+
+    def rows(self, bitmap: np.ndarray) -> np.ndarray:
+        """Return the row numbers set in bitmap, in increasing order."""
+        bits = np.unpackbits(bitmap.view(np.uint8), bitorder='little', count=self.size)
+        return np.flatnonzero(bits)
+
+    def mask(self, bitmap: np.ndarray) -> np.ndarray:
+        """Return bitmap as a boolean mask over the rows."""
+        return np.unpackbits(bitmap.view(np.uint8), bitorder='little', count=self.size).view(bool)
+
+
+###################################################################################################
+# Main block
+###################################################################################################
+if __name__ == '__main__':
+    import doctest
+
+    doctest.testmod(verbose=True)
+
+    import python_ta
+
+    python_ta.check_all(config={
+        'max-line-length': 120,
+        'extra-imports': ['numpy']
+    })
@@ -2,9 +2,10 @@
 
 from __future__ import annotations
 
-import math
 from typing import Any, Optional
 
+from distances import haversine_km
+
 
 class Tree:
     """A recursive tree data structure.
@@ -76,13 +77,7 @@ class Restaurant:
         if self.coordinates is None:
             return None
         else:
-            lat1 = math.radians(self.coordinates[0])
-            lat2 = math.radians(user_lat)
-            long1 = math.radians(self.coordinates[1])
-            long2 = math.radians(user_long)
-
-            return (math.acos(math.sin(lat1) * math.sin(lat2) + math.cos(lat1) * math.cos(lat2) *
-                              math.cos(long2 - long1)) * 6371)
+            return haversine_km(self.coordinates[0], self.coordinates[1], user_lat, user_long)
 
     def in_price_range(self, low: int, high: int) -> Optional[bool]:
         """Check if self is in the user's price range"""
@@ -115,11 +110,5 @@ class Event:
 
     def calculate_distance(self, user_lat: float, user_long: float) -> float:
         """Calculate the distance between the user and the event location"""
-        lat1 = math.radians(self.coordinates[0])
-        lat2 = math.radians(user_lat)
-        long1 = math.radians(self.coordinates[1])
-        long2 = math.radians(user_long)
-
-        return (math.acos(math.sin(lat1) * math.sin(lat2) + math.cos(lat1) * math.cos(lat2) *
-                          math.cos(long2 - long1)) * 6371)
+        return haversine_km(self.coordinates[0], self.coordinates[1], user_lat, user_long)
     
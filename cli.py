@@ -0,0 +1,257 @@
+"""Command-line front end of the restaurant finder, for scripts and batch runs (no Tk needed).
+
+One search, with its criteria as flags:
+    python cli.py --address "14 Prince Arthur Avenue, Toronto" --cuisine Pizza,Burgers --price '$11-30' \\
+        --distance '1-5 km' --limit 10
+
+Many searches, one JSON object per line of a file ('-' for standard input), each with the keys
+address (or latitude and longitude), cuisine, price, distance and optionally star, limit, sort
+and id; missing keys take the values of the flags:
+    python cli.py --batch queries.jsonl --stats > results.jsonl
+
+With --lookup (or a lookup key), a query looks restaurants up by name instead, forgiving typos
+(see name_index.py), or by address with --field address:
+    python cli.py --lookup "burgers preist"
+
+Each search prints one JSON line as soon as it is done: its id and criteria, 'status' ('ok',
+'invalid' for an address that cannot be found, or 'error'), the number of restaurants found, the
+best of them and how long it took. Every search of a run shares one dataset, engine and search
+cache, loaded once before the first one; --stats reports the load time, the throughput (queries
+per second) and the latency percentiles on standard error.
+
+Run without arguments, it runs its doctests and python_ta instead.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import sys
+import time
+from typing import Any, Iterable, Iterator, Optional, TextIO
+
+import computations
+import ranking
+
+DEFAULTS = {'cuisine': 'Any', 'price': 'Any', 'distance': 'Under 1 km', 'star': 'Any', 'limit': 20,
+            'sort': 'score', 'field': 'name'}
+
+
+def parse_choices(value: Any) -> Any:
+    """Return a cuisine or price criterion as get_user_info takes it: several comma-separated
+    values (or a JSON list) become a list.
+
+    >>> parse_choices('Pizza, Burgers')
+    ['Pizza', 'Burgers']
+    >>> parse_choices('Pizza')
+    'Pizza'
+    >>> parse_choices(['Pizza'])
+    'Pizza'
+    """
+    if isinstance(value, str):
+        value = [v.strip() for v in value.split(',') if v.strip()]
+    value = [str(v) for v in value]
+    return value[0] if len(value) == 1 else value
+
+
+def restaurant_record(restaurant: Any, row: int, rating: Optional[float] = None) -> dict[str, Any]:
+    """Return the JSON record of a search result, with the given star rating (by default, the
+    restaurant's)."""
+    if rating is None:
+        rating = restaurant.star_rating
+    return {'row': row, 'name': restaurant.name, 'cuisine': restaurant.cuisine, 'price': restaurant.price_range,
+            'distance_km': round(restaurant.distance[1], 3), 'address': restaurant.address.replace('\n', ' '),
+            'rating': rating if rating is not None and rating >= 1 else None}
+
+
+def run_lookup(query: dict[str, Any]) -> dict[str, Any]:
+    """Look up the restaurants named (or at the address) query['lookup'] and return the JSON record."""
+    from name_index import get_name_index
+
+    record = {'id': query.get('id'), 'query': {k: query[k] for k in ('lookup', 'field', 'limit') if k in query}}
+    start = time.perf_counter()
+    try:
+        matches = get_name_index().search(str(query['lookup']), query['field'], int(query['limit']))
+        record.update(status='ok', count=len(matches),
+                      results=[{'value': m.value, 'score': m.score, 'rows': m.rows} for m in matches])
+    except Exception as e:  # one bad query must not stop the batch
+        record.update(status='error', error=f'{type(e).__name__}: {e}')
+    record['ms'] = round((time.perf_counter() - start) * 1000, 3)
+    return record
+
+
+def run_query(query: dict[str, Any]) -> dict[str, Any]:
+    """Run one search (or lookup, if query has a lookup key) and return its JSON record. query
+    holds every key of DEFAULTS, and either address or latitude and longitude."""
+    if query.get('lookup'):
+        return run_lookup(query)
+    record = {'id': query.get('id'), 'query': {k: v for k, v in query.items() if k not in ('id', 'lookup', 'field')}}
+    start = time.perf_counter()
+    try:
+        user = computations.User()
+        cuisine, price = parse_choices(query['cuisine']), parse_choices(query['price'])
+        if query.get('latitude') is not None and query.get('longitude') is not None:
+            computations.get_user_info(user, '', cuisine, price, query['distance'], query['star'])
+            user.latitude, user.longitude = float(query['latitude']), float(query['longitude'])
+            invalid = False
+        else:
+            invalid = computations.get_user_info(user, query.get('address') or '', cuisine, price,
+                                                 query['distance'], query['star']) is not None
+        if invalid:
+            record.update(status='invalid', count=0, results=[])
+        else:
+            results = computations.search_restaurants(user, shared_ratings=False)
+            if query['sort'] != 'score':
+                results.order_by(query['sort'])
+            record.update(status='ok', count=len(results),
+                          results=[restaurant_record(r, row, results.rating(row))
+                                   for r, row in results.top(int(query['limit']))])
+    except Exception as e:  # one bad query must not stop the batch
+        record.update(status='error', error=f'{type(e).__name__}: {e}')
+    record['ms'] = round((time.perf_counter() - start) * 1000, 3)
+    return record
+
+
+def read_queries(lines: Iterable[str], defaults: dict[str, Any]) -> Iterator[dict[str, Any]]:
+    """Yield the queries of a JSONL batch, with the defaults filled in; blank lines are skipped
+    and a line that is not a JSON object becomes a query that fails.
+
+    >>> [q['cuisine'] for q in read_queries(['{"cuisine": "Pizza"}', '', '{}'], {'cuisine': 'Any'})]
+    ['Pizza', 'Any']
+    """
+    for number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            query = json.loads(line)
+            if not isinstance(query, dict):
+                raise ValueError('not a JSON object')
+        except ValueError as e:
+            yield {**defaults, 'id': number, 'error': f'line {number}: {e}'}
+            continue
+        yield {**defaults, 'id': number, **query}
+
+
+def percentile(values: list[float], q: float) -> float:
+    """Return the q-th percentile (0 <= q <= 100) of values, by the nearest-rank method.
+
+    >>> percentile([4.0, 1.0, 3.0, 2.0], 50)
+    2.0
+    >>> percentile([4.0, 1.0, 3.0, 2.0], 99)
+    4.0
+    """
+    if not values:
+        return math.nan
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(q / 100 * len(ordered)) - 1)]
+
+
+def run(queries: Iterable[dict[str, Any]], out: TextIO) -> list[dict[str, Any]]:
+    """Run the queries in order, writing each record to out as soon as it is done. Return the
+    records (without their results)."""
+    done = []
+    for query in queries:
+        if 'error' in query:
+            record = {'id': query['id'], 'status': 'error', 'error': query['error'], 'ms': 0.0}
+        else:
+            record = run_query(query)
+        out.write(json.dumps(record) + '\n')
+        out.flush()
+        record.pop('results', None)
+        done.append(record)
+    return done
+
+
+def report(records: list[dict[str, Any]], load_seconds: float, run_seconds: float, err: TextIO) -> None:
+    """Write the throughput and latency of a run to err."""
+    latencies = [r['ms'] for r in records]
+    statuses = {}
+    for r in records:
+        statuses[r['status']] = statuses.get(r['status'], 0) + 1
+    qps = len(records) / run_seconds if run_seconds > 0 else math.nan
+    err.write(f'loaded in {load_seconds:.2f} s; {len(records)} queries in {run_seconds:.2f} s ({qps:.1f} queries/s); '
+              f'{", ".join(f"{n} {s}" for s, n in sorted(statuses.items()))}; latency p50 '
+              f'{percentile(latencies, 50):.2f} ms, p99 {percentile(latencies, 99):.2f} ms, '
+              f'max {max(latencies, default=math.nan):.2f} ms\n')
+
+
+def parse_args(argv: Optional[list[str]] = None) -> argparse.Namespace:
+    """Return the command-line arguments."""
+    parser = argparse.ArgumentParser(description='Find restaurants in Toronto without the GUI.')
+    parser.add_argument('--address', help='the address to search around')
+    parser.add_argument('--latitude', type=float, help='search around these coordinates instead of an address')
+    parser.add_argument('--longitude', type=float)
+    parser.add_argument('--cuisine', default=DEFAULTS['cuisine'], help="cuisines, comma-separated, or 'Any'")
+    parser.add_argument('--price', default=DEFAULTS['price'], help="price ranges, comma-separated, or 'Any'")
+    parser.add_argument('--distance', default=DEFAULTS['distance'], choices=computations.DISTANCE_BUCKETS)
+    parser.add_argument('--star', default=DEFAULTS['star'], help="a Yelp star rating such as '4 stars', or 'Any'")
+    parser.add_argument('--limit', type=int, default=DEFAULTS['limit'], help='the most results printed per search')
+    parser.add_argument('--sort', default=DEFAULTS['sort'], choices=list(ranking.SORT_COLUMNS),
+                        help='the column results are ordered by')
+    parser.add_argument('--lookup', metavar='NAME', help='look restaurants up by name (or address) instead')
+    parser.add_argument('--field', default=DEFAULTS['field'], choices=['name', 'address'],
+                        help='what --lookup looks up')
+    parser.add_argument('--batch', metavar='FILE', help="run the searches of a JSONL file ('-' for standard input)")
+    parser.add_argument('--output', metavar='FILE', help='write the results to FILE instead of standard output')
+    parser.add_argument('--stats', action='store_true', help='report throughput and latency on standard error')
+    args = parser.parse_args(argv)
+    if (args.batch is None and args.lookup is None and args.address is None
+            and (args.latitude is None or args.longitude is None)):
+        parser.error('give --address, --latitude and --longitude, --lookup or --batch')
+    return args
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """Run the command line; return 0 if every search succeeded (or found its address invalid)."""
+    import engine
+
+    args = parse_args(argv)
+    defaults = {key: getattr(args, key) for key in DEFAULTS}
+    defaults.update(address=args.address, latitude=args.latitude, longitude=args.longitude, lookup=args.lookup)
+
+    start = time.perf_counter()
+    engine.get_engine()
+    if args.lookup is not None:
+        from name_index import get_name_index
+        get_name_index()
+    load_seconds = time.perf_counter() - start
+
+    source = None
+    out = open(args.output, 'w') if args.output else sys.stdout
+    try:
+        if args.batch is None:
+            queries = [{**defaults, 'id': None}]
+        else:
+            source = sys.stdin if args.batch == '-' else open(args.batch)
+            queries = read_queries(source, defaults)
+        start = time.perf_counter()
+        records = run(queries, out)
+        run_seconds = time.perf_counter() - start
+    finally:
+        if source is not None and source is not sys.stdin:
+            source.close()
+        if out is not sys.stdout:
+            out.close()
+    if args.stats:
+        report(records, load_seconds, run_seconds, sys.stderr)
+    return 1 if any(r['status'] == 'error' for r in records) else 0
+
+
+###################################################################################################
+# Main block
+###################################################################################################
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        sys.exit(main())
+
+    import doctest
+
+    doctest.testmod(verbose=True)
+
+    import python_ta
+
+    python_ta.check_all(config={
+        'max-line-length': 120,
+        'extra-imports': ['argparse', 'json', 'math', 'sys', 'time', 'computations', 'engine', 'name_index', 'ranking'],
+        'allowed-io': ['main']
+    })
@@ -1,16 +1,23 @@
 """File containing the Tree, Restaurant, and Event classes to be used in the computations"""
 from __future__ import annotations
-from typing import Any, Optional
+from typing import Any, Optional, Union
 import math
-from requests.exceptions import MissingSchema
-import plotly.express as px
-from geopy.geocoders import Nominatim
-import pandas as pd
-import requests
+import threading
 
-RAWDATA = pd.read_csv('trt_rest.csv')
+from recommendations import RecommendationStore
 
-DATA = RAWDATA.dropna().drop_duplicates(subset=['Restaurant Address', 'Category'], keep='first')
+# pandas, plotly, geopy, requests and the dataset itself are loaded on first use (see get_data),
+# so importing this module (and opening the GUI home window) stays cheap.
+CSV_PATH = 'trt_rest.csv'
+
+_DATA = None
+_DATA_VERSION = None
+_TABLE = None
+_DATA_LOCK = threading.Lock()
+
+# The HTML files of the maps written by write_map_recommended, removed when the program exits
+_MAP_FILES = []
+_MAP_FILES_LOCK = threading.Lock()
 
 RESTAURANT_QUESTIONS = [
     'What is your price range?\nUnder $10\n$11-30\n$31-60\nAbove $61',
@@ -19,9 +26,71 @@ RESTAURANT_QUESTIONS = [
     'What Yelp star rating would you like the restaurant to have?\nAny\n1 star\n2 stars\n3 stars\n4 stars\n5 stars'
 ]
 
+DISTANCE_BUCKETS = ['Under 1 km', '1-5 km', 'Above 5 km']
+
 ALL_EVENTS = []
 
 
+def get_data() -> Any:
+    """Return the cleaned restaurant dataset as a pandas DataFrame, loading it on first use.
+
+    Safe to call from several threads; the dataset is only loaded once.
+    """
+    global _DATA, _DATA_VERSION
+    if _DATA is None:
+        with _DATA_LOCK:
+            if _DATA is None:
+                import snapshot
+                version = snapshot.file_digest(CSV_PATH)
+                data = snapshot.load_clean_data(CSV_PATH, digest=version)
+                _DATA_VERSION = version
+                _DATA = data
+    return _DATA
+
+
+def get_data_version() -> str:
+    """Return the content hash of the csv file the loaded dataset was built from."""
+    get_data()
+    return _DATA_VERSION
+
+
+def get_restaurant_table() -> Any:
+    """Return the dataset as a restaurant_table.RestaurantTable, building it on first use."""
+    global _TABLE
+    if _TABLE is None:
+        data = get_data()
+        with _DATA_LOCK:
+            if _TABLE is None:
+                from restaurant_table import RestaurantTable
+                _TABLE = RestaurantTable.from_frame(data)
+    return _TABLE
+
+
+def preload_data() -> threading.Thread:
+    """Start loading the dataset, and indexing its restaurant names (see name_index.py and
+    prefix_index.py), on a background thread and return that thread."""
+    thread = threading.Thread(target=_preload, name='preload-data', daemon=True)
+    thread.start()
+    return thread
+
+
+def _preload() -> None:
+    """Load the dataset and index its restaurant names, and what can be typed in the GUI."""
+    from name_index import get_name_index
+    from prefix_index import get_prefix_indexes
+
+    get_data()
+    get_name_index()
+    get_prefix_indexes()
+
+
+def __getattr__(name: str) -> Any:
+    """Keep computations.DATA working as a lazily loaded module attribute."""
+    if name == 'DATA':
+        return get_data()
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+
 class User:
     """
     Stores information about the user (i.e., location, coordinates).
@@ -30,7 +99,7 @@ class User:
     longitude: float
     latitude: float
     questions: list
-    recommendations: list[tuple[Restaurant, int]]
+    recommendations: RecommendationStore
 
     def __init__(self) -> None:
         """Initialize a new Tree with the given root value and subtrees.
@@ -44,24 +113,23 @@ class User:
         self.longitude = 0.0
         self.latitude = 0.0
         self.questions = []
-        self.recommendations = []
+        self.recommendations = RecommendationStore()
 
 
-def get_user_info(user: User, location: str, cuisine: str, price: str, distance: str, star: str) -> Optional[str]:
+def get_user_info(user: User, location: str, cuisine: Union[str, list[str]], price: Union[str, list[str]],
+                  distance: str, star: str) -> Optional[str]:
     # adding a location argument, removing the input
     """
     Modify a User object based on the user's input.
+
+    cuisine and price can each be one value, a list of values (any of which is fine) or 'Any'.
     """
     answers = [price, cuisine, distance, star]
-    user.questions = [x.capitalize() for x in answers]
-    if location:
-        geolocator = Nominatim(user_agent="a")
-        loc1 = geolocator.geocode(location)
-        lat = loc1.raw['lat']
-        long = loc1.raw['lon']
+    user.questions = [x.capitalize() if isinstance(x, str) else [y.capitalize() for y in x] for x in answers]
+    coords = find_coords(location) if location else None
+    if coords is not None:
         user.location = location
-        user.latitude = float(lat)
-        user.longitude = float(long)
+        user.latitude, user.longitude = coords
         return None
     else:
         return 'Invalid location'
@@ -70,12 +138,35 @@ def get_user_info(user: User, location: str, cuisine: str, price: str, distance:
 
 
 def get_coords(ad: str) -> tuple[float, float]:
-    """Get the coordinates of this address."""
-    geolocator = Nominatim(user_agent="a")
-    loc1 = geolocator.geocode(ad)
-    lat = loc1.raw['lat']
-    long = loc1.raw['lon']
-    return float(lat), float(long)
+    """Get the coordinates of this address.
+
+    Raises ValueError if the address cannot be found.
+    """
+    coords = find_coords(ad)
+    if coords is None:
+        raise ValueError(f'Could not find the address {ad!r}')
+    return coords
+
+
+def find_coords(ad: str) -> Optional[tuple[float, float]]:
+    """Return the coordinates of this address, or None if it cannot be found.
+
+    The offline gazetteer built from the dataset's own addresses (see gazetteer.py) is asked first;
+    only addresses it cannot place are looked up through the shared geocoding service (see
+    geocoding.py), which caches them on disk. If the network lookup fails (e.g. no connection), the
+    address counts as not found.
+    """
+    from gazetteer import get_gazetteer
+    match = get_gazetteer().lookup(ad)
+    if match is not None:
+        return match.latitude, match.longitude
+
+    from geopy.exc import GeopyError
+    from geocoding import get_geocoding_service
+    try:
+        return get_geocoding_service().geocode(ad)
+    except GeopyError:
+        return None
 
 
 # def get_user_input(questions: list[str]) -> list[str]:
@@ -108,8 +199,12 @@ class Tree:
     #       self._root is None (representing an empty tree). However, this attribute
     #       may be empty when self._root is not None, which represents a tree consisting
     #       of just one item.
+    #   - _children:
+    #       Maps the root of each subtree to that subtree, so a child can be found without
+    #       scanning self._subtrees. self._subtrees keeps the insertion order for printing.
     _root: Optional[Any]
     _subtrees: list[Tree]
+    _children: dict[Any, Tree]
 
     def __init__(self, root: Optional[Any], subtrees: list[Tree]) -> None:
         """Initialize a new Tree with the given root value and subtrees.
@@ -121,6 +216,9 @@ class Tree:
         """
         self._root = root
         self._subtrees = subtrees
+        self._children = {}
+        for subtree in subtrees:
+            self._children.setdefault(subtree._root, subtree)
 
     def is_empty(self) -> bool:
         """Return whether this tree is empty.
@@ -198,20 +296,18 @@ class Tree:
             3
               5
         """
-        if not items:
-            return
-        child_exists = False
-        existing_subtree = None
-        for tree in self._subtrees:
-            if tree._root == items[0]:
-                child_exists = True
-                existing_subtree = tree
-                break
-        if not child_exists:
-            new_subtree = Tree(items[0], [])
-            self._subtrees.append(new_subtree)
-            existing_subtree = new_subtree
-        existing_subtree.insert_sequence(items[1:])
+        tree = self
+        for item in items:
+            child = tree._find_child(item)
+            if child is None:
+                child = Tree(item, [])
+                tree._subtrees.append(child)
+                tree._children[item] = child
+            tree = child
+
+    def _find_child(self, item: Any) -> Optional[Tree]:
+        """Return the subtree whose root is item, or None if there is no such subtree."""
+        return self._children.get(item)
 
     def traverse_dec_tree(self, answers: list[str]) -> [list[Any]]:
         """
@@ -222,11 +318,7 @@ class Tree:
         possible_restaurant = []
 
         for answer in answers[0:3]:
-            found = None
-            for child in current_node._subtrees:
-                if child._root == answer:
-                    found = child
-                    break
+            found = current_node._find_child(answer)
             if found:
                 current_node = found
             else:
@@ -274,16 +366,12 @@ class Restaurant:
 
     def calculate_distance(self, user_lat: float, user_long: float) -> Optional[float]:
         """Calculate the distance between the user and the restaurant"""
+        from distances import haversine_km
+
         if self.coordinates is None:
             return None
         else:
-            lat1 = math.radians(self.coordinates[0])
-            lat2 = math.radians(user_lat)
-            long1 = math.radians(self.coordinates[1])
-            long2 = math.radians(user_long)
-
-            return (math.acos(math.sin(lat1) * math.sin(lat2) + math.cos(lat1) * math.cos(lat2)
-                              * math.cos(long2 - long1)) * 6371)
+            return haversine_km(self.coordinates[0], self.coordinates[1], user_lat, user_long)
 
 
 class Event:
@@ -318,55 +406,43 @@ def create_event(name: str, location: str, date_and_time: tuple[str, str], more_
 def load_data(user: User) -> list:
     """
     Load the file data into restaurant objects.
+
+    The restaurants are views (restaurant_table.RestaurantRow) over the column store returned by
+    get_restaurant_table, with the same attributes as Restaurant. Every distance from the user is
+    computed in a single vectorized pass (see get_distances_from_user).
     """
-    lst = []
-    for i in range(len(DATA)):
-        rest = DATA.iloc[i]
-        address = rest['Restaurant Address']
-        lat = rest['Restaurant Latitude']
-        long = rest['Restaurant Longitude']
-        coordinates = (float(lat), float(long))
-        name = rest['Restaurant Name']
-        cuisine = rest.Category
-        phone = rest['Restaurant Phone']
-        pr = rest['Restaurant Price Range']
-        web = rest['Restaurant Website']
-        # try:
-        # star_rating = get_star_rating(rest['Restaurant Yelp URL'])
-        # except MissingSchema:
-        # star_rating = 'NaN'
-
-        dis = get_distance_from_user(lat, long, (user.latitude, user.longitude))
-        new_restaurant = Restaurant(name=name, coordinates=coordinates, cuisine=cuisine, contact=(phone, web),
-                                    price_range=pr, address=address, star_rating=0.0, distance=dis)
-        lst.append(new_restaurant)
-    return lst
+    table = get_restaurant_table()
+    distances, buckets = get_distances_from_user(table.latitudes, table.longitudes, (user.latitude, user.longitude))
+    return table.rows(range(len(table)), distances, buckets)
 
 
 def get_all_cuisines() -> list:
     """return a set of all the cuisines available"""
-    return list(DATA.Category.unique())
+    return list(get_data().Category.unique())
 
 
 def get_star_rating(yelp: str) -> Optional[float]:
-    """get the star rating from the yelp page"""
+    """get the star rating from the yelp page
+
+    The page is streamed and scanned as it arrives (see rating_extractor.py); the download stops
+    as soon as the rating is found.
+    """
     if yelp == '':
         return 0.0
-    r = requests.get(yelp)
-    t = r.text
-    num = t.count('label=')
-    while num > 0:
-        i = t.index('label=')
-        if t[i + 7] in '1234567890':
-            if t[i + 8] == '.':
-                string = t[i + 7:i + 10]
-                return float(string)
-            else:
-                return float(t[i + 7])
-        else:
-            num -= 1
-            t = t[i + 1:]
-    return None
+    import requests
+    from rating_extractor import read_star_rating
+    with requests.get(yelp, stream=True) as r:
+        return read_star_rating(r)
+
+
+def extract_star_rating(t: str) -> Optional[float]:
+    """Return the star rating in the html of a Yelp page, or None if there is none.
+
+    >>> extract_star_rating('<div aria-label="Photo"></div><div aria-label="4.5 star rating"></div>')
+    4.5
+    """
+    from rating_extractor import scan_star_rating
+    return scan_star_rating([t])
 
 
 def build_tree_w_rests(rests: list[Restaurant]) -> Tree:
@@ -382,12 +458,9 @@ def get_distance_from_user(latitude: float, longitude: float, user_coords: tuple
     """
     Calculate the distance from the user's location in km.
     """
-    latitude1 = math.radians(latitude)
-    longitude1 = math.radians(longitude)
-    latitude2 = math.radians(user_coords[0])
-    longitude2 = math.radians(user_coords[1])
-    distance = (math.acos(math.sin(latitude1) * math.sin(latitude2) + math.cos(latitude1) * math.cos(latitude2)
-                          * math.cos(longitude2 - longitude1)) * 6371)
+    from distances import haversine_km
+
+    distance = haversine_km(latitude, longitude, user_coords[0], user_coords[1])
     if distance < 1:
         return ('Under 1 km', round(distance, 4))
     elif 1 <= distance <= 5:
@@ -396,92 +469,216 @@ def get_distance_from_user(latitude: float, longitude: float, user_coords: tuple
         return ('Above 5 km', round(distance, 4))
 
 
-###############################
-def run_restaurant_finder2(user: User) -> list[tuple[Restaurant, int]]:  # User object must be created first
+def get_distances_from_user(latitudes: Any, longitudes: Any, user_coords: tuple[float, float]) -> tuple[Any, Any]:
+    """
+    Vectorized get_distance_from_user: return (distances in km, distance bucket codes) for arrays of
+    coordinates. The codes index into DISTANCE_BUCKETS.
+
+    >>> d, b = get_distances_from_user([43.6532, 43.6532], [-79.3832, -79.3], (43.6532, -79.3832))
+    >>> [round(x, 4) for x in d.tolist()], b.tolist()
+    ([0.0, 6.6937], [0, 2])
     """
-    Return a list of possible restaurants as Restaurant objects.
+    from distances import one_to_many
+
+    distances = one_to_many(user_coords[0], user_coords[1], latitudes, longitudes)
+    return distances, get_distance_buckets(distances)
+
+
+def get_distance_buckets(distances: Any) -> Any:
+    """Return the DISTANCE_BUCKETS code of each distance (in km) of an array.
+
+    >>> get_distance_buckets([0.5, 1.0, 5.0, 5.1]).tolist()
+    [0, 1, 1, 2]
     """
-    # if you use the same user object you get duplicate outputs...
-    lst = load_data(user)
-    tree = build_tree_w_rests(lst)
-    possible_rests = tree.traverse_dec_tree(user.questions)  # list[tuple[Restaurant, int]]
-
-    if user.questions[3] != 'Any':
-        if len(possible_rests) > 15:
-            # for popular cuisines (like Pizza) this can be > 100 and get_star_rating will take too long to run :(
-            possible_rests = possible_rests[0:15]
-
-        load_stars(possible_rests)
-        r1 = [r for r in possible_rests if r[0].star_rating is not None]
-        rests = [rest_tup for rest_tup in r1 if math.floor(rest_tup[0].star_rating) == int(user.questions[3][0])]
-    else:
-        rests = possible_rests
+    import numpy as np
 
-    if len(rests) == 1:
-        user.recommendations.append(rests[0])
+    distances = np.asarray(distances)
+    return np.where(distances < 1, 0, np.where(distances <= 5, 1, 2))
 
-    elif len(rests) > 1:
-        for restaurant in rests:
-            user.recommendations.append(restaurant)
 
-    return rests
+###############################
+class SearchCancelled(Exception):
+    """Raised when a search is cancelled before it is done."""
 
 
-def run_restaurant_finder(user: User) -> list[str]:  # User object must be created first
+def search_restaurants(user: User, on_rating: Optional[Any] = None, cancel: Optional[threading.Event] = None,
+                       shared_ratings: bool = True) -> Any:  # User object must be created first
     """
-    find restaurants for that user based on their requirements.
+    Return the restaurants meeting the user's requirements as a ranking.RankedResults, which hands
+    them out best first, a page at a time.
+
+    If the user asked for a star rating, the ratings of every match are loaded to filter on them,
+    and the ranking uses them too. on_rating(row number, rating) is called, possibly from another
+    thread, as each of them is known. If cancel is set while they load, SearchCancelled is raised.
+    The ratings are stored in the restaurant table, where later searches see them, unless
+    shared_ratings is False: then the table is left alone and the results hold the ratings
+    themselves, so that they depend on nothing but the search (as the service needs).
+
+    Searches are cached by their answers and the user's neighbourhood (see result_cache.py), so a
+    repeated search skips the tree, the spatial index and the star ratings; a search some of whose
+    star ratings could not be loaded in time is not cached, so the restaurants it left out are
+    looked at again next time.
     """
-    # user = User()
-    # get_user_info(user, user.location, user.questions[1], user.questions[0], user.questions[2])
-    # if you use the same user object you get duplicate outputs...
-    lst = load_data(user)
-    tree = build_tree_w_rests(lst)
-    possible_rests = tree.traverse_dec_tree(user.questions)  # list[tuple[Restaurant, int]]
+    import numpy as np
+
+    import engine
+    from result_cache import get_search_cache
+
+    eng = engine.get_engine()
+
+    def compute(centre: tuple[float, float], radius: float) -> tuple[Any, bool]:
+        rows = eng.rows_near(centre[0], centre[1], user.questions, radius)
+        if user.questions[3] != 'Any':
+            return _rows_with_stars(rows, int(user.questions[3].strip()[0]), on_rating, cancel, shared_ratings)
+        return rows, True
+
+    rows = get_search_cache().rows(eng.version, user.latitude, user.longitude, user.questions, compute)
+    ratings = None
+    if not shared_ratings:
+        ratings = np.zeros(len(rows)) if user.questions[3] == 'Any' else _star_ratings_of(rows)
+    return eng.ranked(user.latitude, user.longitude, user.questions, rows, ratings)
+
+
+def _rows_with_stars(rows: Any, stars: int, on_rating: Optional[Any] = None,
+                     cancel: Optional[threading.Event] = None, store: bool = True) -> tuple[Any, bool]:
+    """Return the rows whose Yelp star rating, rounded down, is stars, loading their ratings (and
+    storing them in the restaurant table if store), and whether every rating could be loaded
+    (rather than treated as unknown)."""
+    import numpy as np
+
+    if len(rows) == 0:
+        return rows, True
+    table = get_restaurant_table()
+    urls = [table.yelp_urls[r] for r in rows.tolist()]
+    callback = None
+    if on_rating is not None:
+        rows_of = {}
+        for row, url in zip(rows.tolist(), urls):
+            rows_of.setdefault(url, []).append(row)
+
+        def callback(url: str, rating: Optional[float]) -> None:
+            for row in rows_of.get(url, []):
+                on_rating(row, rating)
+    known = load_star_ratings(urls, on_rating=callback, cancel=cancel)
+    if cancel is not None and cancel.is_set():
+        raise SearchCancelled()
+    ratings = np.array([_rating_or_placeholder(url, known, math.nan) for url in urls], dtype=np.float64)
+    if store:
+        table.star_ratings[rows] = ratings
+    complete = all(url in known or not _fetchable(url) for url in urls)
+    with np.errstate(invalid='ignore'):
+        return rows[np.floor(ratings) == stars], complete
+
+
+def _star_ratings_of(rows: Any) -> Any:
+    """Return the star ratings of rows as the restaurant table holds them (NaN for no rating and
+    0.0 where it is unknown), loading them rather than reading the table."""
+    import numpy as np
+
+    table = get_restaurant_table()
+    urls = [table.yelp_urls[r] for r in rows.tolist()]
+    known = load_star_ratings(urls)
+    return np.array([_rating_or_placeholder(url, known, math.nan) for url in urls], dtype=np.float64)
 
-    # print('loading...')
 
-    if user.questions[3] != 'Any':
-        if len(possible_rests) > 15:
-            # for popular cuisines (like Pizza) this can be > 100 and get_star_rating will take too long to run :(
-            possible_rests = possible_rests[0:15]
+def run_restaurant_finder2(user: User) -> list[tuple[Restaurant, int]]:  # User object must be created first
+    """
+    Return a list of possible restaurants as Restaurant objects, best first.
+    """
+    results = search_restaurants(user)
+    rests = results.top(len(results))
+    user.recommendations.replace(rests)
+    return rests
 
-        load_stars(possible_rests)
-        r1 = [r for r in possible_rests if r[0].star_rating is not None]
-        rests = [rest for rest in r1 if math.floor(rest[0].star_rating) == int(user.questions[3][0])]
-    else:
-        rests = possible_rests
-
-    # q = 'yes'
-    if not rests:
-        return []
-        # q = 'no'
-    elif len(rests) == 1:
-        user.recommendations.append(rests[0][0])
+
+def run_restaurant_finder(user: User, k: Optional[int] = None) -> list[str]:  # User object must be created first
+    """
+    find restaurants for that user based on their requirements: the best k of them (the first page
+    of results if k is None), best first.
+    """
+    import ranking
+
+    rests = search_restaurants(user).top(ranking.PAGE_SIZE if k is None else k)
+    user.recommendations.replace(rests)
+    if len(rests) == 1:
         return [f'Restaurant: {rests[0][0].name}']
-    else:
-        recommend = []
-        for restaurant in rests:
-            user.recommendations.append(restaurant[0])
-            recommend.append(f'Restaurant: {restaurant[0].name}\n')
-        return recommend
+    return [f'Restaurant: {restaurant[0].name}\n' for restaurant in rests]
 
 
-def load_stars(rests: list[tuple[Restaurant, int]]) -> None:
+def load_stars(rests: list[tuple[Restaurant, int]], budget: Optional[float] = None) -> None:
     """Helper function for run_restaurant_finder that loads star ratings into the Restaurant objects.
     If the star rating cannot be found, use 0.0 as a placeholder.
     """
-    for r in rests:
-        if 'adredir' in DATA.iloc[r[1]]['Restaurant Yelp URL']:
-            r[0].star_rating = 0.0
-        else:
-            try:
-                r[0].star_rating = get_star_rating(DATA.iloc[r[1]]['Restaurant Yelp URL'])
-            except MissingSchema:
-                r[0].star_rating = 0.0
+    urls = get_restaurant_table().yelp_urls
+    ratings = get_star_ratings([urls[r[1]] for r in rests], budget)
+    for r, rating in zip(rests, ratings):
+        r[0].star_rating = rating
+
+
+# How long, in seconds, a search waits for star ratings before treating the rest as unknown
+RATING_BUDGET = 8.0
+
+
+def get_star_ratings(urls: list[str], budget: Optional[float] = None, on_rating: Optional[Any] = None,
+                     cancel: Optional[threading.Event] = None) -> list[Optional[float]]:
+    """Return the star rating on each Yelp page, 0.0 where the page cannot be fetched (ad redirects,
+    invalid urls, errors, or not fetched within budget seconds or before cancel is set) and None
+    where the page has no rating. See load_star_ratings.
+    """
+    known = load_star_ratings(urls, budget, on_rating, cancel)
+    return [_rating_or_placeholder(url, known, None) for url in urls]
+
+
+def load_star_ratings(urls: list[str], budget: Optional[float] = None, on_rating: Optional[Any] = None,
+                      cancel: Optional[threading.Event] = None) -> dict[str, Optional[float]]:
+    """Return the star rating (None for no rating) on each of the Yelp pages that could be
+    fetched, within budget seconds and before cancel is set; ad redirects are never fetched, and
+    pages that could not be fetched are left out.
+
+    Ratings are looked up in the persistent rating cache (see rating_cache.py) first; the pages
+    missing from it are fetched concurrently (see rating_fetcher.py) and what they return is added
+    to it, as are those of pages that were still being fetched when the budget ran out, once they
+    arrive. on_rating(url, rating) is called for each rating found in the cache, then, from a
+    worker thread, as each fetched rating arrives.
+    """
+    from rating_cache import get_rating_cache
+    from rating_fetcher import get_rating_fetcher
+
+    if budget is None:
+        budget = RATING_BUDGET
+    cache = get_rating_cache()
+    fetchable = [url for url in urls if _fetchable(url)]
+    known = {url: rating for url, (found, rating) in zip(fetchable, cache.get_many(fetchable)) if found}
+    missing = [url for url in fetchable if url not in known]
+    if on_rating is not None:
+        for url, rating in known.items():
+            on_rating(url, rating)
+    if missing:
+        fetched = get_rating_fetcher().fetch_many(missing, budget, on_rating, cancel,
+                                                  on_late=lambda url, rating: cache.put_many([(url, rating)]))
+        cache.put_many(list(fetched.items()))
+        known.update(fetched)
+    return known
+
+
+def _fetchable(url: str) -> bool:
+    """Return whether the star rating of the Yelp page at url is looked for (not for ad redirects)."""
+    return 'adredir' not in url
+
+
+def _rating_or_placeholder(url: str, known: dict[str, Optional[float]], no_rating: Optional[float]) -> Optional[float]:
+    """Return the rating of url in known: no_rating for a page with no rating, and 0.0 for a page
+    that was not (or could not be) fetched."""
+    if not _fetchable(url) or url not in known:
+        return 0.0
+    rating = known[url]
+    return no_rating if rating is None else rating
 
 
-def get_restaurant_info(user: User, restaurant: str, loc: bool, con: bool, review: bool) -> list:
-    """Display information about the restaurant recommended by run_restaurant_finder.
+def get_restaurant_info(user: User, restaurant: str, loc: bool, con: bool, review: bool,
+                        row: Optional[int] = None) -> list:
+    """Display information about the restaurant recommended by run_restaurant_finder: the one in
+    row if it is given, otherwise every recommended restaurant called restaurant.
 
     Preconditions:
     - len(lst) == len(data)
@@ -500,18 +697,22 @@ def get_restaurant_info(user: User, restaurant: str, loc: bool, con: bool, revie
 
     matches = []
 
-    for i in user.recommendations:
-        if i[0].name == restaurant and i[0].distance[0] == user.questions[2]:
-            clean_ad = i[0].address.replace("\n", " ")
-            loc_info, rev_info, con_info = '', '', ''
-            if loc:
-                loc_info = f'{i[0].name} is located {i[0].distance[1]} km away at {clean_ad}.'
-            if con:
-                con_info = f"{i[0].name}'s phone number is {i[0].contact[0]}, their website is {i[0].contact[1]}."
-            if review:
-                rating = get_info_hlpr(i)
-                rev_info = f"{i[0].name}'s Yelp rating is {rating}."
-            matches.append([loc_info, con_info, rev_info])
+    # the recommendations only hold the latest search, so their distance buckets need no checking
+    if row is not None:
+        found = [(user.recommendations.get(row), row)] if row in user.recommendations else []
+    else:
+        found = [i for i in user.recommendations.by_name(restaurant) if i[0].name == restaurant]
+    for i in found:
+        clean_ad = i[0].address.replace("\n", " ")
+        loc_info, rev_info, con_info = '', '', ''
+        if loc:
+            loc_info = f'{i[0].name} is located {i[0].distance[1]} km away at {clean_ad}.'
+        if con:
+            con_info = f"{i[0].name}'s phone number is {i[0].contact[0]}, their website is {i[0].contact[1]}."
+        if review:
+            rating = get_info_hlpr(i)
+            rev_info = f"{i[0].name}'s Yelp rating is {rating}."
+        matches.append([loc_info, con_info, rev_info])
 
     return matches
     # if len(matches) == 0:
@@ -532,8 +733,9 @@ def display_map_all_rests() -> None:
     # Not sure what to do about the FutureWarning... (the problem is from setting color='Category')
 
     #  color_scale = [(0, 'orange'), (1, 'red')]
+    import plotly.express as px
 
-    fig = px.scatter_mapbox(DATA,
+    fig = px.scatter_mapbox(get_data(),
                             lat="Restaurant Latitude",
                             lon="Restaurant Longitude",
                             hover_name="Restaurant Name",
@@ -552,14 +754,19 @@ def display_map_all_rests() -> None:
 
 def display_map_recommended(u: User) -> None:
     """Display an interactive map of the user's recommended restaurants from the dataset."""
-    indices = [y[1] for y in u.recommendations]
-    new_df = DATA.iloc[[indices[0]]]
+    recommended_map_figure(u.latitude, u.longitude, u.recommendations.rows()).show()
+
+
+def recommended_map_figure(latitude: float, longitude: float, rows: list[int]) -> Any:
+    """Return an interactive map (a plotly figure) of the restaurants in the given rows of the
+    dataset and of the user's location (latitude, longitude)."""
+    import pandas as pd
+    import plotly.express as px
 
-    for i in indices[1:]:
-        current_row = DATA.iloc[[i]]
-        new_df = pd.concat([current_row, new_df])
+    # one selection instead of a concat per restaurant; the rows keep the (reversed) order they always had
+    new_df = get_data().iloc[rows[::-1]]
 
-    user_row = pd.DataFrame({'Restaurant Latitude': [u.latitude], 'Restaurant Longitude': [u.longitude],
+    user_row = pd.DataFrame({'Restaurant Latitude': [latitude], 'Restaurant Longitude': [longitude],
                              'Restaurant Name': ['Your Location'], 'Category': ['You']})
     new_df = pd.concat([user_row, new_df])
     fig = px.scatter_mapbox(new_df,
@@ -576,7 +783,36 @@ def display_map_recommended(u: User) -> None:
 
     fig.update_layout(mapbox_style="open-street-map")
     fig.update_layout(margin={"r": 0, "t": 0, "l": 0, "b": 0})
-    fig.show()
+    return fig
+
+
+def write_map_recommended(latitude: float, longitude: float, rows: list[int]) -> str:
+    """Write the map of recommended_map_figure to a new HTML file, which a web browser can open,
+    and return its path. The file is removed when the program exits."""
+    import tempfile
+
+    with tempfile.NamedTemporaryFile('w', suffix='.html', prefix='food_finder_map_', delete=False) as f:
+        with _MAP_FILES_LOCK:
+            if not _MAP_FILES:
+                import atexit
+                atexit.register(_remove_map_files)
+            _MAP_FILES.append(f.name)
+        recommended_map_figure(latitude, longitude, rows).write_html(f)
+    return f.name
+
+
+def _remove_map_files() -> None:
+    """Remove the HTML files written by write_map_recommended."""
+    import os
+
+    with _MAP_FILES_LOCK:
+        paths = _MAP_FILES[:]
+        _MAP_FILES.clear()
+    for path in paths:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
 
 
 # TEST WITH:
@@ -617,7 +853,10 @@ if __name__ == '__main__':
 
     doctest.testmod(verbose=True)
 
-    import1 = ['hashlib', 'plotly.express', 'requests.exceptions', 'geopy', 'pandas', 'csv', 'math']
+    import1 = ['hashlib', 'snapshot', 'engine', 'restaurant_table', 'recommendations', 'name_index', 'prefix_index',
+               'bitmap_index', 'distances', 'ranking', 'result_cache', 'numpy', 'geocoding', 'gazetteer', 'geopy.exc',
+               'rating_cache', 'rating_fetcher', 'rating_extractor', 'plotly.express', 'tempfile', 'atexit',
+               'os', 'requests.exceptions', 'geopy', 'pandas', 'csv', 'math', 'threading']
     import2 = ['typing', '__future__', 'MissingSchema', 'geopy.geocoders', 'requests']
     imports = import1 + import2
 
@@ -0,0 +1,162 @@
+"""On-demand loading of restaurant details and maps, for the GUI.
+
+The More Info panel of a restaurant may fetch its Yelp page, and the map of the recommended
+restaurants is a plotly figure written to an HTML file; neither is worth doing until the user
+asks for it, and neither should run on the Tk thread. DetailLoader computes them on a small
+thread pool when they are first requested and keeps the results (least recently used first out),
+so asking again for the same details or map is answered at once. Completed results are handed
+back to the GUI thread by poll(), which the GUI calls from an after() callback.
+"""
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Hashable
+
+
+class DetailLoader:
+    """Computes values on a thread pool, once per key, and keeps the most recent ones.
+
+    Instance Attributes:
+        - max_entries: the most results kept
+        - hits: the number of requests answered from the kept results
+        - misses: the number of requests that had to be computed
+
+    Representation Invariants:
+        - self.max_entries > 0
+        - len(self._results) <= self.max_entries
+        - not any(key in self._results for key in self._pending)
+    """
+    # Private Instance Attributes:
+    #   - _results: (succeeded, value or exception) of each computed key, least recently used first
+    #   - _pending: the callbacks waiting for each key being computed
+    #   - _done: (key, succeeded, value or exception) of the computations finished but not yet polled
+    #   - _lock: guards _results and _pending
+    #   - _executor: the threads computing the values
+    max_entries: int
+    hits: int
+    misses: int
+    _results: OrderedDict[Hashable, tuple[bool, Any]]
+    _pending: dict[Hashable, list[Callable[[bool, Any], None]]]
+    _done: queue.Queue
+    _lock: threading.Lock
+    _executor: ThreadPoolExecutor
+
+    def __init__(self, max_entries: int = 128, max_workers: int = 2) -> None:
+        """Initialize a loader with nothing loaded."""
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._results = OrderedDict()
+        self._pending = {}
+        self._done = queue.Queue()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='detail-loader')
+
+    def request(self, key: Hashable, compute: Callable[[], Any], on_done: Callable[[bool, Any], None]) -> bool:
+        """Ask for the value of key, computed by compute() if it is not already known.
+
+        on_done(succeeded, value) is called with the value, or with (False, the exception) if
+        compute raised one: at once if the value is known, otherwise from poll() once compute has
+        finished. A key being computed is not computed a second time. Return whether the value
+        was already known.
+
+        >>> loader = DetailLoader()
+        >>> seen = []
+        >>> loader.request('a', lambda: 1, lambda ok, value: seen.append(value))
+        False
+        >>> loader.wait()
+        >>> loader.poll()
+        1
+        >>> loader.request('a', lambda: 2, lambda ok, value: seen.append(value))
+        True
+        >>> seen
+        [1, 1]
+        """
+        with self._lock:
+            result = self._results.get(key)
+            if result is not None:
+                self._results.move_to_end(key)
+                self.hits += 1
+            elif key in self._pending:
+                self._pending[key].append(on_done)
+                return False
+            else:
+                self.misses += 1
+                self._pending[key] = [on_done]
+                self._executor.submit(self._compute, key, compute)
+                return False
+        on_done(*result)
+        return True
+
+    def _compute(self, key: Hashable, compute: Callable[[], Any]) -> None:
+        """Compute the value of key on a pool thread and queue it for poll()."""
+        try:
+            self._done.put((key, True, compute()))
+        except Exception as e:  # reported to the GUI rather than lost in the pool thread
+            self._done.put((key, False, e))
+
+    def poll(self) -> int:
+        """Hand the values computed since the last call to the callbacks waiting for them.
+        Return the number of values handed out.
+
+        Meant to be called from the GUI thread.
+        """
+        handled = 0
+        while True:
+            try:
+                key, succeeded, value = self._done.get_nowait()
+            except queue.Empty:
+                return handled
+            with self._lock:
+                callbacks = self._pending.pop(key, [])
+                if succeeded:
+                    # failures are not kept, so asking again retries
+                    self._results[key] = (succeeded, value)
+                    while len(self._results) > self.max_entries:
+                        self._results.popitem(last=False)
+            for on_done in callbacks:
+                on_done(succeeded, value)
+            handled += 1
+
+    def busy(self) -> bool:
+        """Return whether any value is being computed or waiting to be polled."""
+        with self._lock:
+            return bool(self._pending)
+
+    def wait(self) -> None:
+        """Wait until every value asked for so far has been computed (but not polled)."""
+        while True:
+            with self._lock:
+                waiting = len(self._pending)
+            if self._done.qsize() >= waiting:
+                return
+            time.sleep(0.01)
+
+    def clear(self) -> None:
+        """Forget every value computed so far."""
+        with self._lock:
+            self._results.clear()
+
+    def close(self) -> None:
+        """Stop the pool threads once the values being computed are done."""
+        self._executor.shutdown(wait=False)
+
+
+###################################################################################################
+# Main block
+###################################################################################################
+if __name__ == '__main__':
+    import doctest
+
+    doctest.testmod(verbose=True)
+
+    import python_ta
+
+    python_ta.check_all(config={
+        'max-line-length': 120,
+        'extra-imports': ['queue', 'threading', 'time', 'collections', 'concurrent.futures']
+    })
@@ -0,0 +1,105 @@
+"""Great-circle distance engine shared by every distance computation in the program.
+
+Distances use the haversine formula, which stays accurate for points that are very close
+together (the spherical law of cosines, math.acos(sin * sin + cos * cos * cos), loses most of
+its precision there and can fail with a math domain error for identical points).
+
+    - haversine_km: one pair of points
+    - one_to_many: one point to an array of points, in one vectorized call
+    - many_to_many: the full distance matrix between two arrays of points, computed in chunks of
+      rows so the temporaries stay small for large matrices
+
+The array functions take a dtype: float32 halves the memory and is 2-3x faster for large inputs,
+at the cost of precision (float32 coordinates are only exact to about half a metre).
+"""
+from __future__ import annotations
+
+import math
+from typing import Any, Iterator, Optional
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371
+
+# Rows of a many-to-many matrix computed at once: keeps each chunk's temporaries around 8 MB
+DEFAULT_CHUNK_ELEMENTS = 1 << 20
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Return the distance in km between (lat1, lon1) and (lat2, lon2).
+
+    >>> haversine_km(43.6532, -79.3832, 43.6532, -79.3832)
+    0.0
+    >>> round(haversine_km(43.6532, -79.3832, 43.6532, -79.3), 4)
+    6.6937
+    """
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    a = (math.sin((phi2 - phi1) / 2) ** 2
+         + math.cos(phi1) * math.cos(phi2) * math.sin(math.radians(lon2 - lon1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(min(1.0, a)))
+
+
+def one_to_many(lat: float, lon: float, lats: Any, lons: Any, dtype: Any = np.float64) -> np.ndarray:
+    """Return the distance in km from (lat, lon) to each point (lats[i], lons[i]).
+
+    >>> one_to_many(43.6532, -79.3832, [43.6532, 43.6532], [-79.3832, -79.3]).round(4).tolist()
+    [0.0, 6.6937]
+    """
+    phi = np.radians(np.asarray(lats, dtype=dtype))
+    lam = np.radians(np.asarray(lons, dtype=dtype))
+    phi0, lam0 = math.radians(lat), math.radians(lon)
+    a = (np.sin((phi - dtype(phi0)) / 2) ** 2
+         + dtype(math.cos(phi0)) * np.cos(phi) * np.sin((lam - dtype(lam0)) / 2) ** 2)
+    return (2 * EARTH_RADIUS_KM) * np.arcsin(np.sqrt(np.minimum(a, 1)))
+
+
+def iter_many_to_many(lats1: Any, lons1: Any, lats2: Any, lons2: Any, dtype: Any = np.float64,
+                      chunk_rows: Optional[int] = None) -> Iterator[tuple[int, np.ndarray]]:
+    """Yield (first row, block) pairs covering the distance matrix between the points of 1 (rows)
+    and the points of 2 (columns), chunk_rows rows at a time. Only one block is in memory at once.
+    """
+    phi1 = np.radians(np.asarray(lats1, dtype=dtype))[:, None]
+    lam1 = np.radians(np.asarray(lons1, dtype=dtype))[:, None]
+    phi2 = np.radians(np.asarray(lats2, dtype=dtype))[None, :]
+    lam2 = np.radians(np.asarray(lons2, dtype=dtype))[None, :]
+    cos2 = np.cos(phi2)
+    if chunk_rows is None:
+        chunk_rows = max(1, DEFAULT_CHUNK_ELEMENTS // max(1, phi2.shape[1]))
+    for start in range(0, phi1.shape[0], chunk_rows):
+        p1, l1 = phi1[start:start + chunk_rows], lam1[start:start + chunk_rows]
+        a = np.sin((phi2 - p1) / 2) ** 2 + np.cos(p1) * cos2 * np.sin((lam2 - l1) / 2) ** 2
+        np.minimum(a, 1, out=a)
+        np.sqrt(a, out=a)
+        np.arcsin(a, out=a)
+        a *= 2 * EARTH_RADIUS_KM
+        yield start, a
+
+
+def many_to_many(lats1: Any, lons1: Any, lats2: Any, lons2: Any, dtype: Any = np.float64,
+                 chunk_rows: Optional[int] = None) -> np.ndarray:
+    """Return the matrix of distances in km whose entry [i, j] is the distance from point i of 1 to
+    point j of 2, computed chunk_rows rows at a time.
+
+    >>> many_to_many([43.6532, 43.7], [-79.3832, -79.4], [43.6532], [-79.3]).round(4).tolist()
+    [[6.6937], [9.579]]
+    """
+    result = np.empty((len(lats1), len(lats2)), dtype=dtype)
+    for start, block in iter_many_to_many(lats1, lons1, lats2, lons2, dtype, chunk_rows):
+        result[start:start + len(block)] = block
+    return result
+
+
+###################################################################################################
+# Main block
+###################################################################################################
+if __name__ == '__main__':
+    import doctest
+
+    doctest.testmod(verbose=True)
+
+    import python_ta
+
+    python_ta.check_all(config={
+        'max-line-length': 120,
+        'extra-imports': ['math', 'numpy']
+    })
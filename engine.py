@@ -0,0 +1,207 @@
+"""Query engine for the restaurant finder.
+
+The price range and cuisine levels of the decision tree do not depend on the user, so they are
+built once per dataset version and shared by every search in the process. Only the distance
+level depends on where the user is; it is applied at query time, to the rows under the matching
+(price range, cuisine) branch only. The bounded distance buckets ('Under 1 km', '1-5 km') are
+served by a spatial index, so they only look at restaurants near the user.
+"""
+from __future__ import annotations
+
+import math
+import threading
+from typing import Optional, Union
+
+import numpy as np
+
+import computations
+from bitmap_index import BitmapIndex
+from ranking import RankedResults
+from restaurant_table import RestaurantRow, RestaurantTable
+from spatial_index import SpatialIndex
+
+_ENGINES: dict[str, SearchEngine] = {}
+_ENGINES_LOCK = threading.Lock()
+
+# The (lowest, highest) distance in km of each entry of computations.DISTANCE_BUCKETS
+BUCKET_LIMITS = [(0.0, 1.0), (1.0, 5.0), (5.0, math.inf)]
+
+# A search criterion: one value, a list of values (any of which matches), or 'Any'
+Selection = Union[str, list[str]]
+
+# Below this many candidate rows one distance pass over all of them is cheaper than the
+# spatial index lookup
+SPATIAL_INDEX_MIN_ROWS = 2048
+
+
+class SearchEngine:
+    """A price range -> cuisine decision tree over a RestaurantTable.
+
+    Instance Attributes:
+        - table: the restaurants being searched
+        - version: the version (content hash) of the dataset the table was built from
+        - spatial: spatial index over the restaurants' coordinates
+        - price_index: bitmap index over the restaurants' price ranges
+        - cuisine_index: bitmap index over the restaurants' cuisines
+
+    Representation Invariants:
+        - the leaves of self._tree are row numbers of self.table
+    """
+    # Private Instance Attributes:
+    #   - _tree: decision tree whose levels are price range, cuisine, then row number
+    table: RestaurantTable
+    version: str
+    spatial: SpatialIndex
+    price_index: BitmapIndex
+    cuisine_index: BitmapIndex
+    _tree: computations.Tree
+
+    def __init__(self, table: RestaurantTable, version: str = '') -> None:
+        """Build the decision tree over every row of table."""
+        self.table = table
+        self.version = version
+        self._tree = computations.Tree('', [])
+        prices = [table.price_ranges[c] for c in table.price_codes.tolist()]
+        cuisines = [table.cuisines[c] for c in table.cuisine_codes.tolist()]
+        for i in range(len(table)):
+            self._tree.insert_sequence([prices[i], cuisines[i], i])
+        self.spatial = SpatialIndex(table.latitudes, table.longitudes)
+        self.price_index = BitmapIndex(table.price_codes, len(table.price_ranges))
+        self.cuisine_index = BitmapIndex(table.cuisine_codes, len(table.cuisines))
+
+    def candidates(self, price: Selection, cuisine: Selection) -> np.ndarray:
+        """Return the rows with the given price range(s) and cuisine(s), in dataset order.
+
+        Each criterion is a value, a list of values (any of which matches) or 'Any'; values are
+        matched ignoring case. A single price range and cuisine are looked up in the decision tree,
+        anything else is resolved with the bitmap indexes.
+        """
+        prices = _codes_of(self.table.price_ranges, price)
+        cuisines = _codes_of(self.table.cuisines, cuisine)
+        if prices is not None and cuisines is not None and len(prices) == len(cuisines) == 1:
+            if prices[0] < 0 or cuisines[0] < 0:
+                return np.empty(0, dtype=np.int64)
+            return np.array(self._tree.traverse_dec_tree([self.table.price_ranges[prices[0]],
+                                                          self.table.cuisines[cuisines[0]]]), dtype=np.int64)
+        return self.price_index.rows(self.price_index.any_of(prices) & self.cuisine_index.any_of(cuisines))
+
+    def candidate_mask(self, price: Optional[Selection] = None,
+                       cuisine: Optional[Selection] = None) -> Optional[np.ndarray]:
+        """Return a boolean mask over the table's rows selecting the given price range(s) and
+        cuisine(s), as in candidates. A criterion left as None matches every row; None is returned
+        if both match every row.
+        """
+        prices = None if price is None else _codes_of(self.table.price_ranges, price)
+        cuisines = None if cuisine is None else _codes_of(self.table.cuisines, cuisine)
+        if prices is None and cuisines is None:
+            return None
+        return self.price_index.mask(self.price_index.any_of(prices) & self.cuisine_index.any_of(cuisines))
+
+    def ranked(self, latitude: float, longitude: float, answers: list[str],
+               rows: Optional[np.ndarray] = None, ratings: Optional[np.ndarray] = None) -> RankedResults:
+        """Return the restaurants matching answers (price range, cuisine, distance bucket, ...) for a
+        user at (latitude, longitude), ranked by distance, star rating and price fit (see ranking.py).
+
+        If rows is given, only those rows (in dataset order) are considered, and they are assumed to
+        match the price range and cuisine; their distance bucket is still checked exactly. ratings,
+        if given, are the star ratings of rows to rank them by, instead of the table's.
+        """
+        if answers[2] not in computations.DISTANCE_BUCKETS:
+            return RankedResults(self.table, np.empty(0, dtype=np.int64), np.empty(0), answers[0])
+        bucket = computations.DISTANCE_BUCKETS.index(answers[2])
+        if rows is None:
+            rows = self.rows_near(latitude, longitude, answers)
+        distances, buckets = computations.get_distances_from_user(self.table.latitudes[rows],
+                                                                  self.table.longitudes[rows], (latitude, longitude))
+        keep = buckets == bucket
+        return RankedResults(self.table, rows[keep], distances[keep], answers[0],
+                             None if ratings is None else ratings[keep])
+
+    def rows_near(self, latitude: float, longitude: float, answers: list[str], slack_km: float = 0.0) -> np.ndarray:
+        """Return, in dataset order, the rows with the price range and cuisine in answers that are in
+        the distance bucket in answers as seen from some point at most slack_km from (latitude,
+        longitude). Rows near the bucket's limits may be included even when they are not.
+        """
+        if answers[2] not in computations.DISTANCE_BUCKETS:
+            return np.empty(0, dtype=np.int64)
+        low, high = BUCKET_LIMITS[computations.DISTANCE_BUCKETS.index(answers[2])]
+        low, high = low - slack_km, high + slack_km
+        rows = self.candidates(answers[0], answers[1])
+        if math.isinf(high) or len(rows) < SPATIAL_INDEX_MIN_ROWS:
+            distances, _ = computations.get_distances_from_user(self.table.latitudes[rows],
+                                                                self.table.longitudes[rows], (latitude, longitude))
+        else:
+            mask = np.zeros(len(self.table), dtype=bool)
+            mask[rows] = True
+            rows, distances = self.spatial.within_radius(latitude, longitude, high, mask)
+        return rows[(distances >= low) & (distances <= high)]
+
+    def within_radius(self, latitude: float, longitude: float, km: float, price: Optional[Selection] = None,
+                      cuisine: Optional[Selection] = None) -> list[tuple[RestaurantRow, int]]:
+        """Return the restaurants at most km away from (latitude, longitude) with the given price range
+        and cuisine (None matches any), in dataset order.
+        """
+        rows, distances = self.spatial.within_radius(latitude, longitude, km, self.candidate_mask(price, cuisine))
+        buckets = computations.get_distance_buckets(distances)
+        return [(r, r.row_id) for r in self.table.rows(rows, distances, buckets)]
+
+    def nearest(self, latitude: float, longitude: float, k: int, price: Optional[Selection] = None,
+                cuisine: Optional[Selection] = None) -> list[tuple[RestaurantRow, int]]:
+        """Return the k restaurants closest to (latitude, longitude) with the given price range and
+        cuisine (None matches any), closest first.
+        """
+        rows, distances = self.spatial.nearest(latitude, longitude, k, self.candidate_mask(price, cuisine))
+        buckets = computations.get_distance_buckets(distances)
+        return [(r, r.row_id) for r in self.table.rows(rows, distances, buckets)]
+
+
+def _codes_of(values: list[str], selection: Selection) -> Optional[list[int]]:
+    """Return the positions in values of the selected values, ignoring case and extra spaces, with -1
+    for values that are not there. Return None if the selection is 'Any'.
+
+    >>> _codes_of(['Thai', 'Asian Fusion'], ['asian  fusion', 'Vietnamese'])
+    [1, -1]
+    >>> _codes_of(['Thai'], 'any') is None
+    True
+    """
+    if isinstance(selection, str):
+        selection = [selection]
+    positions = {value.casefold(): i for i, value in enumerate(values)}
+    codes = []
+    for value in selection:
+        value = ' '.join(value.split()).casefold()
+        if value == 'any':
+            return None
+        codes.append(positions.get(value, -1))
+    return codes
+
+
+def get_engine() -> SearchEngine:
+    """Return the process-wide engine for the currently loaded dataset, building it on first use."""
+    version = computations.get_data_version()
+    engine = _ENGINES.get(version)
+    if engine is None:
+        with _ENGINES_LOCK:
+            engine = _ENGINES.get(version)
+            if engine is None:
+                engine = SearchEngine(computations.get_restaurant_table(), version)
+                _ENGINES.clear()
+                _ENGINES[version] = engine
+    return engine
+
+
+###################################################################################################
+# Main block
+###################################################################################################
+if __name__ == '__main__':
+    import doctest
+
+    doctest.testmod(verbose=True)
+
+    import python_ta
+
+    python_ta.check_all(config={
+        'max-line-length': 120,
+        'extra-imports': ['math', 'threading', 'numpy', 'computations', 'bitmap_index', 'ranking', 'restaurant_table',
+                          'spatial_index']
+    })
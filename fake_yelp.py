@@ -0,0 +1,124 @@
+"""A local stand-in for Yelp business pages, for benchmarking the star-rating code offline.
+
+FakeYelpServer serves /biz/<slug> pages on 127.0.0.1. Each page carries the rating given for
+its slug in the same aria-label="4.5 star rating" form get_star_rating looks for, behind a
+configurable amount of filler markup; slugs with no rating get a page with none. Each request
+can be delayed by a fixed latency, and the server counts the requests it answers.
+
+    with FakeYelpServer({'pizza-place': 4.5}, latency=0.05) as server:
+        computations.get_star_rating(server.url('pizza-place'))
+"""
+from __future__ import annotations
+
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+FILLER = '<div class="filler" aria-label="Photo of the business">lorem ipsum dolor sit amet</div>\n'
+
+
+def make_page(rating: Optional[float], filler_bytes: int = 20000) -> str:
+    """Return a fake business page with the given rating (None for no rating) placed after about
+    filler_bytes of markup.
+
+    >>> page = make_page(4.5, 0)
+    >>> 'aria-label="4.5 star rating"' in page
+    True
+    """
+    filler = FILLER * (filler_bytes // len(FILLER))
+    rating_html = '' if rating is None else f'<div aria-label="{rating} star rating" role="img"></div>\n'
+    return f'<html><head><title>Fake Yelp</title></head><body>\n{filler}{rating_html}{filler}</body></html>\n'
+
+
+class _QuietServer(ThreadingHTTPServer):
+    """A ThreadingHTTPServer that ignores clients hanging up early (e.g. once they found a rating)."""
+    daemon_threads = True
+
+    def handle_error(self, request: object, client_address: object) -> None:
+        """Ignore dropped connections; report anything else as usual."""
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+class FakeYelpServer:
+    """A threaded HTTP server on localhost serving fake Yelp business pages.
+
+    Instance Attributes:
+        - ratings: the rating served for each slug; slugs not in it get a page without a rating
+        - latency: seconds each request is delayed before it is answered
+        - filler_bytes: the size of the filler markup before (and after) the rating
+        - requests: the number of requests answered so far
+    """
+    ratings: dict[str, Optional[float]]
+    latency: float
+    filler_bytes: int
+    requests: int
+    _server: ThreadingHTTPServer
+    _thread: Optional[threading.Thread]
+    _lock: threading.Lock
+
+    def __init__(self, ratings: dict[str, Optional[float]], latency: float = 0.0, filler_bytes: int = 20000) -> None:
+        """Create the server on a free port of 127.0.0.1 (call start() to serve)."""
+        self.ratings = ratings
+        self.latency = latency
+        self.filler_bytes = filler_bytes
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._thread = None
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            """Answers GET /biz/<slug> with the fake page for slug."""
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self) -> None:
+                """Serve one page."""
+                with fake._lock:
+                    fake.requests += 1
+                if fake.latency:
+                    time.sleep(fake.latency)
+                slug = self.path.split('?')[0].rstrip('/').rsplit('/', 1)[-1]
+                body = make_page(fake.ratings.get(slug), fake.filler_bytes).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args: object) -> None:
+                """Do not log requests."""
+
+        self._server = _QuietServer(('127.0.0.1', 0), Handler)
+
+    def url(self, slug: str) -> str:
+        """Return the url of the page for slug."""
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}/biz/{slug}'
+
+    def start(self) -> FakeYelpServer:
+        """Start serving on a background thread."""
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop serving and close the socket."""
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> FakeYelpServer:
+        return self.start()
+
+    def __exit__(self, *exc: object) -> None:
+        self.stop()
+
+
+###################################################################################################
+# Main block
+###################################################################################################
+if __name__ == '__main__':
+    import doctest
+
+    doctest.testmod(verbose=True)
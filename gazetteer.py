@@ -0,0 +1,221 @@
+"""Offline geocoder built from the restaurant addresses in the dataset.
+
+Every restaurant address comes with its latitude and longitude, and most end with a postal code
+("Toronto, ON M5R 1A9"). The gazetteer indexes:
+    - the normalised street line of each address that starts with a house number ("14 prince
+      arthur ave"); lines without one, such as landmarks ("yorkdale shopping centre") or a bare city
+      ("Toronto, ON M7A"), say too little to be placed by
+    - the centroid of the restaurants in each postal code, and in each forward sortation area
+      (the first three characters of the postal code, e.g. "M5R")
+
+A street line shared by restaurants more than MAX_STREET_SPREAD_KM apart (the same number on
+two streets of that name, or a data entry error) is left out too, rather than placed in between.
+
+An address is matched against the street index exactly, then fuzzily (among streets with the
+same house number), then by the postal code or forward sortation area it contains.
+"""
+from __future__ import annotations
+
+import difflib
+import re
+import threading
+from typing import Any, NamedTuple, Optional
+
+from distances import haversine_km
+from geocoding import normalize_address
+
+POSTAL_CODE = re.compile(r'\b([ABCEGHJ-NPRSTVXY]\d[ABCEGHJ-NPRSTV-Z])[ -]?(\d[ABCEGHJ-NPRSTV-Z]\d)?\b', re.IGNORECASE)
+
+# How similar (0 to 1) a street has to be to a known one to count as a fuzzy match
+FUZZY_CUTOFF = 0.85
+
+# Restaurants on the same street line further apart than this (in km) are not one address
+MAX_STREET_SPREAD_KM = 1.0
+
+HOUSE_NUMBER = re.compile(r'\d+[a-z]?')
+
+_GAZETTEERS: dict[str, Gazetteer] = {}
+_GAZETTEERS_LOCK = threading.Lock()
+
+
+class GazetteerMatch(NamedTuple):
+    """The result of a gazetteer lookup.
+
+    kind is how it was matched: 'address', 'fuzzy', 'postal code' or 'area' (forward sortation
+    area); score is the similarity of the matched street for fuzzy matches, and 1.0 otherwise.
+    """
+    latitude: float
+    longitude: float
+    kind: str
+    score: float
+
+
+def street_line(address: str) -> str:
+    """Return the normalised street part of an address: its first line, or what comes before the
+    first comma.
+
+    >>> street_line('14 Prince Arthur Avenue\\nToronto, ON M5R 1A9')
+    '14 prince arthur ave'
+    >>> street_line('14 prince arthur ave., Toronto, Ontario')
+    '14 prince arthur ave'
+    """
+    return normalize_address(re.split(r'[\n,]', address.strip(), maxsplit=1)[0])
+
+
+def postal_code(address: str) -> tuple[Optional[str], Optional[str]]:
+    """Return the (postal code, forward sortation area) in address, either of which may be None.
+
+    >>> postal_code('Toronto, ON M5R 1A9')
+    ('M5R1A9', 'M5R')
+    >>> postal_code('259 Wellington St W, Toronto, ON M5V')
+    (None, 'M5V')
+    """
+    matches = list(POSTAL_CODE.finditer(address))
+    if not matches:
+        return None, None
+    fsa, ldu = matches[-1].group(1).upper(), matches[-1].group(2)
+    return (fsa + ldu.upper() if ldu else None), fsa
+
+
+class Gazetteer:
+    """An index from addresses to coordinates.
+
+    Representation Invariants:
+        - every key of self._by_number is the house number of some street in self._streets
+    """
+    # Private Instance Attributes:
+    #   - _streets: coordinates of each normalised street line
+    #   - _by_number: the normalised street lines grouped by house number (first word)
+    #   - _postal_codes: centroid of each postal code
+    #   - _areas: centroid of each forward sortation area
+    _streets: dict[str, tuple[float, float]]
+    _by_number: dict[str, list[str]]
+    _postal_codes: dict[str, tuple[float, float]]
+    _areas: dict[str, tuple[float, float]]
+
+    def __init__(self, addresses: list[str], latitudes: list[float], longitudes: list[float]) -> None:
+        """Build the gazetteer from parallel lists of addresses and their coordinates."""
+        streets, postal_codes, areas = {}, {}, {}
+        for address, lat, lon in zip(addresses, latitudes, longitudes):
+            street = street_line(address)
+            if has_house_number(street):
+                _add(streets, street, lat, lon)
+            code, fsa = postal_code(address)
+            if code:
+                _add(postal_codes, code, lat, lon)
+            if fsa:
+                _add(areas, fsa, lat, lon)
+        self._streets = _centroids({street: points for street, points in streets.items()
+                                    if _spread_km(points) <= MAX_STREET_SPREAD_KM})
+        self._postal_codes = _centroids(postal_codes)
+        self._areas = _centroids(areas)
+        self._by_number = {}
+        for street in self._streets:
+            self._by_number.setdefault(street.split(' ', 1)[0], []).append(street)
+
+    @classmethod
+    def from_table(cls, table: Any) -> Gazetteer:
+        """Return the gazetteer of the addresses in a restaurant_table.RestaurantTable."""
+        return cls([table.addresses[i] for i in range(len(table))], table.latitudes.tolist(),
+                   table.longitudes.tolist())
+
+    def __len__(self) -> int:
+        """Return the number of distinct streets in the gazetteer."""
+        return len(self._streets)
+
+    def lookup(self, address: str) -> Optional[GazetteerMatch]:
+        """Return the best match for address, or None if it cannot be placed.
+
+        >>> g = Gazetteer(['14 Prince Arthur Avenue\\nToronto, ON M5R 1A9'], [43.67], [-79.39])
+        >>> g.lookup('14 prince arthur ave, Toronto')
+        GazetteerMatch(latitude=43.67, longitude=-79.39, kind='address', score=1.0)
+        >>> g.lookup('14 Prince Arhtur Avenue').kind
+        'fuzzy'
+        >>> g.lookup('1 Bloor St, Toronto, ON M5R 2A1').kind
+        'area'
+        >>> g.lookup('1 Bloor St, Toronto') is None
+        True
+
+        A bare city is not a street, so it is placed by its postal code:
+
+        >>> g = Gazetteer(['Toronto, ON M5V 2T6', '1 Blue Jays Way\\nToronto, ON M5V 2T6', 'Toronto, ON M4Y 1Z3'],
+        ...               [43.64, 43.64, 43.66], [-79.39, -79.39, -79.38])
+        >>> g.lookup('Toronto, ON M5V 2T6')
+        GazetteerMatch(latitude=43.64, longitude=-79.39, kind='postal code', score=1.0)
+        >>> g.lookup('Toronto') is None
+        True
+        """
+        street = street_line(address)
+        if street in self._streets:
+            return GazetteerMatch(*self._streets[street], 'address', 1.0)
+        number = street.split(' ', 1)[0]
+        if has_house_number(street):
+            close = difflib.get_close_matches(street, self._by_number.get(number, []), n=1, cutoff=FUZZY_CUTOFF)
+            if close:
+                score = difflib.SequenceMatcher(None, street, close[0]).ratio()
+                return GazetteerMatch(*self._streets[close[0]], 'fuzzy', score)
+        code, fsa = postal_code(address)
+        if code in self._postal_codes:
+            return GazetteerMatch(*self._postal_codes[code], 'postal code', 1.0)
+        if fsa in self._areas:
+            return GazetteerMatch(*self._areas[fsa], 'area', 1.0)
+        return None
+
+
+def has_house_number(street: str) -> bool:
+    """Return whether a normalised street line starts with a house number.
+
+    >>> has_house_number('14 prince arthur ave'), has_house_number('toronto')
+    (True, False)
+    """
+    return HOUSE_NUMBER.fullmatch(street.split(' ', 1)[0]) is not None
+
+
+def _add(groups: dict[str, list], key: str, lat: float, lon: float) -> None:
+    """Add the point (lat, lon) to the group for key."""
+    if key:
+        groups.setdefault(key, []).append((lat, lon))
+
+
+def _spread_km(points: list[tuple[float, float]]) -> float:
+    """Return the greatest distance in km between any two of points."""
+    return max((haversine_km(a[0], a[1], b[0], b[1]) for i, a in enumerate(points) for b in points[i + 1:]),
+               default=0.0)
+
+
+def _centroids(groups: dict[str, list[tuple[float, float]]]) -> dict[str, tuple[float, float]]:
+    """Return the mean point of each group."""
+    return {key: (sum(p[0] for p in points) / len(points), sum(p[1] for p in points) / len(points))
+            for key, points in groups.items()}
+
+
+def get_gazetteer() -> Gazetteer:
+    """Return the gazetteer of the loaded dataset, building it on first use."""
+    import computations
+
+    version = computations.get_data_version()
+    gazetteer = _GAZETTEERS.get(version)
+    if gazetteer is None:
+        with _GAZETTEERS_LOCK:
+            gazetteer = _GAZETTEERS.get(version)
+            if gazetteer is None:
+                gazetteer = Gazetteer.from_table(computations.get_restaurant_table())
+                _GAZETTEERS.clear()
+                _GAZETTEERS[version] = gazetteer
+    return gazetteer
+
+
+###################################################################################################
+# Main block
+###################################################################################################
+if __name__ == '__main__':
+    import doctest
+
+    doctest.testmod(verbose=True)
+
+    import python_ta
+
+    python_ta.check_all(config={
+        'max-line-length': 120,
+        'extra-imports': ['difflib', 're', 'threading', 'distances', 'geocoding', 'computations']
+    })
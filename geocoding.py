@@ -0,0 +1,200 @@
+"""Geocoding service used by get_coords and get_user_info.
+
+GeocodingService:
+    - reuses a single Nominatim geocoder
+    - caches results on disk (sqlite), keyed by the normalised address, with a time to live;
+      addresses that could not be found are cached too, for a shorter time
+    - merges identical lookups that are in flight at the same time into one network request
+    - records the latency and source (cache, network, or merged) of every lookup
+"""
+from __future__ import annotations
+
+import re
+import sqlite3
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Any, Optional
+
+GEOCODE_CACHE_PATH = 'geocode_cache.sqlite3'
+
+DAY = 24 * 60 * 60
+
+# Spelled-out street words and their usual abbreviations, so both spellings share a cache entry
+ABBREVIATIONS = {
+    'street': 'st', 'avenue': 'ave', 'av': 'ave', 'road': 'rd', 'boulevard': 'blvd', 'drive': 'dr',
+    'crescent': 'cres', 'court': 'crt', 'place': 'pl', 'square': 'sq', 'lane': 'ln', 'parkway': 'pkwy',
+    'terrace': 'terr', 'circle': 'cir', 'highway': 'hwy', 'gardens': 'gdns', 'west': 'w', 'east': 'e',
+    'north': 'n', 'south': 's', 'ontario': 'on', 'canada': '', 'suite': 'unit', 'ste': 'unit',
+}
+
+_SERVICE = None
+_SERVICE_LOCK = threading.Lock()
+
+
+def normalize_address(address: str) -> str:
+    """Return address in a canonical form: lower case, no punctuation, abbreviated street words,
+    single spaces.
+
+    >>> normalize_address('14 Prince Arthur Avenue,\\nToronto, Ontario  M5R 1A9')
+    '14 prince arthur ave toronto on m5r 1a9'
+    >>> normalize_address('14 prince arthur ave. toronto')
+    '14 prince arthur ave toronto'
+    """
+    words = re.sub(r"[^\w\s]", ' ', address.casefold()).split()
+    return ' '.join(w for w in (ABBREVIATIONS.get(word, word) for word in words) if w)
+
+
+class GeocodingService:
+    """Turns addresses into (latitude, longitude), with a persistent cache.
+
+    Instance Attributes:
+        - ttl: seconds a found location stays valid in the cache
+        - negative_ttl: seconds a "not found" entry stays valid in the cache
+        - lookups: (normalised address, source, seconds) of the most recent lookups, where source
+          is 'cache', 'network' or 'merged' (waited for an identical lookup already in flight)
+
+    Representation Invariants:
+        - self.ttl >= 0 and self.negative_ttl >= 0
+    """
+    # Private Instance Attributes:
+    #   - _conn: the cache database connection
+    #   - _geocoder: the geocoder used for network lookups, created on first use
+    #   - _user_agent: the user agent the geocoder identifies itself with
+    #   - _inflight: the pending result of each network lookup currently running, by normalised address
+    #   - _lock: guards _conn, _geocoder and _inflight
+    ttl: float
+    negative_ttl: float
+    lookups: deque
+    _conn: sqlite3.Connection
+    _geocoder: Any
+    _user_agent: str
+    _inflight: dict[str, Future]
+    _lock: threading.Lock
+
+    def __init__(self, path: str = GEOCODE_CACHE_PATH, ttl: float = 30 * DAY, negative_ttl: float = DAY,
+                 geocoder: Any = None, user_agent: str = 'a') -> None:
+        """Open (creating if needed) the cache stored at path. If geocoder is None, a Nominatim
+        geocoder is created on the first network lookup.
+        """
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.lookups = deque(maxlen=1000)
+        self._geocoder = geocoder
+        self._user_agent = user_agent
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('CREATE TABLE IF NOT EXISTS locations (address TEXT PRIMARY KEY, lat REAL, lon REAL, '
+                           'fetched REAL NOT NULL)')
+        self._conn.commit()
+
+    def geocode(self, address: str) -> Optional[tuple[float, float]]:
+        """Return the (latitude, longitude) of address, or None if it cannot be found.
+
+        Errors talking to the geocoder are raised and not cached.
+        """
+        start = time.perf_counter()
+        key = normalize_address(address)
+        with self._lock:
+            found, location = self._cached(key)
+            if found:
+                self.lookups.append((key, 'cache', time.perf_counter() - start))
+                return location
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._inflight[key] = future
+        if not owner:
+            location = future.result()
+            self.lookups.append((key, 'merged', time.perf_counter() - start))
+            return location
+
+        try:
+            location = self._lookup(address)
+        except Exception as e:
+            with self._lock:
+                del self._inflight[key]
+            future.set_exception(e)
+            raise
+        with self._lock:
+            self._conn.execute('INSERT OR REPLACE INTO locations VALUES (?, ?, ?, ?)',
+                               (key, None if location is None else location[0],
+                                None if location is None else location[1], time.time()))
+            self._conn.commit()
+            del self._inflight[key]
+        future.set_result(location)
+        self.lookups.append((key, 'network', time.perf_counter() - start))
+        return location
+
+    def _cached(self, key: str) -> tuple[bool, Optional[tuple[float, float]]]:
+        """Return (found, location) for a normalised address from the cache. Must hold _lock."""
+        row = self._conn.execute('SELECT lat, lon, fetched FROM locations WHERE address = ?', (key,)).fetchone()
+        if row is None:
+            return False, None
+        lat, lon, fetched = row
+        if time.time() - fetched > (self.ttl if lat is not None else self.negative_ttl):
+            return False, None
+        return True, (None if lat is None else (lat, lon))
+
+    def _lookup(self, address: str) -> Optional[tuple[float, float]]:
+        """Geocode address over the network."""
+        with self._lock:
+            if self._geocoder is None:
+                from geopy.geocoders import Nominatim
+                self._geocoder = Nominatim(user_agent=self._user_agent)
+            geocoder = self._geocoder
+        loc = geocoder.geocode(address)
+        if loc is None:
+            return None
+        return float(loc.raw['lat']), float(loc.raw['lon'])
+
+    def stats(self) -> dict[str, dict[str, float]]:
+        """Return the number and mean latency (in ms) of the recent lookups from each source."""
+        by_source = {}
+        for _, source, seconds in list(self.lookups):
+            by_source.setdefault(source, []).append(seconds)
+        return {source: {'count': len(times), 'mean_ms': sum(times) / len(times) * 1000}
+                for source, times in by_source.items()}
+
+    def close(self) -> None:
+        """Close the cache database."""
+        with self._lock:
+            self._conn.close()
+
+
+def get_geocoding_service() -> GeocodingService:
+    """Return the process-wide geocoding service, opening it on first use."""
+    global _SERVICE
+    if _SERVICE is None:
+        with _SERVICE_LOCK:
+            if _SERVICE is None:
+                _SERVICE = GeocodingService()
+    return _SERVICE
+
+
+def set_geocoding_service(service: Optional[GeocodingService]) -> None:
+    """Replace the process-wide geocoding service. With None, the default service is opened again
+    on next use.
+    """
+    global _SERVICE
+    with _SERVICE_LOCK:
+        _SERVICE = service
+
+
+###################################################################################################
+# Main block
+###################################################################################################
+if __name__ == '__main__':
+    import doctest
+
+    doctest.testmod(verbose=True)
+
+    import python_ta
+
+    python_ta.check_all(config={
+        'max-line-length': 120,
+        'extra-imports': ['re', 'sqlite3', 'threading', 'time', 'collections', 'concurrent.futures', 'geopy.geocoders']
+    })
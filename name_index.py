@@ -0,0 +1,214 @@
+"""Typo-tolerant search of the restaurants by name (or by address).
+
+TrigramIndex splits each distinct normalised value ("the burgers priest") into its trigrams
+(three-character pieces, the value padded with spaces: "  t", " th", "the", ...) and keeps, for
+each trigram, the values containing it as an array (an inverted index). A query is split the same
+way; counting, with one np.bincount over the arrays of its trigrams, how many trigrams each value
+shares with it gives their similarity (shared trigrams over all the trigrams of either) for every
+value at once, without comparing the query to the ~6,500 names one by one. A typo only changes
+the few trigrams around it, so misspelt names still share most of theirs.
+
+The indexes of the names and addresses of the loaded dataset are built on first use (see
+get_name_index).
+"""
+from __future__ import annotations
+
+import re
+import threading
+import unicodedata
+from typing import Callable, Iterable, NamedTuple
+
+import numpy as np
+
+from ranking import top_k
+
+# Matches less similar than this (0 to 1) to the query are not returned
+MIN_SIMILARITY = 0.25
+
+_INDEXES: dict[str, RestaurantNameIndex] = {}
+_INDEXES_LOCK = threading.Lock()
+
+
+class NameMatch(NamedTuple):
+    """A value matching a query: the value (as first seen), its similarity to the query (0 to 1)
+    and the rows of the restaurants that have it."""
+    value: str
+    score: float
+    rows: list[int]
+
+
+def normalize_name(name: str) -> str:
+    """Return name in the form it is indexed in: lower case, without accents or apostrophes, other
+    punctuation replaced by spaces.
+
+    >>> normalize_name("The Burger’s Priest")
+    'the burgers priest'
+    >>> normalize_name('Café  Landwer!')
+    'cafe landwer'
+    """
+    name = unicodedata.normalize('NFKD', name.casefold())
+    name = ''.join(c for c in name if not unicodedata.combining(c))
+    name = re.sub(r"['’`]", '', name)
+    return ' '.join(re.sub(r'[^\w]', ' ', name).split())
+
+
+def trigrams(text: str) -> set[str]:
+    """Return the trigrams of a normalised text, padded with two spaces before and one after.
+
+    >>> sorted(trigrams('pho'))
+    ['  p', ' ph', 'ho ', 'pho']
+    """
+    padded = f'  {text} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class TrigramIndex:
+    """An inverted index from trigrams to the values containing them.
+
+    Instance Attributes:
+        - values: each distinct normalised value, as first seen (not normalised)
+        - normalised: each distinct normalised value
+        - row_starts: the rows with value i are row_order[row_starts[i]:row_starts[i + 1]]
+        - row_order: the rows, grouped by value
+
+    Representation Invariants:
+        - len(self.values) == len(self.normalised) == len(self.row_starts) - 1
+        - all(len(self._postings[t]) > 0 for t in self._postings)
+
+    >>> index = TrigramIndex(['Pizza Pizza', 'Pizzeria Libretto', 'Pizza Pizza', 'Sushi Bar'])
+    >>> [(m.value, m.rows) for m in index.search('piza pizza')]
+    [('Pizza Pizza', [0, 2])]
+    """
+    # Private Instance Attributes:
+    #   - _postings: the (sorted) numbers of the values containing each trigram
+    #   - _sizes: the number of distinct trigrams of each value
+    #   - _numbers: the number of each normalised value
+    #   - _normalize: the function normalising values and queries
+    values: list[str]
+    normalised: list[str]
+    row_starts: np.ndarray
+    row_order: np.ndarray
+    _postings: dict[str, np.ndarray]
+    _sizes: np.ndarray
+    _numbers: dict[str, int]
+    _normalize: Callable[[str], str]
+
+    def __init__(self, values: Iterable[str], normalize: Callable[[str], str] = normalize_name) -> None:
+        """Index the values, one per row, each as normalize turns it."""
+        self.values, self.normalised, self._numbers = [], [], {}
+        self._normalize = normalize
+        value_of_row = []
+        for value in values:
+            key = normalize(value)
+            number = self._numbers.get(key)
+            if number is None:
+                number = self._numbers[key] = len(self.normalised)
+                self.values.append(value)
+                self.normalised.append(key)
+            value_of_row.append(number)
+        value_of_row = np.asarray(value_of_row, dtype=np.int64)
+        self.row_order = np.argsort(value_of_row, kind='stable')
+        self.row_starts = np.searchsorted(value_of_row[self.row_order], np.arange(len(self.normalised) + 1))
+
+        postings = {}
+        sizes = np.empty(len(self.normalised), dtype=np.int32)
+        for number, key in enumerate(self.normalised):
+            grams = trigrams(key)
+            sizes[number] = len(grams)
+            for gram in grams:
+                postings.setdefault(gram, []).append(number)
+        self._postings = {gram: np.asarray(numbers, dtype=np.int32) for gram, numbers in postings.items()}
+        self._sizes = sizes
+
+    def __len__(self) -> int:
+        """Return the number of distinct values."""
+        return len(self.normalised)
+
+    def rows_of(self, number: int) -> list[int]:
+        """Return the rows with value number."""
+        return self.row_order[self.row_starts[number]:self.row_starts[number + 1]].tolist()
+
+    def similarities(self, query: str) -> np.ndarray:
+        """Return the similarity of every value to query: the trigrams they share over the trigrams
+        of either (0 if the query has no trigram in the index)."""
+        grams = trigrams(self._normalize(query))
+        arrays = [self._postings[gram] for gram in grams if gram in self._postings]
+        if not arrays:
+            return np.zeros(len(self.normalised))
+        shared = np.bincount(np.concatenate(arrays), minlength=len(self.normalised))
+        return shared / (len(grams) + self._sizes - shared)
+
+    def search(self, query: str, limit: int = 10, min_similarity: float = MIN_SIMILARITY) -> list[NameMatch]:
+        """Return the (at most limit) values most similar to query, most similar first, leaving
+        out those less similar than min_similarity."""
+        scores = self.similarities(query)
+        exact = self._numbers.get(self._normalize(query))
+        if exact is not None:
+            scores[exact] = 1.0
+        matches = []
+        for number in top_k(scores, limit).tolist():
+            if scores[number] < min_similarity or scores[number] == 0:
+                break
+            matches.append(NameMatch(self.values[number], round(float(scores[number]), 4), self.rows_of(number)))
+        return matches
+
+
+class RestaurantNameIndex:
+    """The trigram indexes of the names and addresses of a dataset's restaurants.
+
+    Instance Attributes:
+        - names: the index of the restaurant names
+        - addresses: the index of the addresses (normalised as geocoding does, so 'Avenue' and
+          'Ave' are the same)
+    """
+    names: TrigramIndex
+    addresses: TrigramIndex
+
+    def __init__(self, table: 'restaurant_table.RestaurantTable') -> None:
+        """Index the names and addresses of the restaurants of table."""
+        from geocoding import normalize_address
+
+        self.names = TrigramIndex(table.names[i] for i in range(len(table)))
+        self.addresses = TrigramIndex((table.addresses[i].replace('\n', ' ') for i in range(len(table))),
+                                      normalize=normalize_address)
+
+    def search(self, query: str, field: str = 'name', limit: int = 10,
+               min_similarity: float = MIN_SIMILARITY) -> list[NameMatch]:
+        """Return the names (or addresses, if field is 'address') most similar to query; see
+        TrigramIndex.search."""
+        if field not in ('name', 'address'):
+            raise ValueError(f'Cannot search restaurants by {field!r}')
+        index = self.names if field == 'name' else self.addresses
+        return index.search(query, limit, min_similarity)
+
+
+def get_name_index() -> RestaurantNameIndex:
+    """Return the name and address indexes of the loaded dataset, building them on first use."""
+    import computations
+
+    version = computations.get_data_version()
+    index = _INDEXES.get(version)
+    if index is None:
+        with _INDEXES_LOCK:
+            index = _INDEXES.get(version)
+            if index is None:
+                index = RestaurantNameIndex(computations.get_restaurant_table())
+                _INDEXES.clear()
+                _INDEXES[version] = index
+    return index
+
+
+###################################################################################################
+# Main block
+###################################################################################################
+if __name__ == '__main__':
+    import doctest
+
+    doctest.testmod(verbose=True)
+
+    import python_ta
+
+    python_ta.check_all(config={
+        'max-line-length': 120,
+        'extra-imports': ['re', 'threading', 'unicodedata', 'numpy', 'ranking', 'computations', 'geocoding']
+    })
@@ -0,0 +1,158 @@
+"""Suggestions for what the user is typing: cuisines, restaurant names and addresses.
+
+PrefixIndex keeps the normalised values (see name_index.normalize_name) in one sorted list; the
+values starting with what has been typed are a contiguous slice of it, found with two binary
+searches (bisect), so a suggestion costs O(log n) plus the size of the slice, well under the 16 ms
+of a frame even for a one-letter prefix. With word_starts, every word of a value starts a key too,
+so typing "arthur" suggests "14 Prince Arthur Avenue". Among the matching values the most common
+(the weight of a value: how many restaurants have it) come first.
+
+The indexes of the loaded dataset are built on first use (see get_prefix_indexes). Addresses are
+suggested as "street, city, postal code", a form the gazetteer (see gazetteer.py) places by its
+street or postal code, so searching around a suggested address (unless it is only a landmark's
+name) needs no network geocoding.
+"""
+from __future__ import annotations
+
+import bisect
+import threading
+from typing import Iterable
+
+import numpy as np
+
+from name_index import normalize_name
+
+_INDEXES: dict[str, PrefixIndexes] = {}
+_INDEXES_LOCK = threading.Lock()
+
+
+class PrefixIndex:
+    """Sorted keys for completing prefixes of a list of values.
+
+    Instance Attributes:
+        - values: each distinct value, as first seen
+        - weights: how many times each value was given
+
+    Representation Invariants:
+        - self._keys == sorted(self._keys)
+        - len(self._keys) == len(self._rank_of_key)
+        - len(self.values) == len(self.weights) == len(self._by_rank)
+
+    >>> index = PrefixIndex(['Pizza', 'Pita', 'Pizza', 'Sushi Pizza'], word_starts=True)
+    >>> index.complete('pi')
+    ['Pizza', 'Pita', 'Sushi Pizza']
+    >>> index.complete('SUSHI P')
+    ['Sushi Pizza']
+    """
+    # Private Instance Attributes:
+    #   - _keys: the normalised values (or, with word_starts, their ends starting at each word), sorted
+    #   - _by_rank: the numbers of the values, the most common first (ties alphabetically)
+    #   - _rank_of_key: the position in _by_rank of the value of each key
+    values: list[str]
+    weights: np.ndarray
+    _keys: list[str]
+    _by_rank: np.ndarray
+    _rank_of_key: np.ndarray
+
+    def __init__(self, values: Iterable[str], word_starts: bool = False) -> None:
+        """Index the values; with word_starts, every word of a value can start a prefix of it."""
+        numbers, self.values, counts = {}, [], []
+        keys = []
+        for value in values:
+            key = normalize_name(value)
+            if not key:
+                continue
+            number = numbers.get(key)
+            if number is None:
+                number = numbers[key] = len(self.values)
+                self.values.append(value)
+                counts.append(0)
+                words = key.split(' ')
+                starts = range(len(words)) if word_starts else range(1)
+                keys.extend((' '.join(words[i:]), number) for i in starts)
+            counts[number] += 1
+        keys.sort()
+        self._keys = [key for key, _ in keys]
+        self.weights = np.array(counts, dtype=np.int64)
+        self._by_rank = np.array(sorted(range(len(self.values)), key=lambda n: (-counts[n], self.values[n].casefold())),
+                                 dtype=np.int64)
+        rank = np.empty(len(self.values), dtype=np.int64)
+        rank[self._by_rank] = np.arange(len(self.values))
+        self._rank_of_key = rank[np.array([number for _, number in keys], dtype=np.int64)]
+
+    def __len__(self) -> int:
+        """Return the number of distinct values."""
+        return len(self.values)
+
+    def most_common(self) -> list[str]:
+        """Return every value, the most common first (ties alphabetically)."""
+        return [self.values[n] for n in self._by_rank.tolist()]
+
+    def complete(self, prefix: str, limit: int = 10) -> list[str]:
+        """Return (at most limit of) the values with a key starting with prefix, the most common
+        first (ties alphabetically). An empty prefix matches nothing."""
+        prefix = normalize_name(prefix)
+        if not prefix:
+            return []
+        low = bisect.bisect_left(self._keys, prefix)
+        high = bisect.bisect_left(self._keys, prefix + '\U0010ffff', low)
+        ranks = np.unique(self._rank_of_key[low:high])[:limit]
+        return [self.values[n] for n in self._by_rank[ranks].tolist()]
+
+
+class PrefixIndexes:
+    """The prefix indexes of a dataset's cuisines, restaurant names and addresses."""
+    cuisines: PrefixIndex
+    names: PrefixIndex
+    addresses: PrefixIndex
+
+    def __init__(self, table: 'restaurant_table.RestaurantTable') -> None:
+        """Index the cuisines, names and addresses of the restaurants of table."""
+        rows = range(len(table))
+        self.cuisines = PrefixIndex((table.cuisines[code] for code in table.cuisine_codes.tolist()), word_starts=True)
+        self.names = PrefixIndex((table.names[i] for i in rows), word_starts=True)
+        self.addresses = PrefixIndex((table.addresses[i].replace('\n', ', ') for i in rows), word_starts=True)
+
+
+def complete_last(index: PrefixIndex, text: str, limit: int = 10) -> list[str]:
+    """Return completions of the last of the comma-separated values in text, each with the values
+    before it.
+
+    >>> complete_last(PrefixIndex(['Pizza', 'Sushi']), 'Pizza, su')
+    ['Pizza, Sushi']
+    """
+    *before, last = text.split(',')
+    head = ''.join(value.strip() + ', ' for value in before if value.strip())
+    return [head + value for value in index.complete(last, limit)]
+
+
+def get_prefix_indexes() -> PrefixIndexes:
+    """Return the prefix indexes of the loaded dataset, building them on first use."""
+    import computations
+
+    version = computations.get_data_version()
+    indexes = _INDEXES.get(version)
+    if indexes is None:
+        with _INDEXES_LOCK:
+            indexes = _INDEXES.get(version)
+            if indexes is None:
+                indexes = PrefixIndexes(computations.get_restaurant_table())
+                _INDEXES.clear()
+                _INDEXES[version] = indexes
+    return indexes
+
+
+###################################################################################################
+# Main block
+###################################################################################################
+if __name__ == '__main__':
+    import doctest
+
+    doctest.testmod(verbose=True)
+
+    import python_ta
+
+    python_ta.check_all(config={
+        'max-line-length': 120,
+        'extra-imports': ['bisect', 'threading', 'numpy', 'name_index', 'computations']
+    })
@@ -0,0 +1,88 @@
+"""Profile how long the program takes to show its home window.
+
+Reports, each measured in a fresh interpreter:
+    - the time to import project_visuals and which heavy libraries that import pulled in
+    - the slowest modules in the import (from python -X importtime)
+    - the time until the Home window is drawn (needs a display; skipped otherwise)
+    - the time for the background preload of the dataset to finish
+
+Run with:
+    python profile_startup.py
+"""
+import json
+import os
+import subprocess
+import sys
+
+HEAVY_MODULES = ['pandas', 'numpy', 'plotly', 'geopy', 'requests']
+
+_IMPORT_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import project_visuals
+elapsed = time.perf_counter() - start
+print(json.dumps({'import_s': elapsed, 'heavy': [m for m in %r if m in sys.modules]}))
+""" % (HEAVY_MODULES,)
+
+_WINDOW_PROBE = """
+import json, time
+start = time.perf_counter()
+import tkinter as tk
+import computations
+import project_visuals
+
+timings = {}
+
+
+def fake_mainloop(self, n=0):
+    self.update()
+    timings['window_s'] = time.perf_counter() - start
+    thread = computations.preload_data()
+    thread.join()
+    timings['preload_done_s'] = time.perf_counter() - start
+    self.destroy()
+
+
+tk.Tk.mainloop = fake_mainloop
+project_visuals.Home()
+print(json.dumps(timings))
+"""
+
+
+def _run_probe(code: str) -> dict:
+    """Run code in a fresh interpreter and return the JSON object it prints."""
+    out = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def _slowest_imports(limit: int = 10) -> list[tuple[int, str]]:
+    """Return the (cumulative microseconds, module) pairs of the slowest imports."""
+    out = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import project_visuals'],
+                         capture_output=True, text=True, check=True)
+    rows = []
+    for line in out.stderr.splitlines():
+        parts = line.split('|')
+        if len(parts) == 3 and parts[1].strip().isdigit():
+            rows.append((int(parts[1]), parts[2].rstrip()))
+    return sorted(rows, reverse=True)[:limit]
+
+
+def main() -> None:
+    """Print the startup profile."""
+    probe = _run_probe(_IMPORT_PROBE)
+    print(f"import project_visuals: {probe['import_s'] * 1000:8.1f} ms")
+    print(f"heavy modules loaded:   {', '.join(probe['heavy']) or 'none'}")
+    print('slowest imports (cumulative):')
+    for micros, name in _slowest_imports():
+        print(f'  {micros / 1000:8.1f} ms {name}')
+
+    if os.environ.get('DISPLAY') or sys.platform in ('win32', 'darwin'):
+        timings = _run_probe(_WINDOW_PROBE)
+        print(f"time to first window:   {timings['window_s'] * 1000:8.1f} ms")
+        print(f"dataset preloaded at:   {timings['preload_done_s'] * 1000:8.1f} ms")
+    else:
+        print('time to first window:   skipped (no display)')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,67 +1,129 @@
 """Graphical User Interface for Project 2"""
 
+import os
 import tkinter as tk
+import webbrowser
+from pathlib import Path
+from typing import Any, Callable, Optional, Union
 from tkinter import ttk
 import computations
+from detail_loader import DetailLoader
+from search_worker import SearchEvent, SearchWorker
+from stall_monitor import StallMonitor
+from windows import WindowManager
 
 U = computations.User()
 
+# Every window is opened through WINDOWS, as a Toplevel of the home window (see windows.py)
+WINDOWS = WindowManager()
+
+# How often, in ms, the GUI checks for progress of a search running in the background
+POLL_MS = 50
+
+# How long, in ms, typing has to pause before suggestions are looked up
+SUGGEST_DELAY_MS = 120
+
+_WORKER = None
+_LOADER = None
+
+
+def _worker() -> SearchWorker:
+    """Return the background search worker, starting it on first use"""
+    global _WORKER
+    if _WORKER is None:
+        _WORKER = SearchWorker()
+    return _WORKER
+
+
+def _loader() -> DetailLoader:
+    """Return the loader of More Info details and maps, starting it on first use"""
+    global _LOADER
+    if _LOADER is None:
+        _LOADER = DetailLoader()
+    return _LOADER
+
 
 class Home:
     """Homepage that will open upon running the program"""
     homepage: tk.Tk
+    monitor: Optional[StallMonitor]
 
     def __init__(self) -> None:
         """Create a home window"""
-        self.homepage = tk.Tk()
+        self.homepage = WINDOWS.root
         self.homepage.geometry("400x400")
         self.homepage.title("Food Finder Home")
 
         hometitle = tk.Label(self.homepage, text="Toronto Food Finder Home", font=('Arial', 20))
         hometitle.pack(pady=40)
         find_restaurant = tk.Button(self.homepage, text='Find restaurants', font=('Arial', 14),
-                                    command=RestaurantFinder)
+                                    command=RestaurantFinder.open)
         find_restaurant.pack(pady=10)
-        find_events = tk.Button(self.homepage, text='See events', font=('Arial', 14), command=ShowEvents)
+        find_events = tk.Button(self.homepage, text='See events', font=('Arial', 14), command=ShowEvents.open)
         find_events.pack(pady=10)
-        create_event = tk.Button(self.homepage, text='Create an event', font=('Arial', 14), command=CreateEvent)
+        create_event = tk.Button(self.homepage, text='Create an event', font=('Arial', 14),
+                                 command=CreateEvent.open)
         create_event.pack(pady=10)
 
-        self.homepage.mainloop()
+        # load the dataset in the background once the window is on screen
+        self.homepage.after(100, computations.preload_data)
+        # only measure event loop stalls when they are to be reported
+        self.monitor = None
+        if os.environ.get('STALL_REPORT'):
+            self.monitor = StallMonitor(self.homepage)
+            self.monitor.start()
+        WINDOWS.mainloop()
+        if self.monitor is not None:
+            print('event loop stalls:', self.monitor.summary())
 
 
 class RestaurantFinder:
     """Create a window in which the restaurant finder runs, called when the 'Find restaurants' button is clicked"""
-    restofinder: tk.Tk
+    restofinder: tk.Toplevel
     user_address: tk.Entry
     cuisines: ttk.Combobox
     price_range: ttk.Combobox
     distance: ttk.Combobox
     star: ttk.Combobox
-
-    def __init__(self) -> None:
-        self.restofinder = tk.Tk()
-        self.restofinder.geometry("500x600")
-        self.restofinder.title("Restaurant Searcher")
+    status: tk.Label
+    results: 'ranking.RankedResults'
+    ratings_checked: int
+    search_poll: Optional[str]
+    details_poll: Optional[str]
+    results_view: Optional['ResultsView']
+    info_text: Optional[tk.Label]
+    info_key: Optional[tuple]
+    name_query: ttk.Combobox
+    address_suggestions: tk.Listbox
+    completers: list['Autocomplete']
+    indexes: Optional['prefix_index.PrefixIndexes']
+    name_matches: tk.Listbox
+    found_rows: list[int]
+
+    def __init__(self, window: tk.Toplevel) -> None:
+        """Fill in the restaurant finder window"""
+        self.restofinder = window
 
         user_address_prompt = tk.Label(self.restofinder, font=("Arial", 14),
                                        text='Enter your address in the form 123 xyz St, Toronto, Ontario')
         user_address_prompt.pack(pady=20)
-        self.user_address = tk.Entry(self.restofinder, font=("Arial", 12))
-        self.user_address.pack(pady=10)
+        self.user_address = tk.Entry(self.restofinder, font=("Arial", 12), width=40)
+        self.user_address.pack(pady=(10, 0))
+        self.address_suggestions = tk.Listbox(self.restofinder, height=3, width=50)
+        self.address_suggestions.pack()
 
         frame = tk.Frame(self.restofinder)
-        l1 = tk.Label(frame, text='Select cuisine')
+        l1 = tk.Label(frame, text='Select cuisine (or type several, separated by commas)')
         l1.grid(row=0, column=0)
-        course = computations.get_all_cuisines()
-        self.cuisines = ttk.Combobox(frame, value=course, width=10)
+        self.cuisines = ttk.Combobox(frame, value=['Any'], width=20)
         self.cuisines.grid(row=1, column=0)
         frame.pack(pady=20)
 
         frame2 = tk.Frame(self.restofinder)
-        l2 = tk.Label(frame2, text='Select price range')
+        l2 = tk.Label(frame2, text='Select price range (or type several, separated by commas)')
         l2.grid(row=0, column=0)
-        self.price_range = ttk.Combobox(frame2, value=['Under $10', '$11-30', '$31-60', 'Above $61'], width=10)
+        self.price_range = ttk.Combobox(frame2, value=['Any', 'Under $10', '$11-30', '$31-60', 'Above $61'],
+                                        width=10)
         self.price_range.grid(row=1, column=0)
         frame2.pack(pady=20)
 
@@ -75,93 +137,472 @@ class RestaurantFinder:
         frame4 = tk.Frame(self.restofinder)
         l4 = tk.Label(frame4, text='Select a Yelp star rating')
         l4.grid(row=0, column=0)
-        star = ttk.Combobox(frame4, value=['Any', '1 star', ' 2 stars', '3 stars', '4 stars', '5 stars'],
-                            width=10)
-        star.grid(row=1, column=0)
+        self.star = ttk.Combobox(frame4, value=['Any', '1 star', ' 2 stars', '3 stars', '4 stars', '5 stars'],
+                                 width=10)
+        self.star.grid(row=1, column=0)
         frame4.pack(pady=20)
 
         search = tk.Button(self.restofinder, text="Search restaurants", command=self.save)
         search.pack(pady=20)
-
-        self.restofinder.mainloop()
+        self.status = tk.Label(self.restofinder, text='')
+        self.status.pack()
+
+        # restaurants can also be looked up by name, even misspelt (see name_index.py)
+        frame5 = tk.Frame(self.restofinder)
+        tk.Label(frame5, text='Or look a restaurant up by name').grid(row=0, column=0, columnspan=2)
+        self.name_query = ttk.Combobox(frame5, width=30)
+        self.name_query.grid(row=1, column=0)
+        tk.Button(frame5, text='Find', command=self.find_by_name).grid(row=1, column=1)
+        self.name_matches = tk.Listbox(frame5, height=5, width=60)
+        self.name_matches.grid(row=2, column=0, columnspan=2)
+        frame5.pack(pady=10)
+        self.name_query.bind('<Return>', self.find_by_name)
+        self.name_matches.bind('<Double-Button-1>', self.name_match_info)
+        self.found_rows = []
+        self.search_poll, self.details_poll = None, None
+        self.results_view = None
+        self.info_text, self.info_key = None, None
+
+        # changing the criteria cancels a search still in progress
+        self.user_address.bind('<KeyRelease>', self.criteria_changed)
+        for box in (self.cuisines, self.price_range, self.distance, self.star):
+            box.bind('<<ComboboxSelected>>', self.criteria_changed)
+            box.bind('<KeyRelease>', self.criteria_changed)
+        self.restofinder.bind('<Destroy>', self.closed)
+
+        # suggestions as the address, cuisines and name are typed (see prefix_index.py), once the
+        # indexes they come from are built in the background (usually by the preload of the home window)
+        self.indexes = None
+        self.completers = [
+            Autocomplete(self.user_address, self.suggest_addresses, listbox=self.address_suggestions,
+                         on_pick=self.criteria_changed),
+            Autocomplete(self.cuisines, self.suggest_cuisines, default=['Any']),
+            Autocomplete(self.name_query, self.suggest_names)]
+        _loader().request('prefix indexes', _prefix_indexes, self.indexes_ready)
+        self.poll_details()
+
+    @staticmethod
+    def open() -> 'RestaurantFinder':
+        """Open the restaurant finder, or bring it to the front if it is already open"""
+        return WINDOWS.open('finder', 'Restaurant Searcher', '500x840', RestaurantFinder)
 
     def save(self) -> None:
         """save the entered addresss"""
         user_ad = self.user_address.get()
-        selected_cuis = self.cuisines.get()
-        selected_price_range = self.price_range.get()
+        # several cuisines or price ranges can be typed in, separated by commas
+        selected_cuis = _choices(self.cuisines.get())
+        selected_price_range = _choices(self.price_range.get())
         selected_distance = self.distance.get()
         selected_star = self.star.get()
-        U.questions = [selected_price_range, selected_cuis, selected_cuis, selected_star]
-        U.location = user_ad
-        U.latitude = computations.get_coords(U.location)[0]
-        U.longitude = computations.get_coords(U.location)[1]
 
         if any(x == '' for x in [user_ad, selected_cuis, selected_price_range, selected_distance]):
-            tk.Label(self.restofinder, text='Please fill all criteria').pack(pady=20)
+            self.status.config(text='Please fill all criteria')
+        else:
+            # the address is geocoded and the search run on the worker thread (see search_worker.py);
+            # poll_search picks up the results
+            _worker().submit(user_ad, cuisine=selected_cuis, price=selected_price_range,
+                             distance=selected_distance, star=selected_star)
+            self.status.config(text='Searching...')
+            # one polling loop serves every search; it stops once the worker is idle
+            if self.search_poll is None:
+                self.search_poll = self.restofinder.after(POLL_MS, self.poll_search)
+
+    def criteria_changed(self, _event: object = None) -> None:
+        """Cancel the search in progress, called when the user edits the search criteria"""
+        if _worker().busy():
+            _worker().cancel()
+            self.status.config(text='Search cancelled, press Search restaurants to search again')
+
+    def closed(self, event: tk.Event) -> None:
+        """Cancel the search in progress, called when the finder window is closed"""
+        if event.widget is self.restofinder:
+            _worker().cancel()
+
+    def poll_search(self) -> None:
+        """Handle the progress of the search running in the background, and check again later"""
+        worker = _worker()
+        self.search_poll = None
+        if not self.restofinder.winfo_exists():
+            return
+        worker.poll(self.handle_search_event)
+        if worker.busy():
+            self.search_poll = self.restofinder.after(POLL_MS, self.poll_search)
+
+    def handle_search_event(self, event: SearchEvent) -> None:
+        """Update the windows with the progress of the search"""
+        if event.kind == 'invalid':
+            self.status.config(text='Invalid address')
+        elif event.kind == 'error':
+            self.status.config(text=f'The search failed: {event.payload}')
+        elif event.kind == 'candidates':
+            self.ratings_checked = 0
+            self.status.config(text=f'{len(event.payload)} candidates, checking their star ratings...')
+            self.show_restaurants(event.payload, final=False)
+        elif event.kind == 'rating':
+            self.ratings_checked += 1
+            self.status.config(text=f'Checked {self.ratings_checked} star ratings...')
+            if self.results_view is not None and WINDOWS.is_open('results'):
+                self.results_view.update_rating(*event.payload)
+        elif event.kind == 'done':
+            user, results = event.payload
+            U.location, U.questions = user.location, user.questions
+            U.latitude, U.longitude = user.latitude, user.longitude
+            self.status.config(text='')
+            self.show_restaurants(results)
+
+    def show_restaurants(self, results: 'ranking.RankedResults', final: bool = True) -> None:
+        """Show the restaurants meeting the user's criteria, best first, in a scrollable table that
+        loads them a page at a time. If final is False, the results are candidates still waiting
+        for their star ratings to be checked.
+        """
+        self.results = results
+
+        if len(self.results) == 0:
+            WINDOWS.close('results')
+            self.results_view = None
+            if final:
+                self.status.config(text='No restaurants found, please edit your search requirements')
+            return
+        # the results window is reused by every search, its content replaced
+        WINDOWS.open('results', "Search Results" if final else "Search Results (checking star ratings...)",
+                     "700x600", lambda window: self.fill_results(window, final), rebuild=True)
+
+    def fill_results(self, show_recs: tk.Toplevel, final: bool) -> None:
+        """Put self.results in the (empty) results window"""
+        if final:
+            heading = f'Restaurants found: {len(self.results)}'
+        else:
+            heading = f'Candidates: {len(self.results)}, checking star ratings...'
+        tk.Label(show_recs, text=heading, font=18).pack(padx=20)
+        # only final results can be asked about, so only they are recorded as recommendations: those of
+        # the latest search, as they are loaded
+        if final:
+            U.recommendations.clear()
+        self.results_view = ResultsView(show_recs, on_page=U.recommendations.extend if final else None)
+        self.results_view.frame.pack(fill='both', expand=True, padx=10)
+        self.results_view.show(self.results)
+        if not final:
+            return
+
+        tk.Button(show_recs, text='More Info', command=self.selected_resto_info).pack()
+        # details and the map are only made when asked for (see poll_details)
+        tk.Button(show_recs, text='View Map', command=self.view_map).pack()
+
+    def selected_resto_info(self) -> None:
+        """Show more information about the selected restaurant, called when 'More Info' is clicked"""
+        restaurant = self.results_view.selected()
+        if restaurant is not None:
+            # it may have been scrolled past long enough ago to have been dropped from the recommendations
+            U.recommendations.add(restaurant, restaurant.row_id)
+            self.get_resto_info(restaurant.row_id, restaurant.name)
+
+    def indexes_ready(self, succeeded: bool, indexes: Any) -> None:
+        """Start suggesting from the prefix indexes built in the background"""
+        if not succeeded or not self.restofinder.winfo_exists():
+            return
+        self.indexes = indexes
+        course = ['Any'] + indexes.cuisines.most_common()
+        self.cuisines.configure(values=course)
+        self.completers[1].default = course
+        for completer in self.completers:
+            if completer.entry.get():
+                completer.suggest()
+
+    def suggest_addresses(self, text: str) -> list[str]:
+        """Return the addresses starting with text (none until the indexes are built)"""
+        return [] if self.indexes is None else self.indexes.addresses.complete(text)
+
+    def suggest_cuisines(self, text: str) -> list[str]:
+        """Return the completions of the last cuisine typed (none until the indexes are built)"""
+        from prefix_index import complete_last
+
+        return [] if self.indexes is None else complete_last(self.indexes.cuisines, text)
+
+    def suggest_names(self, text: str) -> list[str]:
+        """Return the restaurant names starting with text (none until the indexes are built)"""
+        return [] if self.indexes is None else self.indexes.names.complete(text)
+
+    def find_by_name(self, _event: object = None) -> None:
+        """List the restaurants whose names are closest to the one entered, called when 'Find' is clicked"""
+        from name_index import get_name_index
+
+        table = computations.get_restaurant_table()
+        self.name_matches.delete(0, 'end')
+        self.found_rows = []
+        for match in get_name_index().search(self.name_query.get(), limit=10):
+            for row in match.rows[:5]:
+                self.name_matches.insert('end', f'{table.names[row]} - {table.addresses[row].replace(chr(10), " ")}')
+                self.found_rows.append(row)
+        if not self.found_rows:
+            self.name_matches.insert('end', 'No restaurant with a name like that')
+
+    def name_match_info(self, _event: object = None) -> None:
+        """Show more information about the restaurant double-clicked in the list found by name"""
+        from distances import haversine_km
+
+        selection = self.name_matches.curselection()
+        if not selection or selection[0] >= len(self.found_rows):
+            return
+        row = self.found_rows[selection[0]]
+        table = computations.get_restaurant_table()
+        km = 0.0
+        if U.location:
+            km = haversine_km(float(table.latitudes[row]), float(table.longitudes[row]), U.latitude, U.longitude)
+        restaurant = table.row(row, km, int(computations.get_distance_buckets([km])[0]))
+        U.recommendations.add(restaurant, row)
+        self.get_resto_info(row, restaurant.name)
+
+    def get_resto_info(self, row: int, name: str) -> None:
+        """Open the More Info window of the restaurant in row, called name"""
+        WINDOWS.open('info', name, '', lambda window: self.fill_resto_info(window, row), rebuild=True)
+
+    def fill_resto_info(self, more_info: tk.Toplevel, row: int) -> None:
+        """Put the choice of information about the restaurant in row in the (empty) More Info window"""
+        a, c, r = tk.IntVar(more_info), tk.IntVar(more_info), tk.IntVar(more_info)
+
+        tk.Checkbutton(more_info, text='Location', variable=a).pack()
+        tk.Checkbutton(more_info, text='Contact Information', variable=c).pack()
+        tk.Checkbutton(more_info, text='Review Information', variable=r).pack()
+        tk.Button(more_info, text='Show', command=lambda: self.load_resto_info(
+            row, a.get() == 1, c.get() == 1, r.get() == 1)).pack()
+        self.info_text = tk.Label(more_info, text='', font=12, wraplength=400, justify='left')
+        self.info_text.pack(padx=10, pady=10)
+        self.info_key = None
+
+    def load_resto_info(self, row: int, loc: bool, con: bool, review: bool) -> None:
+        """Show the chosen information about the restaurant in row, worked out in the background
+        (the review information may need its Yelp page) the first time it is asked for"""
+        key = ('info', row, loc, con, review, U.latitude, U.longitude)
+        # the background thread gets its own copy of what it needs of U, which the GUI keeps changing
+        user = computations.User()
+        user.questions = list(U.questions)
+        restaurant = U.recommendations.get(row)
+        if restaurant is not None:
+            user.recommendations.add(restaurant, row)
+        self.info_key = key
+        self.info_text.config(text='Loading...')
+        name = '' if restaurant is None else restaurant.name
+        _loader().request(key, lambda: computations.get_restaurant_info(user, name, loc, con, review, row),
+                          lambda succeeded, matches: self.show_resto_info(key, succeeded, matches))
+        self.poll_details()
+
+    def show_resto_info(self, key: tuple, succeeded: bool, matches: Any) -> None:
+        """Show information loaded for key in the More Info window, if it is still what the window asks for"""
+        if key != self.info_key or not WINDOWS.is_open('info'):
+            return
+        if not succeeded:
+            self.info_text.config(text=f'Could not load the information: {matches}')
+            return
+        lines = [line for match in matches for line in match if line]
+        self.info_text.config(text='\n'.join(lines) if lines else 'Choose the information to show')
+
+    def view_map(self) -> None:
+        """Open the map of the recommended restaurants in a web browser, called when 'View Map' is clicked.
+        The map is drawn in the background the first time it is asked for."""
+        rows = U.recommendations.rows()
+        latitude, longitude = U.latitude, U.longitude
+        self.status.config(text='Drawing the map...')
+        _loader().request(('map', latitude, longitude, tuple(rows)),
+                          lambda: computations.write_map_recommended(latitude, longitude, rows), self.map_ready)
+        self.poll_details()
+
+    def map_ready(self, succeeded: bool, path: Any) -> None:
+        """Open the map drawn by view_map"""
+        if self.restofinder.winfo_exists():
+            self.status.config(text='' if succeeded else f'Could not draw the map: {path}')
+        if succeeded:
+            webbrowser.open(Path(path).as_uri())
+
+    def poll_details(self) -> None:
+        """Show the details and maps loaded in the background, and check again later if more are coming"""
+        loader = _loader()
+        if self.details_poll is not None:
+            self.restofinder.after_cancel(self.details_poll)
+            self.details_poll = None
+        loader.poll()
+        if loader.busy() and self.restofinder.winfo_exists():
+            self.details_poll = self.restofinder.after(POLL_MS, self.poll_details)
+
+
+class Autocomplete:
+    """Suggestions for what is typed in an entry field, looked up once typing pauses for
+    SUGGEST_DELAY_MS (so fast typing does not look up every keystroke), and shown in a listbox (a
+    suggestion clicked replaces the text) or, for a combobox, as its drop-down values.
+    """
+    entry: Union[tk.Entry, ttk.Combobox]
+    complete: Callable[[str], list[str]]
+    listbox: Optional[tk.Listbox]
+    default: list[str]
+    on_pick: Optional[Callable]
+    pending: Optional[str]
+
+    def __init__(self, entry: Union[tk.Entry, ttk.Combobox], complete: Callable[[str], list[str]],
+                 listbox: Optional[tk.Listbox] = None, default: Optional[list[str]] = None,
+                 on_pick: Optional[Callable] = None) -> None:
+        """Suggest complete(text) for the text of entry. default is what a combobox offers when
+        nothing is typed; on_pick is called when a suggestion is clicked in the listbox."""
+        self.entry, self.complete, self.listbox = entry, complete, listbox
+        self.default = [] if default is None else default
+        self.on_pick = on_pick
+        self.pending = None
+        entry.bind('<KeyRelease>', self.typed, add='+')
+        if listbox is not None:
+            listbox.bind('<<ListboxSelect>>', self.picked)
+
+    def typed(self, event: tk.Event) -> None:
+        """Look suggestions up once typing pauses"""
+        if event.keysym in ('Up', 'Down', 'Return', 'Escape', 'Tab'):
+            return
+        if self.pending is not None:
+            self.entry.after_cancel(self.pending)
+        self.pending = self.entry.after(SUGGEST_DELAY_MS, self.suggest)
+
+    def suggest(self) -> None:
+        """Show the suggestions for the text typed so far"""
+        self.pending = None
+        suggestions = self.complete(self.entry.get())
+        if self.listbox is not None:
+            self.listbox.delete(0, 'end')
+            self.listbox.insert('end', *suggestions)
         else:
-            temp = computations.get_user_info(U, location=user_ad, distance=selected_distance,
-                                              cuisine=selected_cuis, price=selected_price_range,
-                                              star=selected_star)
-            if temp:
-                tk.Label(self.restofinder, text='Invalid address').pack()
-            else:
-                self.show_restaurants()
-
-    def show_restaurants(self) -> None:
-        """Show the restaurants meeting the user's criteria"""
-        recommended_restaurants = computations.run_restaurant_finder(user=U)
-
-        if len(recommended_restaurants) == 0:
-            (tk.Label(self.restofinder, text='No restaurants found, please edit your search requirements', font=18)
-             .pack(padx=20))
+            self.entry.configure(values=suggestions or self.default)
+
+    def picked(self, _event: object = None) -> None:
+        """Replace the text with the suggestion clicked in the listbox"""
+        selection = self.listbox.curselection()
+        if not selection:
+            return
+        self.entry.delete(0, 'end')
+        self.entry.insert(0, self.listbox.get(selection[0]))
+        self.listbox.delete(0, 'end')
+        if self.on_pick is not None:
+            self.on_pick()
+
+
+def _prefix_indexes() -> 'prefix_index.PrefixIndexes':
+    """Return the prefix indexes of the dataset, building them if need be (prefix_index, and numpy
+    with it, is only imported here, off the Tk thread)"""
+    from prefix_index import get_prefix_indexes
+
+    return get_prefix_indexes()
+
+
+def _choices(text: str) -> Union[str, list[str]]:
+    """Return the comma-separated values in text as a list, or text itself if it holds one value"""
+    values = [value.strip() for value in text.split(',') if value.strip()]
+    return values if len(values) > 1 else text.strip()
+
+
+class ResultsView:
+    """A sortable, scrollable table of search results.
+
+    Only the results scrolled to so far are put in the table: it starts with one page, and the next
+    page is asked of the results (see ranking.RankedResults) when the user scrolls near the end,
+    so the cost of showing results does not grow with how many there are. Clicking a column
+    heading orders the results by that column (clicking it again reverses the order).
+    """
+    # (column, heading, width) of each column of the table
+    COLUMNS = [('name', 'Restaurant', 230), ('cuisine', 'Cuisine', 140), ('price', 'Price', 80),
+               ('distance', 'Distance (km)', 100), ('rating', 'Yelp rating', 80)]
+    PAGE = 50
+
+    frame: tk.Frame
+    tree: ttk.Treeview
+    scrollbar: ttk.Scrollbar
+    results: Optional['ranking.RankedResults']
+    loaded: int
+    on_page: Optional[Callable]
+    loading: bool
+
+    def __init__(self, parent: tk.Misc, on_page: Optional[Callable] = None) -> None:
+        """Create the (empty) table in parent. on_page is called with each page of results loaded."""
+        self.frame = tk.Frame(parent)
+        self.tree = ttk.Treeview(self.frame, columns=[c[0] for c in self.COLUMNS], show='headings',
+                                 selectmode='browse', height=20)
+        for column, heading, width in self.COLUMNS:
+            self.tree.heading(column, text=heading, command=lambda c=column: self.sort(c))
+            self.tree.column(column, width=width, anchor='w')
+        self.scrollbar = ttk.Scrollbar(self.frame, orient='vertical', command=self.tree.yview)
+        self.tree.configure(yscrollcommand=self.scrolled)
+        self.tree.pack(side='left', fill='both', expand=True)
+        self.scrollbar.pack(side='right', fill='y')
+        self.results = None
+        self.loaded = 0
+        self.on_page = on_page
+        self.loading = False
+
+    def show(self, results: 'ranking.RankedResults') -> None:
+        """Show results, from the first one"""
+        self.results = results
+        self.tree.delete(*self.tree.get_children())
+        self.loaded = 0
+        self.load_more()
+        self.update_headings()
+
+    def load_more(self) -> None:
+        """Add the next page of results to the table"""
+        self.loading = False
+        if self.results is None or self.loaded >= len(self.results):
+            return
+        page = self.results.top(self.PAGE, self.loaded)
+        for restaurant, row in page:
+            self.tree.insert('', 'end', iid=str(row), values=(
+                restaurant.name, restaurant.cuisine, restaurant.price_range, f'{restaurant.distance[1]:.2f}',
+                _rating_text(restaurant.star_rating)))
+        self.loaded += len(page)
+        if self.on_page is not None:
+            self.on_page(page)
+
+    def scrolled(self, first: str, last: str) -> None:
+        """Move the scrollbar, and load the next page when the end of the table comes into view"""
+        self.scrollbar.set(first, last)
+        if float(last) > 0.9 and self.results is not None and self.loaded < len(self.results) and not self.loading:
+            self.loading = True
+            self.tree.after_idle(self.load_more)
+
+    def sort(self, column: str) -> None:
+        """Order the results by column, called when its heading is clicked"""
+        if self.results is None:
+            return
+        if self.results.sort_column == column:
+            self.results.order_by(column, not self.results.descending)
         else:
-            show_recs = tk.Tk()
-            show_recs.geometry("500x800")
-            show_recs.title("Search Results")
-
-            tk.Label(show_recs, text='Restaurants found:', font=18).pack(padx=20)
-            for r in recommended_restaurants:
-                resto_name = r[12:len(r) - 1]
-                tk.Label(show_recs, text=resto_name, font=14).pack()
-                tk.Button(show_recs, text='More Info', font=12, command=self.get_resto_info(resto_name)).pack()
-
-            tk.Button(show_recs, text='View Map', command=computations.display_map_recommended(U)).pack()
-
-    def get_resto_info(self, name: str) -> None:
-        """Run the restaurant finder from the backend file"""
-        more_info = tk.Tk()
-        more_info.title(name)
-
-        a, c, r = tk.IntVar(), tk.IntVar(), tk.IntVar()
-
-        location = tk.Checkbutton(more_info, text='Location', variable=a)
-        location.pack()
-        contact = tk.Checkbutton(more_info, text='Contact Information', variable=c)
-        contact.pack()
-        review = tk.Checkbutton(more_info, text='Review Information', variable=r)
-        review.pack()
-
-        matches = computations.get_restaurant_info(user=U, restaurant=name, loc=(location == 1), con=(contact == 1),
-                                                   review=review == 1)
-        for m in matches[:len(matches) - 1]:
-            tk.Label(location, text=m[0], font=14).pack()
-            for n in m[1]:
-                if n:
-                    tk.Label(location, text=n, font=12).pack()
-        if matches[len(matches) - 1]:
-            tk.Label(location, text=matches[len(matches) - 1], font=14).pack()
+            self.results.order_by(column)
+        self.show(self.results)
+
+    def update_headings(self) -> None:
+        """Mark the heading of the column the results are ordered by with the direction"""
+        for column, heading, _ in self.COLUMNS:
+            if self.results is not None and self.results.sort_column == column:
+                heading += ' \u25bc' if self.results.descending else ' \u25b2'
+            self.tree.heading(column, text=heading)
+
+    def update_rating(self, row: int, rating: Optional[float]) -> None:
+        """Show a star rating that has just been checked, if its restaurant is in the table"""
+        if self.tree.exists(str(row)):
+            self.tree.set(str(row), 'rating', _rating_text(rating))
+
+    def selected(self) -> Optional['restaurant_table.RestaurantRow']:
+        """Return the selected restaurant, or None if none is selected"""
+        item = self.tree.focus()
+        if not item or self.results is None:
+            return None
+        result = self.results.result(int(item))
+        return None if result is None else result[0]
+
+
+def _rating_text(rating: Optional[float]) -> str:
+    """Return how a star rating is shown in the results table ('' when unknown)"""
+    return f'{rating:.1f}' if rating is not None and rating >= 1 else ''
 
 
 class ShowEvents:
     """Window to show user-inputted events"""
-    show_events: tk.Tk()
+    show_events: tk.Toplevel
 
-    def __init__(self) -> None:
-        """Create the show_events window"""
-        self.show_events = tk.Tk()
-        self.show_events.title("Events")
-        self.show_events.geometry("500x500")
+    def __init__(self, window: tk.Toplevel) -> None:
+        """Fill in the show_events window"""
+        self.show_events = window
 
         tk.Label(self.show_events, text='Upcoming events:', font=14).pack(pady=20)
 
@@ -173,23 +614,24 @@ class ShowEvents:
                 tk.Label(self.show_events, text=i).pack()
                 tk.Label(self.show_events, text='').pack(pady=10)
 
-        self.show_events.mainloop()
+    @staticmethod
+    def open() -> 'ShowEvents':
+        """Open the events window, or refresh it and bring it to the front if it is already open"""
+        return WINDOWS.open('events', 'Events', '500x500', ShowEvents, rebuild=True)
 
 
 class CreateEvent:
     """Window to create a new event"""
-    create_event: tk.Tk()
+    create_event: tk.Toplevel
     n: tk.Entry
     d: tk.Entry
     t: tk.Entry
     a: tk.Entry
     temp_info: list
 
-    def __init__(self) -> None:
-        """Create the create_event window"""
-        self.create_event = tk.Tk()
-        self.create_event.title("Create an event")
-        self.create_event.geometry("500x700")
+    def __init__(self, window: tk.Toplevel) -> None:
+        """Fill in the create_event window"""
+        self.create_event = window
 
         tk.Label(self.create_event, text="Create a new event", font=('Arial', 18)).pack(pady=20)
 
@@ -219,7 +661,10 @@ class CreateEvent:
         tk.Button(self.create_event, text="Add more information (optional)", font=14, command=self.add_more_info).pack()
         tk.Label(self.create_event, text="eg. event website, entry requirements, etc", font=10).pack()
 
-        self.create_event.mainloop()
+    @staticmethod
+    def open() -> 'CreateEvent':
+        """Open the create_event window, or bring it to the front if it is already open"""
+        return WINDOWS.open('create event', 'Create an event', '500x700', CreateEvent)
 
     def add_more_info(self) -> None:
         """Entry boxes to add more info"""
@@ -237,11 +682,9 @@ class CreateEvent:
         more_info = {e.get() for e in self.temp_info}
 
         computations.create_event(name, location, (date, time), more_info)
-        temp = tk.Tk()
-        temp.title("saved")
-        temp.geometry("200x70")
-        tk.Label(temp, text="Event Uploaded!", font=('Arial', 20)).pack()
-        self.create_event.destroy()
+        WINDOWS.open('saved', 'saved', '200x70',
+                     lambda window: tk.Label(window, text="Event Uploaded!", font=('Arial', 20)).pack())
+        WINDOWS.close('create event')
 
 
 ###################################################################################################
@@ -260,5 +703,7 @@ if __name__ == '__main__':
     import python_ta
     python_ta.check_all(config={
         'max-line-length': 120,
-        'extra-imports': ['hashlib', 'tkinter', 'computations']
+        'extra-imports': ['os', 'tkinter', 'webbrowser', 'pathlib', 'typing', 'computations', 'detail_loader',
+                          'distances', 'name_index', 'prefix_index', 'search_worker', 'stall_monitor', 'windows'],
+        'allowed-io': ['Home.__init__']
     })
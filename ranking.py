@@ -0,0 +1,277 @@
+"""Ranking of search results by distance, star rating and price fit.
+
+Every restaurant matching a search gets a score between 0 and 1:
+    - distance: 1 at the user's location, halving every DISTANCE_HALF_KM km
+    - rating: the Yelp star rating out of 5, or RATING_PRIOR for restaurants whose rating is not
+      known (yet)
+    - price fit: how much the restaurant's price range overlaps the one the user asked for
+
+RankedResults only orders as many results as have been asked for: the best offset + k are
+selected with numpy.argpartition (linear in the number of matches) and only those are sorted, so
+showing the first page of a dense cuisine does not sort every match.
+"""
+from __future__ import annotations
+
+import math
+import re
+from typing import Any, Optional, Union
+
+import numpy as np
+
+from computations import get_distance_buckets
+
+# Weights of the parts of a score; they add up to 1
+DISTANCE_WEIGHT = 0.5
+RATING_WEIGHT = 0.35
+PRICE_WEIGHT = 0.15
+
+DISTANCE_HALF_KM = 2.0
+
+# Rating assumed for restaurants whose rating is unknown (0.0, the "cannot be fetched" placeholder,
+# counts as unknown)
+RATING_PRIOR = 3.0
+
+# Results per page
+PAGE_SIZE = 20
+
+# The columns results can be ordered by, and whether each is ordered in decreasing order by default
+SORT_COLUMNS = {'score': True, 'name': False, 'cuisine': False, 'price': False, 'distance': False, 'rating': True}
+
+# Upper end, in dollars, of the open-ended price range 'Above $61'
+_MAX_PRICE = 100.0
+
+
+def price_bounds(price_range: str) -> Optional[tuple[float, float]]:
+    """Return the (lowest, highest) price in dollars of a price range of the dataset, or None if it
+    is not one.
+
+    >>> price_bounds('$11-30'), price_bounds('US$11-30')
+    ((11.0, 30.0), (11.0, 30.0))
+    >>> price_bounds('Under $10'), price_bounds('Above $61')
+    ((0.0, 10.0), (61.0, 100.0))
+    """
+    numbers = [float(x) for x in re.findall(r'\d+', price_range)]
+    if len(numbers) == 2:
+        return numbers[0], numbers[1]
+    elif len(numbers) == 1 and price_range.lower().startswith('under'):
+        return 0.0, numbers[0]
+    elif len(numbers) == 1 and price_range.lower().startswith('above'):
+        return numbers[0], max(numbers[0], _MAX_PRICE)
+    return None
+
+
+def price_fit(wanted: Union[str, list[str]], price_range: str) -> float:
+    """Return how well price_range fits the wanted price range: the length of their overlap over
+    the length of their union (1.0 for the same range, 0.0 for disjoint or unknown ranges). If
+    several price ranges are wanted, the best fit; if 'Any' is wanted, 1.0.
+
+    >>> price_fit('$11-30', 'US$11-30')
+    1.0
+    >>> price_fit('$11-30', '$31-60')
+    0.0
+    >>> price_fit(['Under $10', '$31-60'], '$31-60'), price_fit('Any', '$31-60')
+    (1.0, 1.0)
+    """
+    if not isinstance(wanted, str):
+        return max((price_fit(w, price_range) for w in wanted), default=0.0)
+    if wanted.strip().casefold() == 'any':
+        return 1.0
+    a, b = price_bounds(wanted), price_bounds(price_range)
+    if a is None or b is None:
+        return 0.0
+    overlap = min(a[1], b[1]) - max(a[0], b[0])
+    union = max(a[1], b[1]) - min(a[0], b[0])
+    return max(0.0, overlap) / union if union > 0 else 1.0
+
+
+def score(distances: np.ndarray, ratings: np.ndarray, fits: np.ndarray) -> np.ndarray:
+    """Return the score of each result from its distance in km, star rating (NaN if unknown) and
+    price fit.
+
+    >>> score(np.array([0.0, 2.0]), np.array([5.0, np.nan]), np.array([1.0, 1.0])).round(3).tolist()
+    [1.0, 0.61]
+    """
+    ratings = np.where(np.isnan(ratings) | (ratings < 1), RATING_PRIOR, ratings)
+    return (DISTANCE_WEIGHT * np.exp2(-np.asarray(distances) / DISTANCE_HALF_KM)
+            + RATING_WEIGHT * ratings / 5 + PRICE_WEIGHT * np.asarray(fits))
+
+
+def top_k(scores: np.ndarray, k: int, keys: Optional[np.ndarray] = None) -> np.ndarray:
+    """Return the positions of the k highest scores, highest first. Equal scores are ordered by
+    increasing key (by default, by position), so the result does not depend on k.
+
+    >>> top_k(np.array([0.2, 0.9, 0.5, 0.9]), 3).tolist()
+    [1, 3, 2]
+    """
+    n = len(scores)
+    if keys is None:
+        keys = np.arange(n)
+    if k < n:
+        threshold = scores[np.argpartition(-scores, k - 1)[k - 1]] if k > 0 else math.inf
+        selected = np.flatnonzero(scores >= threshold)
+    else:
+        selected = np.arange(n)
+    order = selected[np.lexsort((keys[selected], -scores[selected]))]
+    return order[:k]
+
+
+class RankedResults:
+    """The results of a search, ordered best first (or by another column) on demand.
+
+    Instance Attributes:
+        - table: the restaurant_table.RestaurantTable the results are rows of
+        - rows: the row number of each result, in dataset order
+        - distances: the distance in km of each result from the user
+        - scores: the score of each result
+        - ratings: the star rating of each result (as in the table's star_ratings), or None if they
+          are read from the table
+        - wanted_price: the price range(s) the user asked for, or 'Any'
+        - sort_column: the column the results are ordered by, one of SORT_COLUMNS
+        - descending: whether they are ordered by decreasing sort_column
+
+    Representation Invariants:
+        - len(self.rows) == len(self.distances) == len(self.scores)
+        - self.ratings is None or len(self.ratings) == len(self.rows)
+        - self.sort_column in SORT_COLUMNS
+        - self._order is a prefix of the results ordered by decreasing self._keys
+    """
+    # Private Instance Attributes:
+    #   - _keys: the sort key of each result (the result with the highest comes first), or None
+    #     if it has not been computed yet
+    #   - _order: positions (into rows) of the first results found so far, in order
+    table: Any
+    rows: np.ndarray
+    distances: np.ndarray
+    scores: np.ndarray
+    ratings: Optional[np.ndarray]
+    wanted_price: Union[str, list[str]]
+    sort_column: str
+    descending: bool
+    _keys: Optional[np.ndarray]
+    _order: np.ndarray
+
+    def __init__(self, table: Any, rows: np.ndarray, distances: np.ndarray,
+                 wanted_price: Union[str, list[str]], ratings: Optional[np.ndarray] = None) -> None:
+        """Score the given rows of table, at the given distances and with the given star ratings (by
+        default, the table's), for a user wanting wanted_price."""
+        self.table = table
+        self.rows = rows
+        self.distances = distances
+        self.ratings = ratings
+        self.wanted_price = wanted_price
+        self.sort_column, self.descending = 'score', True
+        self.rescore()
+
+    def __len__(self) -> int:
+        """Return the number of results."""
+        return len(self.rows)
+
+    def page_count(self, size: int = PAGE_SIZE) -> int:
+        """Return the number of pages of the given size."""
+        return -(-len(self) // size)
+
+    def top(self, k: int, offset: int = 0) -> list:
+        """Return results offset to offset + k (in rank order) as (restaurant row, row number) pairs."""
+        end = min(offset + k, len(self))
+        if end > len(self._order):
+            if self._keys is None:
+                self._keys = self._sort_keys()
+            # at least double what has been ordered, so paging through every result stays linear
+            self._order = top_k(self._keys, max(end, 2 * len(self._order)), self.rows)
+        positions = self._order[offset:end]
+        distances = self.distances[positions]
+        return [(r, r.row_id) for r in self.table.rows(self.rows[positions], distances,
+                                                       get_distance_buckets(distances))]
+
+    def result(self, row: int) -> Optional[tuple]:
+        """Return the result in the given row of the table as a (restaurant row, row number) pair,
+        or None if that row is not one of the results."""
+        position = int(np.searchsorted(self.rows, row))
+        if position == len(self.rows) or self.rows[position] != row:
+            return None
+        distances = self.distances[position:position + 1]
+        return self.table.rows([row], distances, get_distance_buckets(distances))[0], row
+
+    def rating(self, row: int) -> float:
+        """Return the star rating of the result in the given row of the table (as in the table's
+        star_ratings), which must be one of the results."""
+        return float(self._star_ratings()[np.searchsorted(self.rows, row)])
+
+    def page(self, number: int, size: int = PAGE_SIZE) -> list:
+        """Return page number (from 0) of the results, pages being size results long."""
+        return self.top(size, number * size)
+
+    def keep(self, mask: np.ndarray) -> RankedResults:
+        """Keep only the results selected by a boolean mask over them (e.g. after fetching ratings)."""
+        self.rows, self.distances, self.scores = self.rows[mask], self.distances[mask], self.scores[mask]
+        if self.ratings is not None:
+            self.ratings = self.ratings[mask]
+        self._keys, self._order = None, np.empty(0, dtype=np.int64)
+        return self
+
+    def order_by(self, column: str, descending: Optional[bool] = None) -> None:
+        """Order the results by column (one of SORT_COLUMNS), in decreasing order if descending (by
+        default, the column's usual order). Results with an unknown value come last either way, and
+        ties are ordered by row number.
+        """
+        if column not in SORT_COLUMNS:
+            raise ValueError(f'Cannot order results by {column!r}')
+        self.sort_column = column
+        self.descending = SORT_COLUMNS[column] if descending is None else descending
+        self._keys, self._order = None, np.empty(0, dtype=np.int64)
+
+    def _sort_keys(self) -> np.ndarray:
+        """Return the sort key of each result for the current order."""
+        if self.sort_column == 'score':
+            values = self.scores
+        elif self.sort_column == 'distance':
+            values = self.distances
+        elif self.sort_column == 'rating':
+            ratings = self._star_ratings()
+            values = np.where(ratings >= 1, ratings, np.nan)
+        elif self.sort_column == 'price':
+            lows = [np.nan if b is None else b[0] for b in map(price_bounds, self.table.price_ranges)]
+            values = np.array(lows, dtype=np.float64)[self.table.price_codes[self.rows]]
+        elif self.sort_column == 'name':
+            values = _string_ranks(self.table.names.table)[self.table.names.codes[self.rows]]
+        else:
+            values = _string_ranks(self.table.cuisines)[self.table.cuisine_codes[self.rows]]
+        keys = np.asarray(values, dtype=np.float64) * (1 if self.descending else -1)
+        return np.where(np.isnan(keys), -math.inf, keys)
+
+    def rescore(self) -> None:
+        """(Re)compute the scores from the current star ratings, e.g. after fetching them."""
+        fits = np.array([price_fit(self.wanted_price, price_range) for price_range in self.table.price_ranges])
+        self.scores = score(self.distances, self._star_ratings(), fits[self.table.price_codes[self.rows]])
+        self._keys, self._order = None, np.empty(0, dtype=np.int64)
+
+    def _star_ratings(self) -> np.ndarray:
+        """Return the star rating of each result."""
+        return self.table.star_ratings[self.rows] if self.ratings is None else self.ratings
+
+
+def _string_ranks(values: list[str]) -> np.ndarray:
+    """Return the position of each of values in alphabetical order, ignoring case.
+
+    >>> _string_ranks(['b', 'C', 'a']).tolist()
+    [1.0, 2.0, 0.0]
+    """
+    ranks = np.empty(len(values), dtype=np.float64)
+    ranks[sorted(range(len(values)), key=lambda i: values[i].casefold())] = np.arange(len(values))
+    return ranks
+
+
+###################################################################################################
+# Main block
+###################################################################################################
+if __name__ == '__main__':
+    import doctest
+
+    doctest.testmod(verbose=True)
+
+    import python_ta
+
+    python_ta.check_all(config={
+        'max-line-length': 120,
+        'extra-imports': ['math', 're', 'numpy', 'computations']
+    })
@@ -0,0 +1,207 @@
+"""Persistent on-disk cache of Yelp star ratings.
+
+Ratings are stored in a small sqlite database keyed by the canonical business url, so repeat
+searches and "More Info" clicks do not refetch the same Yelp pages, even across runs.
+
+    - entries expire after a time to live (ttl)
+    - pages with no rating are cached too (negative caching), with their own, shorter ttl
+    - the number of entries is bounded; the least recently used entries are evicted first
+    - hits, misses and evictions are counted
+"""
+from __future__ import annotations
+
+import sqlite3
+import threading
+import time
+from typing import Optional
+from urllib.parse import urlsplit, urlunsplit
+
+RATING_CACHE_PATH = 'rating_cache.sqlite3'
+
+DAY = 24 * 60 * 60
+
+_CACHE = None
+_CACHE_LOCK = threading.Lock()
+
+
+def canonical_url(url: str) -> str:
+    """Return the canonical form of a Yelp business url: lower-case scheme and host, no query
+    string, fragment or trailing slash.
+
+    >>> canonical_url('https://WWW.Yelp.ca/biz/the-host-toronto-2/?osq=Afghan#reviews')
+    'https://www.yelp.ca/biz/the-host-toronto-2'
+    """
+    parts = urlsplit(url.strip())
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path.rstrip('/'), '', ''))
+
+
+class RatingCache:
+    """A size-bounded, persistent cache from Yelp business url to star rating.
+
+    Instance Attributes:
+        - path: the sqlite database file (':memory:' for a cache that is not persisted)
+        - ttl: seconds a found rating stays valid
+        - negative_ttl: seconds a "page has no rating" entry stays valid
+        - max_entries: the most entries kept; least recently used entries are evicted first
+        - hits: lookups answered by the cache
+        - misses: lookups that were not in the cache, or had expired
+        - evictions: entries removed to stay within max_entries
+
+    Representation Invariants:
+        - self.ttl >= 0 and self.negative_ttl >= 0
+        - self.max_entries > 0
+    """
+    # Private Instance Attributes:
+    #   - _conn: the open database connection
+    #   - _lock: serializes use of _conn, which is shared between threads
+    path: str
+    ttl: float
+    negative_ttl: float
+    max_entries: int
+    hits: int
+    misses: int
+    evictions: int
+    _conn: sqlite3.Connection
+    _lock: threading.Lock
+
+    def __init__(self, path: str = RATING_CACHE_PATH, ttl: float = 7 * DAY, negative_ttl: float = DAY,
+                 max_entries: int = 50000) -> None:
+        """Open (creating if needed) the cache stored at path."""
+        self.path = path
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self.hits = self.misses = self.evictions = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute('CREATE TABLE IF NOT EXISTS ratings (url TEXT PRIMARY KEY, rating REAL, '
+                           'fetched REAL NOT NULL, accessed REAL NOT NULL)')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS ratings_accessed ON ratings (accessed)')
+        self._conn.commit()
+
+    def get(self, url: str) -> tuple[bool, Optional[float]]:
+        """Return (found, rating) for url. rating is None if the cached page had no rating.
+
+        >>> cache = RatingCache(':memory:')
+        >>> cache.get('https://www.yelp.ca/biz/a')
+        (False, None)
+        >>> cache.put('https://www.yelp.ca/biz/a', 4.5)
+        >>> cache.get('https://www.yelp.ca/biz/a/?osq=x')
+        (True, 4.5)
+        >>> cache.hits, cache.misses
+        (1, 1)
+        """
+        return self.get_many([url])[0]
+
+    def get_many(self, urls: list[str]) -> list[tuple[bool, Optional[float]]]:
+        """Return (found, rating) for each url, as get does, in one round trip to the database."""
+        keys = [canonical_url(url) for url in urls]
+        now = time.time()
+        with self._lock:
+            rows = {}
+            unique = list(set(keys))
+            for start in range(0, len(unique), 500):
+                chunk = unique[start:start + 500]
+                rows.update((url, (rating, fetched)) for url, rating, fetched in self._conn.execute(
+                    f'SELECT url, rating, fetched FROM ratings WHERE url IN ({",".join("?" * len(chunk))})', chunk))
+            results, touched, expired = [], [], []
+            for key in keys:
+                entry = rows.get(key)
+                if entry is not None:
+                    rating, fetched = entry
+                    if now - fetched <= (self.ttl if rating is not None else self.negative_ttl):
+                        touched.append((now, key))
+                        self.hits += 1
+                        results.append((True, rating))
+                        continue
+                    expired.append((key,))
+                self.misses += 1
+                results.append((False, None))
+            if touched or expired:
+                self._conn.executemany('UPDATE ratings SET accessed = ? WHERE url = ?', touched)
+                self._conn.executemany('DELETE FROM ratings WHERE url = ?', expired)
+                self._conn.commit()
+            return results
+
+    def put(self, url: str, rating: Optional[float]) -> None:
+        """Record the rating found on url's page (None if the page has no rating)."""
+        self.put_many([(url, rating)])
+
+    def put_many(self, ratings: list[tuple[str, Optional[float]]]) -> None:
+        """Record several (url, rating) pairs at once."""
+        now = time.time()
+        with self._lock:
+            self._conn.executemany('INSERT OR REPLACE INTO ratings (url, rating, fetched, accessed) '
+                                   'VALUES (?, ?, ?, ?)',
+                                   [(canonical_url(url), rating, now, now) for url, rating in ratings])
+            (count,) = self._conn.execute('SELECT COUNT(*) FROM ratings').fetchone()
+            if count > self.max_entries:
+                excess = count - self.max_entries
+                self._conn.execute('DELETE FROM ratings WHERE url IN '
+                                   '(SELECT url FROM ratings ORDER BY accessed LIMIT ?)', (excess,))
+                self.evictions += excess
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        """Return the number of entries in the cache, including expired ones not yet removed."""
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM ratings').fetchone()[0]
+
+    def hit_ratio(self) -> float:
+        """Return the fraction of lookups answered by the cache."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self) -> dict[str, float]:
+        """Return the cache's counters."""
+        return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+                'hit_ratio': self.hit_ratio(), 'entries': len(self)}
+
+    def clear(self) -> None:
+        """Remove every entry and reset the counters."""
+        with self._lock:
+            self._conn.execute('DELETE FROM ratings')
+            self._conn.commit()
+            self.hits = self.misses = self.evictions = 0
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+def get_rating_cache() -> RatingCache:
+    """Return the process-wide rating cache, opening it on first use."""
+    global _CACHE
+    if _CACHE is None:
+        with _CACHE_LOCK:
+            if _CACHE is None:
+                _CACHE = RatingCache()
+    return _CACHE
+
+
+def set_rating_cache(cache: Optional[RatingCache]) -> None:
+    """Replace the process-wide rating cache (e.g. with one at another path). With None, the
+    default cache is opened again on next use.
+    """
+    global _CACHE
+    with _CACHE_LOCK:
+        _CACHE = cache
+
+
+###################################################################################################
+# Main block
+###################################################################################################
+if __name__ == '__main__':
+    import doctest
+
+    doctest.testmod(verbose=True)
+
+    import python_ta
+
+    python_ta.check_all(config={
+        'max-line-length': 120,
+        'extra-imports': ['sqlite3', 'threading', 'time', 'urllib.parse']
+    })
@@ -0,0 +1,154 @@
+"""Linear-time, streaming extraction of the star rating from a Yelp page.
+
+The rating on a Yelp page is the first aria-label whose value starts with a digit, e.g.
+aria-label="4.5 star rating". StarRatingScanner finds it while the page is still downloading:
+chunks are fed in as they arrive, each character is looked at a constant number of times, and
+only the last few characters of the page are kept between chunks. Once a rating is found the
+caller can stop reading the response.
+
+yelp_pages/ holds trimmed Yelp pages the doctests below are run against: a business page with a
+rating (rated.html), one without (unrated.html) and an ad redirect (adredir.html).
+"""
+from __future__ import annotations
+
+from typing import Any, Iterable, Optional
+
+MARKER = 'label='
+
+# Characters needed after the start of MARKER to read a rating: the quote, then e.g. '4.5'
+_LOOKAHEAD = len(MARKER) + 4
+
+
+class StarRatingScanner:
+    """Scans a page, chunk by chunk, for its star rating.
+
+    Instance Attributes:
+        - rating: the rating found, or None if none has been found (yet)
+        - done: whether a rating has been found, or the whole page has been scanned
+
+    >>> scanner = StarRatingScanner()
+    >>> scanner.feed('<div aria-label="Photo"></div><div aria-lab')
+    False
+    >>> scanner.feed('el="3.5 star rating"></div>')
+    True
+    >>> scanner.rating
+    3.5
+    """
+    # Private Instance Attributes:
+    #   - _buffer: the part of the page that still has to be scanned
+    rating: Optional[float]
+    done: bool
+    _buffer: str
+
+    def __init__(self) -> None:
+        """Initialize a scanner at the start of a page."""
+        self.rating = None
+        self.done = False
+        self._buffer = ''
+
+    def feed(self, chunk: str) -> bool:
+        """Scan the next chunk of the page. Return whether the scan is done."""
+        if self.done:
+            return True
+        buf = self._buffer + chunk
+        pos = 0
+        while True:
+            i = buf.find(MARKER, pos)
+            if i == -1:
+                self._buffer = buf[max(pos, len(buf) - len(MARKER) + 1):]
+                return False
+            if i + _LOOKAHEAD > len(buf):
+                self._buffer = buf[i:]
+                return False
+            if self._read(buf, i):
+                return True
+            pos = i + 1
+
+    def finish(self) -> Optional[float]:
+        """Scan what is left at the end of the page and return the rating (None if there is none)."""
+        if not self.done:
+            buf = self._buffer
+            pos = 0
+            while not self.done:
+                i = buf.find(MARKER, pos)
+                if i == -1:
+                    break
+                self._read(buf, i)
+                pos = i + 1
+            self._buffer = ''
+            self.done = True
+        return self.rating
+
+    def _read(self, buf: str, i: int) -> bool:
+        """Read the rating after the marker at buf[i], if there is one. Return whether there was."""
+        start = i + len(MARKER) + 1
+        if start >= len(buf) or buf[start] not in '1234567890':
+            return False
+        if start + 1 < len(buf) and buf[start + 1] == '.':
+            try:
+                self.rating = float(buf[start:start + 3])
+            except ValueError:
+                self.rating = float(buf[start])
+        else:
+            self.rating = float(buf[start])
+        self.done = True
+        self._buffer = ''
+        return True
+
+
+def scan_star_rating(chunks: Iterable[str]) -> Optional[float]:
+    """Return the star rating in the page made of chunks, or None if it has none.
+
+    Stops consuming chunks as soon as the rating is found.
+
+    >>> scan_star_rating(['<div aria-label="4', '.5 star rating">', 'never read'])
+    4.5
+    >>> scan_star_rating(['<div aria-label="Photo">', '</div>']) is None
+    True
+
+    On the saved pages of yelp_pages/, read a few characters at a time (so markers are split
+    between chunks): a business page has its rating after the aria-labels of the header, a
+    business with no reviews has none, and neither has the page of an ad redirect (the links
+    get_star_ratings does not fetch):
+
+    >>> from pathlib import Path
+    >>> pages = Path(__file__).parent / 'yelp_pages'
+    >>> def scan_page(name: str) -> Optional[float]:
+    ...     with open(pages / name, encoding='utf-8') as page:
+    ...         return scan_star_rating(iter(lambda: page.read(7), ''))
+    >>> scan_page('rated.html')
+    4.5
+    >>> scan_page('unrated.html') is None
+    True
+    >>> scan_page('adredir.html') is None
+    True
+    """
+    scanner = StarRatingScanner()
+    for chunk in chunks:
+        if scanner.feed(chunk):
+            break
+    return scanner.finish()
+
+
+def read_star_rating(response: Any, chunk_size: int = 16384) -> Optional[float]:
+    """Return the star rating on the page of a streamed requests response (requested with
+    stream=True), reading only as much of the body as needed to find it.
+    """
+    if response.encoding is None:
+        response.encoding = 'utf-8'
+    return scan_star_rating(response.iter_content(chunk_size, decode_unicode=True))
+
+
+###################################################################################################
+# Main block
+###################################################################################################
+if __name__ == '__main__':
+    import doctest
+
+    doctest.testmod(verbose=True)
+
+    import python_ta
+
+    python_ta.check_all(config={
+        'max-line-length': 120,
+    })
@@ -0,0 +1,194 @@
+"""Concurrent, connection-pooled fetching of Yelp star ratings.
+
+RatingFetcher fetches many pages at once on a thread pool, through one shared requests.Session (so
+connections to the same host are reused), with:
+    - a limit on the number of requests in flight to any one host
+    - connect/read timeouts on every request
+    - retries with exponential backoff (and jitter) on connection errors, timeouts and
+      429/5xx responses
+    - an overall latency budget per batch: pages not fetched by then are reported as unknown, and
+      those already being fetched are handed to a callback when they finish (to be cached)
+"""
+from __future__ import annotations
+
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Callable, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from rating_extractor import read_star_rating
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Seconds between checks for cancellation while waiting for pages
+CANCEL_CHECK_INTERVAL = 0.05
+
+_FETCHER = None
+_FETCHER_LOCK = threading.Lock()
+
+
+class RatingFetcher:
+    """Fetches star ratings from Yelp pages concurrently.
+
+    Instance Attributes:
+        - max_workers: the most pages fetched at once
+        - per_host: the most pages fetched at once from any one host
+        - timeout: (connect, read) timeout of each request in seconds
+        - retries: how many times a failed request is retried
+        - backoff: the delay before the first retry in seconds; it doubles with every retry
+
+    Representation Invariants:
+        - 0 < self.per_host <= self.max_workers
+        - self.retries >= 0
+    """
+    # Private Instance Attributes:
+    #   - _session: the connection-pooled session every request goes through
+    #   - _executor: the thread pool the requests run on
+    #   - _host_slots: a semaphore per host, limiting requests in flight to it
+    #   - _lock: guards _host_slots
+    max_workers: int
+    per_host: int
+    timeout: tuple[float, float]
+    retries: int
+    backoff: float
+    _session: requests.Session
+    _executor: ThreadPoolExecutor
+    _host_slots: dict[str, threading.Semaphore]
+    _lock: threading.Lock
+
+    def __init__(self, max_workers: int = 16, per_host: int = 8, timeout: tuple[float, float] = (3.05, 10.0),
+                 retries: int = 2, backoff: float = 0.25) -> None:
+        """Initialize a new fetcher with its own session and thread pool."""
+        self.max_workers = max_workers
+        self.per_host = min(per_host, max_workers)
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max_workers)
+        self._session.mount('http://', adapter)
+        self._session.mount('https://', adapter)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='rating-fetch')
+        self._host_slots = {}
+        self._lock = threading.Lock()
+
+    def _slot(self, url: str) -> threading.Semaphore:
+        """Return the semaphore limiting requests in flight to url's host."""
+        host = urlsplit(url).netloc
+        with self._lock:
+            if host not in self._host_slots:
+                self._host_slots[host] = threading.Semaphore(self.per_host)
+            return self._host_slots[host]
+
+    def fetch(self, url: str) -> Optional[float]:
+        """Return the star rating on the page at url, or None if the page has no rating.
+
+        Raises requests.exceptions.MissingSchema if url is not a valid url, and the last error if
+        every attempt failed.
+        """
+        if url == '':
+            return 0.0
+        with self._slot(url):
+            for attempt in range(self.retries + 1):
+                try:
+                    with self._session.get(url, timeout=self.timeout, stream=True) as response:
+                        if response.status_code not in RETRY_STATUSES:
+                            return read_star_rating(response)
+                        error = requests.HTTPError(f'{response.status_code} from {url}', response=response)
+                except (requests.ConnectionError, requests.Timeout) as e:
+                    error = e
+                if attempt < self.retries:
+                    time.sleep(self.backoff * (2 ** attempt) * (0.5 + random.random()))
+            raise error
+
+    def fetch_many(self, urls: list[str], budget: Optional[float] = None,
+                   on_result: Optional[Callable[[str, Optional[float]], None]] = None,
+                   cancel: Optional[threading.Event] = None,
+                   on_late: Optional[Callable[[str, Optional[float]], None]] = None) -> dict[str, Optional[float]]:
+        """Return the rating of each distinct url that could be fetched within budget seconds
+        (no limit if budget is None), or before cancel is set. Urls that failed, or were not done in
+        time, are left out.
+
+        on_result(url, rating) is called as each rating arrives. Pages still being fetched when the
+        budget runs out (or cancel is set) are not waited for, but finish in the background;
+        on_late(url, rating) is then called, from a pool thread, with each rating they return.
+        """
+        deadline = None if budget is None else time.monotonic() + budget
+        futures = {self._executor.submit(self.fetch, url): url for url in dict.fromkeys(urls)}
+        results = {}
+        pending = set(futures)
+        while pending and not (cancel is not None and cancel.is_set()):
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            if cancel is not None:
+                # wake up regularly to notice cancellation
+                timeout = CANCEL_CHECK_INTERVAL if timeout is None else min(timeout, CANCEL_CHECK_INTERVAL)
+            done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                if deadline is not None and time.monotonic() >= deadline:
+                    break
+                continue
+            for future in done:
+                rating = _result_or_missing(future)
+                if rating is not _MISSING:
+                    results[futures[future]] = rating
+                    if on_result is not None:
+                        on_result(futures[future], rating)
+        for future in pending:
+            if not future.cancel() and on_late is not None:
+                future.add_done_callback(lambda f, url=futures[future]: _report_late(f, url, on_late))
+        return results
+
+    def close(self) -> None:
+        """Stop the thread pool and close the session."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._session.close()
+
+
+_MISSING = object()
+
+
+def _result_or_missing(future: Future) -> object:
+    """Return the result of a finished fetch, or _MISSING if it raised."""
+    try:
+        return future.result()
+    except (requests.RequestException, ValueError):
+        return _MISSING
+
+
+def _report_late(future: Future, url: str, on_late: Callable[[str, Optional[float]], None]) -> None:
+    """Pass the rating of a fetch that finished after fetch_many returned to on_late, unless it failed."""
+    rating = _result_or_missing(future)
+    if rating is not _MISSING:
+        on_late(url, rating)
+
+
+def get_rating_fetcher() -> RatingFetcher:
+    """Return the process-wide rating fetcher, creating it on first use."""
+    global _FETCHER
+    if _FETCHER is None:
+        with _FETCHER_LOCK:
+            if _FETCHER is None:
+                _FETCHER = RatingFetcher()
+    return _FETCHER
+
+
+###################################################################################################
+# Main block
+###################################################################################################
+if __name__ == '__main__':
+    import doctest
+
+    doctest.testmod(verbose=True)
+
+    import python_ta
+
+    python_ta.check_all(config={
+        'max-line-length': 120,
+        'extra-imports': ['random', 'threading', 'time', 'concurrent.futures', 'urllib.parse', 'requests',
+                          'requests.adapters', 'rating_extractor']
+    })
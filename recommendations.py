@@ -0,0 +1,140 @@
+"""The restaurants recommended to a user in the current session.
+
+RecommendationStore (User.recommendations):
+    - holds each restaurant once, keyed by its row number in the dataset
+    - finds a restaurant by row number, or the restaurants with a name, without a scan
+    - is replaced by each new search (replace), and grows only as its results are paged in (extend)
+    - keeps at most max_entries restaurants, dropping the least recently added or used first
+"""
+from __future__ import annotations
+
+from collections import OrderedDict
+from typing import Any, Iterable, Iterator, Optional
+
+MAX_RECOMMENDATIONS = 1000
+
+
+class RecommendationStore:
+    """The recommended restaurants, as (restaurant, row number) pairs, least recently added or used
+    first.
+
+    Instance Attributes:
+        - max_entries: the most restaurants kept
+
+    Representation Invariants:
+        - self.max_entries > 0
+        - len(self._by_row) <= self.max_entries
+        - all(row in self._by_row for rows in self._by_name.values() for row in rows)
+
+    >>> from types import SimpleNamespace
+    >>> a, b, c = SimpleNamespace(name='A'), SimpleNamespace(name='B'), SimpleNamespace(name='C')
+    >>> store = RecommendationStore(max_entries=2)
+    >>> store.replace([(a, 1), (b, 2), (c, 3)])
+    >>> store.rows()
+    [1, 2]
+    >>> store.extend([(c, 3)])
+    >>> store.rows(), store.get(1), store.by_name('b') == [(b, 2)]
+    ([2, 3], None, True)
+    >>> store.add(a, 1)
+    >>> store.rows()
+    [2, 1]
+    """
+    # Private Instance Attributes:
+    #   - _by_row: each restaurant and its case-folded name, by row number, least recently added or used first
+    #   - _by_name: the row numbers of the restaurants with each case-folded name, as dict keys
+    max_entries: int
+    _by_row: OrderedDict[int, tuple[Any, str]]
+    _by_name: dict[str, dict[int, None]]
+
+    def __init__(self, max_entries: int = MAX_RECOMMENDATIONS) -> None:
+        """Initialize an empty store."""
+        self.max_entries = max_entries
+        self._by_row = OrderedDict()
+        self._by_name = {}
+
+    def __len__(self) -> int:
+        """Return the number of restaurants kept."""
+        return len(self._by_row)
+
+    def __iter__(self) -> Iterator[tuple[Any, int]]:
+        """Yield the (restaurant, row number) pairs, least recently added or used first."""
+        return ((restaurant, row) for row, (restaurant, _) in self._by_row.items())
+
+    def __contains__(self, row: int) -> bool:
+        """Return whether the restaurant in row is kept."""
+        return row in self._by_row
+
+    def rows(self) -> list[int]:
+        """Return the row numbers of the restaurants kept, least recently added or used first."""
+        return list(self._by_row)
+
+    def get(self, row: int) -> Optional[Any]:
+        """Return the restaurant in row, or None if it is not kept; it becomes the most recently used."""
+        entry = self._by_row.get(row)
+        if entry is None:
+            return None
+        self._by_row.move_to_end(row)
+        return entry[0]
+
+    def by_name(self, name: str) -> list[tuple[Any, int]]:
+        """Return the (restaurant, row number) pairs of the restaurants called name (ignoring case);
+        they become the most recently used."""
+        found = []
+        for row in self._by_name.get(name.casefold(), ()):
+            self._by_row.move_to_end(row)
+            found.append((self._by_row[row][0], row))
+        return found
+
+    def add(self, restaurant: Any, row: int) -> None:
+        """Keep the restaurant (which has a name attribute) in row as the most recently used,
+        dropping the least recently used restaurant if there are too many."""
+        name = restaurant.name.casefold()
+        if row in self._by_row:
+            self._drop(row)
+        self._by_row[row] = (restaurant, name)
+        self._by_name.setdefault(name, {})[row] = None
+        while len(self._by_row) > self.max_entries:
+            self._drop(next(iter(self._by_row)))
+
+    def extend(self, recommendations: Iterable[tuple[Any, int]]) -> None:
+        """Keep more recommended (restaurant, row number) pairs, e.g. the next page of a search."""
+        for restaurant, row in recommendations:
+            self.add(restaurant, row)
+
+    def replace(self, recommendations: Iterable[tuple[Any, int]]) -> None:
+        """Replace the recommendations with those of a new search, best first; only the first
+        max_entries of them are kept."""
+        self.clear()
+        for restaurant, row in recommendations:
+            if len(self._by_row) >= self.max_entries:
+                break
+            self.add(restaurant, row)
+
+    def clear(self) -> None:
+        """Forget every recommendation."""
+        self._by_row.clear()
+        self._by_name.clear()
+
+    def _drop(self, row: int) -> None:
+        """Forget the restaurant in row."""
+        _, name = self._by_row.pop(row)
+        rows = self._by_name[name]
+        del rows[row]
+        if not rows:
+            del self._by_name[name]
+
+
+###################################################################################################
+# Main block
+###################################################################################################
+if __name__ == '__main__':
+    import doctest
+
+    doctest.testmod(verbose=True)
+
+    import python_ta
+
+    python_ta.check_all(config={
+        'max-line-length': 120,
+        'extra-imports': ['collections']
+    })
@@ -0,0 +1,253 @@
+"""Struct-of-arrays store of the restaurant dataset, with lightweight row views.
+
+Instead of one Restaurant object (with its own __dict__ and tuples) per row per search, the
+dataset is held once as columns:
+    - latitude/longitude as float arrays
+    - cuisine and price range as small integer codes into a list of their distinct values
+    - names, addresses, phone numbers, websites and Yelp urls as integer codes into tables of
+      interned strings
+
+A search result is then a list of RestaurantRow views, each only a reference to the table, a
+row number and the distance from the user, exposing the same attributes as
+computations.Restaurant.
+"""
+from __future__ import annotations
+
+import math
+import sys
+from typing import Any, Iterable, Optional
+
+import numpy as np
+
+from computations import DISTANCE_BUCKETS
+from distances import haversine_km
+
+_STRING_COLUMNS = {
+    'names': 'Restaurant Name',
+    'addresses': 'Restaurant Address',
+    'phones': 'Restaurant Phone',
+    'websites': 'Restaurant Website',
+    'yelp_urls': 'Restaurant Yelp URL',
+}
+
+
+class StringColumn:
+    """A column of strings stored as integer codes into a table of distinct, interned strings.
+
+    Instance Attributes:
+        - codes: the table index of each row's value
+        - table: the distinct values of the column
+
+    Representation Invariants:
+        - all(0 <= c < len(self.table) for c in self.codes)
+
+    >>> col = StringColumn.from_values(['a', 'b', 'a'])
+    >>> col[2], len(col.table)
+    ('a', 2)
+    """
+    codes: np.ndarray
+    table: list[str]
+
+    def __init__(self, codes: np.ndarray, table: list[str]) -> None:
+        """Initialize a new column from its codes and table."""
+        self.codes = codes
+        self.table = table
+
+    @classmethod
+    def from_values(cls, values: Iterable) -> StringColumn:
+        """Return a new column holding the given values."""
+        table = []
+        positions = {}
+        codes = []
+        for value in values:
+            value = str(value)
+            if value not in positions:
+                positions[value] = len(table)
+                table.append(sys.intern(value))
+            codes.append(positions[value])
+        dtype = np.int16 if len(table) < 2 ** 15 else np.int32
+        return cls(np.array(codes, dtype=dtype), table)
+
+    def __getitem__(self, row: int) -> str:
+        """Return the value stored in the given row."""
+        return self.table[self.codes[row]]
+
+    def __len__(self) -> int:
+        """Return the number of rows in this column."""
+        return len(self.codes)
+
+    def nbytes(self) -> int:
+        """Return the approximate memory used by this column in bytes."""
+        return self.codes.nbytes + sum(sys.getsizeof(s) for s in self.table) + sys.getsizeof(self.table)
+
+
+class RestaurantTable:
+    """Column store of the restaurants in the dataset.
+
+    Row i of the table is row i (by position) of the dataset it was built from.
+
+    Instance Attributes:
+        - latitudes: the latitude of each restaurant
+        - longitudes: the longitude of each restaurant
+        - cuisine_codes: the index of each restaurant's cuisine in self.cuisines
+        - cuisines: the distinct cuisines
+        - price_codes: the index of each restaurant's price range in self.price_ranges
+        - price_ranges: the distinct price ranges
+        - names, addresses, phones, websites, yelp_urls: the text columns
+        - star_ratings: the Yelp star rating of each restaurant: 0.0 until it is loaded, and NaN
+          if its Yelp page has no rating
+
+    Representation Invariants:
+        - all columns have the same length
+    """
+    latitudes: np.ndarray
+    longitudes: np.ndarray
+    cuisine_codes: np.ndarray
+    cuisines: list[str]
+    price_codes: np.ndarray
+    price_ranges: list[str]
+    names: StringColumn
+    addresses: StringColumn
+    phones: StringColumn
+    websites: StringColumn
+    yelp_urls: StringColumn
+    star_ratings: np.ndarray
+
+    def __init__(self, latitudes: np.ndarray, longitudes: np.ndarray, cuisines: StringColumn,
+                 price_ranges: StringColumn, text_columns: dict[str, StringColumn]) -> None:
+        """Initialize a new table from its columns. text_columns is keyed by attribute name."""
+        self.latitudes = np.ascontiguousarray(latitudes, dtype=np.float64)
+        self.longitudes = np.ascontiguousarray(longitudes, dtype=np.float64)
+        self.cuisine_codes = cuisines.codes.astype(np.int16)
+        self.cuisines = cuisines.table
+        self.price_codes = price_ranges.codes.astype(np.int8)
+        self.price_ranges = price_ranges.table
+        for attr in _STRING_COLUMNS:
+            setattr(self, attr, text_columns[attr])
+        self.star_ratings = np.zeros(len(self.latitudes), dtype=np.float64)
+
+    @classmethod
+    def from_frame(cls, df: Any) -> RestaurantTable:
+        """Return a new table holding the rows of the cleaned dataset df."""
+        return cls(latitudes=df['Restaurant Latitude'].to_numpy(dtype=float),
+                   longitudes=df['Restaurant Longitude'].to_numpy(dtype=float),
+                   cuisines=StringColumn.from_values(df['Category'].tolist()),
+                   price_ranges=StringColumn.from_values(df['Restaurant Price Range'].tolist()),
+                   text_columns={attr: StringColumn.from_values(df[column].tolist())
+                                 for attr, column in _STRING_COLUMNS.items()})
+
+    def __len__(self) -> int:
+        """Return the number of restaurants in this table."""
+        return len(self.latitudes)
+
+    def row(self, i: int, distance: float = 0.0, bucket: int = 0) -> RestaurantRow:
+        """Return a view of row i, at the given distance (and distance bucket code) from the user."""
+        return RestaurantRow(self, i, distance, bucket)
+
+    def rows(self, indices: Any, distances: Any, buckets: Any) -> list[RestaurantRow]:
+        """Return views of the given rows, with their distances and distance bucket codes."""
+        indices = np.asarray(indices).tolist()
+        return [RestaurantRow(self, i, d, b)
+                for i, d, b in zip(indices, np.asarray(distances).tolist(), np.asarray(buckets).tolist())]
+
+    def nbytes(self) -> int:
+        """Return the approximate memory used by this table in bytes."""
+        arrays = (self.latitudes, self.longitudes, self.cuisine_codes, self.price_codes, self.star_ratings)
+        return (sum(a.nbytes for a in arrays) + sum(getattr(self, attr).nbytes() for attr in _STRING_COLUMNS)
+                + sum(sys.getsizeof(s) for s in self.cuisines + self.price_ranges))
+
+
+class RestaurantRow:
+    """A view of one row of a RestaurantTable, with the attributes of computations.Restaurant.
+
+    The distance from the user belongs to the view (it depends on the search); everything else
+    is read from the table. Setting star_rating writes through to the table.
+    """
+    __slots__ = ('_table', '_row', '_km', '_bucket')
+    _table: RestaurantTable
+    _row: int
+    _km: float
+    _bucket: int
+
+    def __init__(self, table: RestaurantTable, row: int, km: float, bucket: int) -> None:
+        """Initialize a view of the given row of table."""
+        self._table = table
+        self._row = row
+        self._km = km
+        self._bucket = bucket
+
+    def __repr__(self) -> str:
+        """Return a one-line representation of this row."""
+        return f'RestaurantRow({self._row}, {self.name!r})'
+
+    @property
+    def row_id(self) -> int:
+        """The position of this restaurant in the dataset."""
+        return self._row
+
+    @property
+    def name(self) -> str:
+        """The restaurant's name."""
+        return self._table.names[self._row]
+
+    @property
+    def cuisine(self) -> str:
+        """The restaurant's cuisine category."""
+        return self._table.cuisines[self._table.cuisine_codes[self._row]]
+
+    @property
+    def price_range(self) -> str:
+        """The restaurant's price range, e.g. '$11-30'."""
+        return self._table.price_ranges[self._table.price_codes[self._row]]
+
+    @property
+    def address(self) -> str:
+        """The restaurant's address."""
+        return self._table.addresses[self._row]
+
+    @property
+    def contact(self) -> tuple[str, str]:
+        """The restaurant's phone number and website."""
+        return self._table.phones[self._row], self._table.websites[self._row]
+
+    @property
+    def coordinates(self) -> tuple[float, float]:
+        """The restaurant's (latitude, longitude)."""
+        return float(self._table.latitudes[self._row]), float(self._table.longitudes[self._row])
+
+    @property
+    def distance(self) -> tuple[str, float]:
+        """The restaurant's distance bucket and distance from the user in km."""
+        return DISTANCE_BUCKETS[self._bucket], round(self._km, 4)
+
+    @property
+    def star_rating(self) -> Optional[float]:
+        """The restaurant's Yelp star rating (0.0 if not loaded, None if the page has none)."""
+        rating = float(self._table.star_ratings[self._row])
+        return None if math.isnan(rating) else rating
+
+    @star_rating.setter
+    def star_rating(self, rating: Optional[float]) -> None:
+        """Record the restaurant's Yelp star rating."""
+        self._table.star_ratings[self._row] = math.nan if rating is None else rating
+
+    def calculate_distance(self, user_lat: float, user_long: float) -> float:
+        """Calculate the distance between the user and the restaurant"""
+        return haversine_km(float(self._table.latitudes[self._row]), float(self._table.longitudes[self._row]),
+                            user_lat, user_long)
+
+
+###################################################################################################
+# Main block
+###################################################################################################
+if __name__ == '__main__':
+    import doctest
+
+    doctest.testmod(verbose=True)
+
+    import python_ta
+
+    python_ta.check_all(config={
+        'max-line-length': 120,
+        'extra-imports': ['math', 'sys', 'numpy', 'computations', 'distances']
+    })
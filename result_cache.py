@@ -0,0 +1,228 @@
+"""LRU cache of search results, keyed by the search criteria and the user's geohash cell.
+
+Users often repeat a search, or tweak it and come back, from the same address. The cache key is
+the normalised answers plus the geohash cell (about 150 m x 110 m in Toronto at the default
+precision) the user is in, so nearby repeats share an entry.
+
+A cell is not a point, so an entry cannot hold the exact results: a restaurant 1.02 km from one
+corner of the cell can be 0.98 km from another. Each entry instead holds every row that is in
+the distance bucket for *some* point of the cell (by the triangle inequality, the rows whose
+distance from the cell's centre is within the cell's radius of the bucket), already filtered by
+star rating. A search that could not load every star rating it filters on is not stored: the
+restaurants whose pages were too slow would otherwise stay hidden until the entry expired. On
+every lookup the exact distances of those rows from the user are recomputed, so
+rows near a bucket boundary are placed exactly and the results match an uncached search.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, NamedTuple, Optional
+
+import numpy as np
+
+_BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+
+GEOHASH_PRECISION = 7
+
+_CACHE = None
+_CACHE_LOCK = threading.Lock()
+
+
+def geohash(latitude: float, longitude: float, precision: int = GEOHASH_PRECISION) -> str:
+    """Return the geohash of (latitude, longitude) with the given number of characters.
+
+    >>> geohash(43.6532, -79.3832)
+    'dpz83df'
+    """
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, bits, value, even = [], 0, 0, True
+    while len(chars) < precision:
+        rng, x = (lon_range, longitude) if even else (lat_range, latitude)
+        mid = (rng[0] + rng[1]) / 2
+        if x >= mid:
+            value, rng[0] = value * 2 + 1, mid
+        else:
+            value, rng[1] = value * 2, mid
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(_BASE32[value])
+            bits, value = 0, 0
+    return ''.join(chars)
+
+
+def geohash_cell(cell: str) -> tuple[float, float, float, float]:
+    """Return (south, west, north, east), the bounds of a geohash cell.
+
+    >>> [round(x, 4) for x in geohash_cell('dpz83df')]
+    [43.6528, -79.3845, 43.6542, -79.3831]
+    """
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    even = True
+    for char in cell:
+        value = _BASE32.index(char)
+        for shift in range(4, -1, -1):
+            rng = lon_range if even else lat_range
+            mid = (rng[0] + rng[1]) / 2
+            if (value >> shift) & 1:
+                rng[0] = mid
+            else:
+                rng[1] = mid
+            even = not even
+    return lat_range[0], lon_range[0], lat_range[1], lon_range[1]
+
+
+def normalize_questions(questions: list) -> tuple:
+    """Return the answers in a canonical form: stripped and lower case, with the values of a
+    multiple-choice answer sorted.
+
+    >>> normalize_questions(['$11-30', 'Thai ', '1-5 km', ' 2 stars'])
+    ('$11-30', 'thai', '1-5 km', '2 stars')
+    >>> normalize_questions([['Under $10', '$11-30'], ['thai', 'Vietnamese'], '1-5 km', 'Any'])
+    (('$11-30', 'under $10'), ('thai', 'vietnamese'), '1-5 km', 'any')
+    """
+    def normalize(answer: str) -> str:
+        return ' '.join(answer.split()).casefold()
+
+    return tuple(normalize(q) if isinstance(q, str) else tuple(sorted(set(normalize(x) for x in q)))
+                 for q in questions)
+
+
+class CachedSearch(NamedTuple):
+    """A cache entry: the rows that can match the search from somewhere in the cell, in dataset
+    order, and when they were found.
+    """
+    rows: np.ndarray
+    created: float
+
+
+class SearchCache:
+    """A bounded, least recently used cache of search results.
+
+    Instance Attributes:
+        - max_entries: the most searches kept; the least recently used one is evicted beyond that
+        - ttl: seconds an entry stays valid (the star ratings it was filtered on are part of it)
+        - precision: the length of the geohash of the cells
+        - hits: lookups answered by the cache
+        - misses: lookups that were not in the cache, or had expired
+        - evictions: entries evicted to stay within max_entries
+
+    Representation Invariants:
+        - len(self._entries) <= self.max_entries
+    """
+    # Private Instance Attributes:
+    #   - _entries: the cached searches, least recently used first
+    #   - _lock: guards _entries and the counters
+    max_entries: int
+    ttl: float
+    precision: int
+    hits: int
+    misses: int
+    evictions: int
+    _entries: OrderedDict[tuple, CachedSearch]
+    _lock: threading.Lock
+
+    def __init__(self, max_entries: int = 256, ttl: float = 600.0, precision: int = GEOHASH_PRECISION) -> None:
+        """Initialize an empty cache."""
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.precision = precision
+        self.hits = self.misses = self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def rows(self, version: str, latitude: float, longitude: float, questions: list[str],
+             compute: Callable[[tuple[float, float], float], tuple[np.ndarray, bool]]) -> np.ndarray:
+        """Return the rows that can match questions from anywhere in the cell of (latitude, longitude),
+        for the dataset version.
+
+        On a miss they are computed by compute(centre of the cell, radius of the cell in km), which
+        must return, in dataset order, every row matching questions from a point at most that radius
+        from the centre, and whether they can be cached (False if they are incomplete, e.g. some
+        star ratings were not loaded in time).
+
+        >>> cache = SearchCache()
+        >>> cache.rows('v1', 43.65, -79.38, ['Any', 'Any', '1-5 km', '4 stars'],
+        ...            lambda centre, radius: (np.array([1, 2]), False)).tolist()
+        [1, 2]
+        >>> len(cache)
+        0
+        """
+        cell = geohash(latitude, longitude, self.precision)
+        key = (version, normalize_questions(questions), cell)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry.created <= self.ttl:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry.rows
+            self.misses += 1
+        south, west, north, east = geohash_cell(cell)
+        centre = ((south + north) / 2, (west + east) / 2)
+        from distances import haversine_km
+        radius = haversine_km(centre[0], centre[1], north, east) * (1 + 1e-9)
+        rows, cacheable = compute(centre, radius)
+        if not cacheable:
+            return rows
+        with self._lock:
+            self._entries[key] = CachedSearch(rows, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return rows
+
+    def __len__(self) -> int:
+        """Return the number of cached searches."""
+        return len(self._entries)
+
+    def hit_ratio(self) -> float:
+        """Return the fraction of lookups answered by the cache."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self) -> dict[str, float]:
+        """Return the cache's counters."""
+        return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+                'entries': len(self), 'hit_ratio': self.hit_ratio()}
+
+    def clear(self) -> None:
+        """Remove every entry and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+
+def get_search_cache() -> SearchCache:
+    """Return the process-wide search cache, creating it on first use."""
+    global _CACHE
+    if _CACHE is None:
+        with _CACHE_LOCK:
+            if _CACHE is None:
+                _CACHE = SearchCache()
+    return _CACHE
+
+
+def set_search_cache(cache: Optional[SearchCache]) -> None:
+    """Replace the process-wide search cache. With None, a new empty cache is created on next use."""
+    global _CACHE
+    with _CACHE_LOCK:
+        _CACHE = cache
+
+
+###################################################################################################
+# Main block
+###################################################################################################
+if __name__ == '__main__':
+    import doctest
+
+    doctest.testmod(verbose=True)
+
+    import python_ta
+
+    python_ta.check_all(config={
+        'max-line-length': 120,
+        'extra-imports': ['threading', 'time', 'collections', 'numpy', 'distances']
+    })
@@ -0,0 +1,187 @@
+"""Restaurant searches run on a background thread, for the GUI.
+
+Geocoding the user's address, searching and fetching Yelp star ratings can take seconds; done on
+the Tk thread they freeze every window. SearchWorker runs them on its own thread instead and
+reports back through a queue of SearchEvents, which the GUI drains from an after() callback:
+    - 'invalid': the address could not be found
+    - 'candidates': the restaurants matching everything but the star rating (a RankedResults),
+      sent before any star rating is loaded
+    - 'rating': (row number, rating) as each star rating is known
+    - 'done': the final (User, RankedResults)
+    - 'error': the exception that stopped the search
+
+Submitting a search cancels the one in progress; events of cancelled searches are dropped.
+"""
+from __future__ import annotations
+
+import queue
+import threading
+from typing import Any, Callable, NamedTuple, Optional
+
+import computations
+
+
+class SearchEvent(NamedTuple):
+    """Something that happened in search number job; see the module docstring for the kinds."""
+    job: int
+    kind: str
+    payload: Any
+
+
+class SearchJob:
+    """A search submitted to a SearchWorker.
+
+    Instance Attributes:
+        - number: the job's number; jobs are numbered in the order they are submitted
+        - location: the address the user entered
+        - answers: (cuisine, price, distance, star), as given to computations.get_user_info
+        - cancelled: set when the search is cancelled
+    """
+    number: int
+    location: str
+    answers: tuple
+    cancelled: threading.Event
+
+    def __init__(self, number: int, location: str, answers: tuple) -> None:
+        """Initialize a job that has not been cancelled."""
+        self.number = number
+        self.location = location
+        self.answers = answers
+        self.cancelled = threading.Event()
+
+
+class SearchWorker:
+    """Runs one search at a time on a background thread.
+
+    Instance Attributes:
+        - events: the events of the searches, in the order they happened
+
+    Representation Invariants:
+        - self._current is None or self._current.number == self._count
+    """
+    # Private Instance Attributes:
+    #   - _jobs: the jobs waiting for the worker thread (None stops it)
+    #   - _current: the latest job submitted
+    #   - _count: the number of jobs submitted so far
+    #   - _lock: guards _current and _count
+    #   - _thread: the worker thread
+    events: queue.Queue
+    _jobs: queue.Queue
+    _current: Optional[SearchJob]
+    _count: int
+    _lock: threading.Lock
+    _thread: threading.Thread
+
+    def __init__(self) -> None:
+        """Start the worker thread."""
+        self.events = queue.Queue()
+        self._jobs = queue.Queue()
+        self._current = None
+        self._count = 0
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name='search-worker', daemon=True)
+        self._thread.start()
+
+    def submit(self, location: str, cuisine: Any, price: Any, distance: str, star: str) -> SearchJob:
+        """Start a search, cancelling the one in progress (if any), and return its job."""
+        with self._lock:
+            if self._current is not None:
+                self._current.cancelled.set()
+            self._count += 1
+            job = SearchJob(self._count, location, (cuisine, price, distance, star))
+            self._current = job
+        self._jobs.put(job)
+        return job
+
+    def cancel(self) -> None:
+        """Cancel the search in progress, if any."""
+        with self._lock:
+            if self._current is not None:
+                self._current.cancelled.set()
+                self._current = None
+
+    def busy(self) -> bool:
+        """Return whether a search is in progress."""
+        with self._lock:
+            return self._current is not None
+
+    def poll(self, handle: Callable[[SearchEvent], None], max_events: int = 200) -> int:
+        """Call handle on each waiting event of the current search (up to max_events of them), in
+        order, dropping the events of cancelled searches. Return how many events were handled.
+
+        Meant to be called from the GUI thread.
+        """
+        handled = 0
+        while handled < max_events:
+            try:
+                event = self.events.get_nowait()
+            except queue.Empty:
+                break
+            with self._lock:
+                current = self._current
+                if current is None or event.job != current.number:
+                    continue
+                if event.kind in ('invalid', 'done', 'error'):
+                    self._current = None
+            handle(event)
+            handled += 1
+        return handled
+
+    def close(self) -> None:
+        """Cancel the search in progress and stop the worker thread."""
+        self.cancel()
+        self._jobs.put(None)
+
+    def _run(self) -> None:
+        """Run the submitted jobs, skipping those cancelled while they waited."""
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                return
+            if job.cancelled.is_set():
+                continue
+            try:
+                self._search(job)
+            except computations.SearchCancelled:
+                pass
+            except Exception as e:  # reported to the GUI rather than lost in the worker thread
+                self._post(job, 'error', e)
+
+    def _post(self, job: SearchJob, kind: str, payload: Any) -> None:
+        """Report an event of job, unless it has been cancelled."""
+        if not job.cancelled.is_set():
+            self.events.put(SearchEvent(job.number, kind, payload))
+
+    def _search(self, job: SearchJob) -> None:
+        """Run the search of job, reporting its progress."""
+        import engine
+
+        user = computations.User()
+        cuisine, price, distance, star = job.answers
+        if computations.get_user_info(user, location=job.location, cuisine=cuisine, price=price,
+                                      distance=distance, star=star):
+            self._post(job, 'invalid', job.location)
+            return
+        if job.cancelled.is_set():
+            raise computations.SearchCancelled()
+        if user.questions[3] != 'Any':
+            self._post(job, 'candidates', engine.get_engine().ranked(user.latitude, user.longitude, user.questions))
+        results = computations.search_restaurants(user, on_rating=lambda row, rating: self._post(
+            job, 'rating', (row, rating)), cancel=job.cancelled)
+        self._post(job, 'done', (user, results))
+
+
+###################################################################################################
+# Main block
+###################################################################################################
+if __name__ == '__main__':
+    import doctest
+
+    doctest.testmod(verbose=True)
+
+    import python_ta
+
+    python_ta.check_all(config={
+        'max-line-length': 120,
+        'extra-imports': ['queue', 'threading', 'computations', 'engine']
+    })
@@ -0,0 +1,287 @@
+"""A local HTTP service answering restaurant searches, for other programs on this machine.
+
+Endpoints (GET, answered with JSON):
+    - /search: the query string holds the criteria of a cli.py query (address, or latitude and
+      longitude; cuisine; price; distance; star; limit; sort); the answer is cli.py's record, with
+      the star ratings it loaded
+    - /details?row=N[&latitude=..&longitude=..][&rating=1]: everything about one restaurant (by
+      the row number that /search gives), its distance from the given point and, with rating=1,
+      its Yelp star rating (fetched unless it is in the rating cache)
+    - /lookup?q=..[&field=address][&limit=N]: the restaurant names (or addresses) closest to q,
+      forgiving typos (see name_index.py), with the rows of the restaurants that have them
+    - /health: 'ok' and the dataset version
+
+Every request is answered from its own arguments; nothing is kept between requests but the
+dataset, the engine and the caches (star ratings go in the answer, never in the dataset), so any
+worker can answer any request. Bad arguments are answered with status 400. The dataset and the
+engine's indexes are loaded once, before the listening socket is handed to the worker processes
+(os.fork), so they all read the same copy of the arrays, shared copy-on-write by the operating
+system. Where there is no fork (Windows), a single process answers every request.
+
+The service only listens on a loopback address (127.0.0.1, ::1 or localhost).
+
+Run with:
+    python service.py --port 8080 [--workers 4]
+(without arguments, it runs its doctests and python_ta instead).
+"""
+from __future__ import annotations
+
+import argparse
+import ipaddress
+import json
+import math
+import os
+import signal
+import sys
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Optional
+from urllib.parse import parse_qs, urlsplit
+
+import cli
+import computations
+import ranking
+
+SEARCH_KEYS = ('address', 'latitude', 'longitude', 'cuisine', 'price', 'distance', 'star', 'limit', 'sort', 'id')
+
+
+class ServiceError(Exception):
+    """Raised for a request that cannot be answered; status is its HTTP status code."""
+    status: int
+
+    def __init__(self, status: int, message: str) -> None:
+        """Initialize the error with its HTTP status code and message."""
+        super().__init__(message)
+        self.status = status
+
+
+def check_local(host: str) -> None:
+    """Raise ValueError if host is not a loopback address.
+
+    >>> check_local('127.0.0.1')
+    >>> check_local('0.0.0.0')
+    Traceback (most recent call last):
+    ValueError: the service only listens on loopback addresses, not '0.0.0.0'
+    """
+    if host == 'localhost':
+        return
+    try:
+        local = ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        local = False
+    if not local:
+        raise ValueError(f'the service only listens on loopback addresses, not {host!r}')
+
+
+def search(params: dict[str, str]) -> dict[str, Any]:
+    """Answer /search."""
+    query = {**cli.DEFAULTS, **{key: params[key] for key in SEARCH_KEYS if key in params}}
+    if not query.get('address') and ('latitude' not in query or 'longitude' not in query):
+        raise ServiceError(400, 'give address, or latitude and longitude')
+    for key in ('latitude', 'longitude'):
+        if key in query:
+            _number(query, key, float)
+    _number(query, 'limit', int)
+    if query['distance'] not in computations.DISTANCE_BUCKETS:
+        raise ServiceError(400, f'distance is one of {", ".join(computations.DISTANCE_BUCKETS)}')
+    if query['star'] != 'Any' and query['star'].strip()[:1] not in ('1', '2', '3', '4', '5'):
+        raise ServiceError(400, "star is 'Any' or a rating such as '4 stars'")
+    if query['sort'] not in ranking.SORT_COLUMNS:
+        raise ServiceError(400, f'sort is one of {", ".join(ranking.SORT_COLUMNS)}')
+    return _answer(cli.run_query(query))
+
+
+def details(params: dict[str, str]) -> dict[str, Any]:
+    """Answer /details."""
+    from distances import haversine_km
+
+    table = computations.get_restaurant_table()
+    try:
+        row = int(params['row'])
+    except (KeyError, ValueError):
+        raise ServiceError(400, 'give the row number of a restaurant') from None
+    if not 0 <= row < len(table):
+        raise ServiceError(404, f'no restaurant in row {row}')
+    restaurant = table.row(row)
+    if 'latitude' in params and 'longitude' in params:
+        latitude, longitude = restaurant.coordinates
+        km = haversine_km(latitude, longitude, _number(params, 'latitude', float), _number(params, 'longitude', float))
+        restaurant = table.row(row, km, int(computations.get_distance_buckets([km])[0]))
+    rating = 0.0
+    if params.get('rating') == '1':
+        rating = computations.get_star_ratings([table.yelp_urls[row]])[0] or 0.0
+    record = cli.restaurant_record(restaurant, row, rating)
+    if 'latitude' not in params or 'longitude' not in params:
+        del record['distance_km']
+    phone, website = restaurant.contact
+    latitude, longitude = restaurant.coordinates
+    record.update(phone=phone, website=website, yelp_url=table.yelp_urls[row], latitude=latitude,
+                  longitude=longitude)
+    return record
+
+
+def lookup(params: dict[str, str]) -> dict[str, Any]:
+    """Answer /lookup."""
+    if not params.get('q'):
+        raise ServiceError(400, 'give the name to look up as q')
+    if params.get('field', 'name') not in ('name', 'address'):
+        raise ServiceError(400, 'field is name or address')
+    limit = _number(params, 'limit', int) if 'limit' in params else cli.DEFAULTS['limit']
+    return _answer(cli.run_lookup({'lookup': params['q'], 'field': params.get('field', 'name'), 'limit': limit}))
+
+
+def health(_params: dict[str, str]) -> dict[str, Any]:
+    """Answer /health."""
+    return {'status': 'ok', 'version': computations.get_data_version(), 'pid': os.getpid()}
+
+
+def _number(params: dict[str, Any], key: str, kind: type) -> Any:
+    """Return params[key] as a number of the given kind (int or float), raising a ServiceError with
+    status 400 if it is not one (or is a negative int).
+
+    >>> _number({'limit': '5'}, 'limit', int)
+    5
+    >>> try:
+    ...     _number({'latitude': 'north'}, 'latitude', float)
+    ... except ServiceError as e:
+    ...     print(e.status, e)
+    400 latitude must be a number
+    """
+    try:
+        value = kind(params[key])
+    except (TypeError, ValueError):
+        raise ServiceError(400, f'{key} must be a number') from None
+    if kind is int and value < 0:
+        raise ServiceError(400, f'{key} must not be negative')
+    if kind is float and not math.isfinite(value):
+        raise ServiceError(400, f'{key} must be a number')
+    return value
+
+
+def _answer(record: dict[str, Any]) -> dict[str, Any]:
+    """Return a cli.py record, or raise a ServiceError if it is not a successful one: with status
+    400 if its address could not be found, and 500 if answering it failed."""
+    if record['status'] == 'invalid':
+        raise ServiceError(400, 'the address could not be found')
+    if record['status'] == 'error':
+        raise ServiceError(500, record['error'])
+    return record
+
+
+ROUTES = {'/search': search, '/details': details, '/lookup': lookup, '/health': health}
+
+
+class RequestHandler(BaseHTTPRequestHandler):
+    """Answers the requests of one connection (kept open between requests, as HTTP/1.1 allows)."""
+    protocol_version = 'HTTP/1.1'
+    quiet = True
+
+    def do_GET(self) -> None:
+        """Answer a GET request."""
+        url = urlsplit(self.path)
+        route = ROUTES.get(url.path)
+        params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        try:
+            if route is None:
+                raise ServiceError(404, f'no such endpoint: {url.path}')
+            self.send_json(200, route(params))
+        except ServiceError as e:
+            self.send_json(e.status, {'error': str(e)})
+        except Exception as e:  # reported to the client rather than dropping the connection
+            self.send_json(500, {'error': f'{type(e).__name__}: {e}'})
+
+    def send_json(self, status: int, body: Any) -> None:
+        """Send body as the JSON answer, with the given status."""
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        """Log requests only when the service is not quiet."""
+        if not self.quiet:
+            super().log_message(format, *args)
+
+
+def serve(host: str = '127.0.0.1', port: int = 8080, workers: int = 1, quiet: bool = True) -> None:
+    """Load the dataset and the engine, then answer requests on host:port with the given number
+    of worker processes until interrupted."""
+    import engine
+    from gazetteer import get_gazetteer
+    from name_index import get_name_index
+
+    check_local(host)
+    engine.get_engine()
+    get_gazetteer()
+    get_name_index()
+    RequestHandler.quiet = quiet
+    server = ThreadingHTTPServer((host, port), RequestHandler)
+    server.daemon_threads = True
+    print(f'listening on http://{host}:{server.server_address[1]} with {workers} worker(s)', flush=True)
+
+    if workers <= 1 or not hasattr(os, 'fork'):
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        server.server_close()
+        return
+
+    children = []
+    for _ in range(workers):
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            try:
+                server.serve_forever()
+            finally:
+                os._exit(0)
+        children.append(pid)
+    server.server_close()
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    try:
+        for pid in children:
+            os.waitpid(pid, 0)
+    except (KeyboardInterrupt, SystemExit):
+        pass
+    finally:
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    """Run the service with the command-line arguments."""
+    parser = argparse.ArgumentParser(description='Answer restaurant searches over HTTP, on this machine only.')
+    parser.add_argument('--host', default='127.0.0.1', help='a loopback address to listen on')
+    parser.add_argument('--port', type=int, default=8080, help='the port to listen on (0 for any free port)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='the number of worker processes')
+    parser.add_argument('--verbose', action='store_true', help='log every request')
+    args = parser.parse_args(argv)
+    serve(args.host, args.port, args.workers, quiet=not args.verbose)
+
+
+###################################################################################################
+# Main block
+###################################################################################################
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        main()
+        sys.exit()
+
+    import doctest
+
+    doctest.testmod(verbose=True)
+
+    import python_ta
+
+    python_ta.check_all(config={
+        'max-line-length': 120,
+        'extra-imports': ['argparse', 'ipaddress', 'json', 'math', 'os', 'signal', 'sys', 'http.server', 'urllib.parse',
+                          'cli', 'computations', 'distances', 'engine', 'gazetteer', 'name_index', 'ranking'],
+        'allowed-io': ['serve']
+    })
@@ -0,0 +1,202 @@
+"""Binary columnar snapshot of the cleaned restaurant dataset.
+
+Parsing trt_rest.csv (multi-line quoted addresses) and cleaning it is the slowest part of
+starting the program, so the cleaned frame is written to a snapshot file next to the CSV.
+The snapshot stores every column as a typed array: float/int columns are raw little-endian
+arrays and text columns are a string table (each distinct value stored once) plus an array
+of integer codes into that table.
+
+The snapshot is keyed by a SHA-256 hash of the source CSV, so editing the CSV invalidates it
+and the next start falls back to the CSV path and rebuilds the snapshot automatically.
+
+File layout:
+    MAGIC (8 bytes) | header length (uint32) | JSON header | column blocks
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import struct
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+MAGIC = b'TRTSNAP1'
+FORMAT_VERSION = 1
+DEDUP_COLUMNS = ['Restaurant Address', 'Category']
+
+
+def clean_data(raw: pd.DataFrame) -> pd.DataFrame:
+    """Return the cleaned dataset used by the restaurant finder.
+
+    Rows with any missing value are dropped, as well as repeated (address, category) pairs.
+    """
+    return raw.dropna().drop_duplicates(subset=DEDUP_COLUMNS, keep='first')
+
+
+def snapshot_path_for(csv_path: str) -> str:
+    """Return the snapshot path used for the given csv file.
+
+    >>> snapshot_path_for('trt_rest.csv')
+    'trt_rest.snap'
+    """
+    return os.path.splitext(csv_path)[0] + '.snap'
+
+
+def file_digest(path: str) -> str:
+    """Return the hex SHA-256 digest of the file at path."""
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _encode_strings(values: np.ndarray) -> tuple[np.ndarray, bytes, np.ndarray]:
+    """Encode an object array of strings as (codes, utf-8 blob, offsets).
+
+    Missing values get the code -1.
+    """
+    codes, uniques = pd.factorize(values, use_na_sentinel=True)
+    encoded = [str(u).encode('utf-8') for u in uniques]
+    offsets = np.zeros(len(encoded) + 1, dtype='<u8')
+    offsets[1:] = np.cumsum([len(e) for e in encoded], dtype=np.uint64)
+    code_dtype = '<i2' if len(encoded) < 2 ** 15 else '<i4'
+    return codes.astype(code_dtype), b''.join(encoded), offsets
+
+
+def _decode_strings(codes: np.ndarray, blob: bytes, offsets: np.ndarray) -> np.ndarray:
+    """Inverse of _encode_strings, returning an object array."""
+    bounds = offsets.tolist()
+    table = np.empty(len(bounds), dtype=object)
+    table[:-1] = [blob[bounds[i]:bounds[i + 1]].decode('utf-8') for i in range(len(bounds) - 1)]
+    table[-1] = np.nan  # code -1 indexes the last slot
+    return table[codes]
+
+
+def write_snapshot(df: pd.DataFrame, path: str, source_digest: str) -> None:
+    """Write df to path as a columnar snapshot tagged with source_digest.
+
+    The file is written to a temporary name first and moved into place, so a reader never
+    sees a half-written snapshot.
+    """
+    columns = []
+    blocks = []
+    offset = 0
+
+    def add_block(data: bytes) -> dict:
+        nonlocal offset
+        block = {'offset': offset, 'nbytes': len(data)}
+        blocks.append(data)
+        offset += len(data)
+        return block
+
+    index = df.index.to_numpy()
+    index_block = add_block(index.astype('<i8').tobytes())
+    for name in df.columns:
+        values = df[name].to_numpy()
+        if values.dtype.kind in 'fi':
+            kind = 'float64' if values.dtype.kind == 'f' else 'int64'
+            columns.append({'name': name, 'kind': kind,
+                            'data': add_block(values.astype('<f8' if kind == 'float64' else '<i8').tobytes())})
+        else:
+            codes, blob, offsets = _encode_strings(values)
+            columns.append({'name': name, 'kind': 'str', 'code_dtype': codes.dtype.str,
+                            'data': add_block(codes.tobytes()),
+                            'table': add_block(blob),
+                            'offsets': add_block(offsets.tobytes())})
+
+    header = json.dumps({'version': FORMAT_VERSION, 'source_sha256': source_digest, 'rows': len(df),
+                         'index': index_block, 'columns': columns}).encode('utf-8')
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(struct.pack('<I', len(header)))
+        f.write(header)
+        for block in blocks:
+            f.write(block)
+    os.replace(tmp_path, path)
+
+
+def read_snapshot(path: str, source_digest: Optional[str] = None) -> Optional[pd.DataFrame]:
+    """Return the frame stored at path, or None if it is missing, corrupt, or stale.
+
+    The snapshot is stale when source_digest is given and does not match the digest the
+    snapshot was written with.
+    """
+    try:
+        with open(path, 'rb') as f:
+            raw = f.read()
+    except OSError:
+        return None
+    if raw[:len(MAGIC)] != MAGIC:
+        return None
+    try:
+        (header_len,) = struct.unpack_from('<I', raw, len(MAGIC))
+        start = len(MAGIC) + 4
+        header = json.loads(raw[start:start + header_len].decode('utf-8'))
+        if header['version'] != FORMAT_VERSION:
+            return None
+        if source_digest is not None and header['source_sha256'] != source_digest:
+            return None
+        body = memoryview(raw)[start + header_len:]
+
+        def block(info: dict) -> memoryview:
+            return body[info['offset']:info['offset'] + info['nbytes']]
+
+        data = {}
+        for col in header['columns']:
+            if col['kind'] == 'str':
+                codes = np.frombuffer(block(col['data']), dtype=col['code_dtype'])
+                offsets = np.frombuffer(block(col['offsets']), dtype='<u8')
+                data[col['name']] = _decode_strings(codes, bytes(block(col['table'])), offsets)
+            else:
+                dtype = '<f8' if col['kind'] == 'float64' else '<i8'
+                data[col['name']] = np.frombuffer(block(col['data']), dtype=dtype).astype(col['kind'])
+        index = pd.Index(np.frombuffer(block(header['index']), dtype='<i8').astype('int64'))
+        return pd.DataFrame(data, index=index)
+    except (KeyError, ValueError, struct.error, UnicodeDecodeError):
+        return None
+
+
+def load_clean_data(csv_path: str = 'trt_rest.csv', snapshot_path: Optional[str] = None,
+                    digest: Optional[str] = None) -> pd.DataFrame:
+    """Return the cleaned dataset, using the snapshot when it matches the csv file.
+
+    On a cold start (no snapshot, or the csv changed) the csv is parsed and cleaned and the
+    snapshot is rebuilt. Failing to write the snapshot (e.g. a read-only directory) is not
+    an error; the next start just takes the csv path again.
+    """
+    if snapshot_path is None:
+        snapshot_path = snapshot_path_for(csv_path)
+    if digest is None:
+        digest = file_digest(csv_path)
+    df = read_snapshot(snapshot_path, digest)
+    if df is not None:
+        return df
+
+    df = clean_data(pd.read_csv(csv_path))
+    try:
+        write_snapshot(df, snapshot_path, digest)
+    except OSError:
+        pass
+    return df
+
+
+###################################################################################################
+# Main block
+###################################################################################################
+if __name__ == '__main__':
+    import doctest
+
+    doctest.testmod(verbose=True)
+
+    import python_ta
+
+    python_ta.check_all(config={
+        'max-line-length': 120,
+        'extra-imports': ['hashlib', 'json', 'os', 'struct', 'numpy', 'pandas'],
+        'allowed-io': ['file_digest', 'write_snapshot', 'read_snapshot']
+    })
@@ -0,0 +1,136 @@
+"""Grid spatial index over restaurant coordinates, for radius and nearest-neighbour queries.
+
+The map is cut into cells of a fixed size (in degrees, chosen so that each cell is at least
+cell_km across everywhere in the dataset). Rows are sorted by cell, so the rows of a run of
+adjacent cells in the same grid row are one contiguous slice, found with a binary search. A
+radius query only gathers the cells overlapping the circle's bounding box, then computes exact
+distances for the rows in them.
+"""
+from __future__ import annotations
+
+import math
+from typing import Optional
+
+import numpy as np
+
+import computations
+
+KM_PER_DEGREE = 6371 * math.pi / 180
+
+# Offset added to the x cell number so the combined (y, x) key stays non-negative
+_X_OFFSET = 1 << 31
+
+
+class SpatialIndex:
+    """A grid index over a set of points.
+
+    Instance Attributes:
+        - cell_km: the minimum width and height of a grid cell in km
+
+    Representation Invariants:
+        - self._keys is sorted
+        - sorted(self._order.tolist()) == list(range(len(self._order)))
+    """
+    # Private Instance Attributes:
+    #   - _lats, _lons: the coordinates of every point, by row
+    #   - _lat_step, _lon_step: the size of a cell in degrees
+    #   - _order: the rows sorted by cell key
+    #   - _keys: the cell key of each row in _order
+    cell_km: float
+    _lats: np.ndarray
+    _lons: np.ndarray
+    _lat_step: float
+    _lon_step: float
+    _order: np.ndarray
+    _keys: np.ndarray
+
+    def __init__(self, latitudes: np.ndarray, longitudes: np.ndarray, cell_km: float = 0.5) -> None:
+        """Build the index over the points (latitudes[i], longitudes[i])."""
+        self.cell_km = cell_km
+        self._lats = np.asarray(latitudes, dtype=np.float64)
+        self._lons = np.asarray(longitudes, dtype=np.float64)
+        max_lat = float(np.abs(self._lats).max()) if len(self._lats) else 0.0
+        self._lat_step = cell_km / KM_PER_DEGREE
+        self._lon_step = cell_km / (KM_PER_DEGREE * math.cos(math.radians(min(max_lat, 89.0))))
+        keys = self._cell_keys(self._lats, self._lons)
+        self._order = np.argsort(keys, kind='stable')
+        self._keys = keys[self._order]
+
+    def __len__(self) -> int:
+        """Return the number of points in this index."""
+        return len(self._lats)
+
+    def _cell_keys(self, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+        """Return the cell key of each point."""
+        y = np.floor(lats / self._lat_step).astype(np.int64)
+        x = np.floor(lons / self._lon_step).astype(np.int64)
+        return (y << 32) + (x + _X_OFFSET)
+
+    def _candidates(self, lat: float, lon: float, km: float) -> np.ndarray:
+        """Return the rows in the cells overlapping the bounding box of the circle of radius km
+        around (lat, lon). Falls back to every row when the box is too large to be worth it.
+        """
+        dlat = km / KM_PER_DEGREE
+        widest = min(abs(lat) + dlat, 89.0)
+        dlon = km / (KM_PER_DEGREE * math.cos(math.radians(widest)))
+        y0, y1 = math.floor((lat - dlat) / self._lat_step), math.floor((lat + dlat) / self._lat_step)
+        x0, x1 = math.floor((lon - dlon) / self._lon_step), math.floor((lon + dlon) / self._lon_step)
+        if (y1 - y0 + 1) > 4096 or (x1 - x0 + 1) * (y1 - y0 + 1) > len(self._keys):
+            return np.arange(len(self._lats))
+        ys = np.arange(y0, y1 + 1, dtype=np.int64) << 32
+        starts = np.searchsorted(self._keys, ys + (x0 + _X_OFFSET), side='left')
+        ends = np.searchsorted(self._keys, ys + (x1 + _X_OFFSET), side='right')
+        slices = [self._order[s:e] for s, e in zip(starts.tolist(), ends.tolist()) if e > s]
+        return np.concatenate(slices) if slices else np.empty(0, dtype=np.int64)
+
+    def within_radius(self, lat: float, lon: float, km: float,
+                      mask: Optional[np.ndarray] = None) -> tuple[np.ndarray, np.ndarray]:
+        """Return (rows, distances in km) of the points at most km away from (lat, lon), in
+        increasing row order. If mask is given, only rows where mask is True are returned.
+        """
+        rows = self._candidates(lat, lon, km)
+        if mask is not None:
+            rows = rows[mask[rows]]
+        rows.sort()
+        distances, _ = computations.get_distances_from_user(self._lats[rows], self._lons[rows], (lat, lon))
+        keep = distances <= km
+        return rows[keep], distances[keep]
+
+    def nearest(self, lat: float, lon: float, k: int,
+                filters: Optional[np.ndarray] = None) -> tuple[np.ndarray, np.ndarray]:
+        """Return (rows, distances in km) of the k points closest to (lat, lon), closest first.
+        If filters (a boolean mask over rows) is given, only rows where it is True are considered.
+
+        The search radius doubles until it holds k points, so only nearby cells are visited.
+        """
+        available = len(self._lats) if filters is None else int(np.count_nonzero(filters))
+        k = min(k, available)
+        if k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        km = self.cell_km
+        while True:
+            rows, distances = self.within_radius(lat, lon, km, filters)
+            if len(rows) >= k or km > 2 * math.pi * 6371:
+                break
+            km *= 2
+        if len(rows) > k:
+            top = np.argpartition(distances, k - 1)[:k]
+            rows, distances = rows[top], distances[top]
+        order = np.argsort(distances, kind='stable')
+        return rows[order], distances[order]
+
+
+###################################################################################################
+# Main block
+###################################################################################################
+if __name__ == '__main__':
+    import doctest
+
+    doctest.testmod(verbose=True)
+
+    import python_ta
+
+    python_ta.check_all(config={
+        'max-line-length': 120,
+        'extra-imports': ['math', 'numpy', 'computations']
+    })
@@ -0,0 +1,97 @@
+"""Measures how long the Tk event loop is stalled.
+
+StallMonitor asks the event loop to wake it every interval_ms milliseconds. When a callback (a
+button command, say) keeps the loop busy, the next tick is late; the lateness of every tick is
+the time the GUI could not redraw or react to input. Run the GUI with STALL_REPORT=1 in the
+environment to print a summary when the home window closes.
+"""
+from __future__ import annotations
+
+import time
+from typing import Any
+
+
+class StallMonitor:
+    """Records the stalls of an event loop.
+
+    Instance Attributes:
+        - interval_ms: how often the loop is asked to wake the monitor
+        - threshold_ms: lateness below which a tick is not counted as a stall
+        - stalls: the lateness, in ms, of every tick later than threshold_ms
+        - ticks: the number of ticks seen
+
+    Representation Invariants:
+        - self.interval_ms > 0
+        - all(s > self.threshold_ms for s in self.stalls)
+    """
+    # Private Instance Attributes:
+    #   - _widget: any Tk widget (or tkinter.Tcl() interpreter), used to schedule the ticks
+    #   - _expected: when the next tick is due, from time.perf_counter
+    #   - _after_id: the scheduled tick, or None when stopped
+    interval_ms: int
+    threshold_ms: float
+    stalls: list[float]
+    ticks: int
+    _widget: Any
+    _expected: float
+    _after_id: Any
+
+    def __init__(self, widget: Any, interval_ms: int = 20, threshold_ms: float = 50.0) -> None:
+        """Initialize a stopped monitor of widget's event loop."""
+        self.interval_ms = interval_ms
+        self.threshold_ms = threshold_ms
+        self.stalls = []
+        self.ticks = 0
+        self._widget = widget
+        self._expected = 0.0
+        self._after_id = None
+
+    def start(self) -> None:
+        """Start measuring."""
+        if self._after_id is None:
+            self._schedule()
+
+    def stop(self) -> None:
+        """Stop measuring."""
+        if self._after_id is not None:
+            self._widget.after_cancel(self._after_id)
+            self._after_id = None
+
+    def reset(self) -> None:
+        """Forget what has been measured so far."""
+        self.stalls = []
+        self.ticks = 0
+
+    def _schedule(self) -> None:
+        """Ask the event loop for the next tick."""
+        self._expected = time.perf_counter() + self.interval_ms / 1000
+        self._after_id = self._widget.after(self.interval_ms, self._tick)
+
+    def _tick(self) -> None:
+        """Record how late this tick is, and schedule the next one."""
+        late_ms = (time.perf_counter() - self._expected) * 1000
+        self.ticks += 1
+        if late_ms > self.threshold_ms:
+            self.stalls.append(late_ms)
+        self._schedule()
+
+    def summary(self) -> dict[str, float]:
+        """Return the number of stalls, the longest one and their total, in ms."""
+        return {'ticks': self.ticks, 'stalls': len(self.stalls), 'max_ms': max(self.stalls, default=0.0),
+                'total_ms': sum(self.stalls)}
+
+
+###################################################################################################
+# Main block
+###################################################################################################
+if __name__ == '__main__':
+    import doctest
+
+    doctest.testmod(verbose=True)
+
+    import python_ta
+
+    python_ta.check_all(config={
+        'max-line-length': 120,
+        'extra-imports': ['time']
+    })
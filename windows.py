@@ -0,0 +1,114 @@
+"""The windows of the GUI, all under one Tk root.
+
+WindowManager owns the one tk.Tk() of the program, so there is a single Tcl interpreter and a single
+mainloop(), and opens every other window as a tk.Toplevel of it:
+    - each window has a key; opening a key that is already open brings its window to the front
+      (or rebuilds its content, for dialogs whose content changes) instead of opening another one
+    - closing a window forgets it, so its widgets can be freed
+"""
+from __future__ import annotations
+
+import tkinter as tk
+from typing import Any, Callable, Optional
+
+
+class WindowManager:
+    """Opens and tracks the windows of the program.
+
+    Representation Invariants:
+        - every window in self._windows is a tk.Toplevel of self._root
+    """
+    # Private Instance Attributes:
+    #   - _root: the program's only tk.Tk, or None before it is first needed
+    #   - _windows: the open windows and their controllers (the objects managing their content), by key
+    _root: Optional[tk.Tk]
+    _windows: dict[Any, tuple[tk.Toplevel, Any]]
+
+    def __init__(self) -> None:
+        """Initialize a manager with no windows; the root is created on first use."""
+        self._root = None
+        self._windows = {}
+
+    @property
+    def root(self) -> tk.Tk:
+        """The program's main window."""
+        if self._root is None:
+            self._root = tk.Tk()
+        return self._root
+
+    def open(self, key: Any, title: str, geometry: str, build: Callable[[tk.Toplevel], Any],
+             rebuild: bool = False) -> Any:
+        """Open the window with the given key and return its controller.
+
+        If the window is not open, a new Toplevel is created and build(window) fills it in and
+        returns its controller. If it is open, it is brought to the front; with rebuild, its
+        content is cleared and built again first.
+        """
+        entry = self._windows.get(key)
+        if entry is not None and entry[0].winfo_exists():
+            window, controller = entry
+            if rebuild:
+                for child in window.winfo_children():
+                    child.destroy()
+                window.title(title)
+                controller = build(window)
+                self._windows[key] = (window, controller)
+            window.deiconify()
+            window.lift()
+            window.focus_set()
+            return controller
+        window = tk.Toplevel(self.root)
+        window.title(title)
+        if geometry:
+            window.geometry(geometry)
+        window.protocol('WM_DELETE_WINDOW', lambda: self.close(key))
+        self._windows[key] = (window, None)
+        controller = build(window)
+        self._windows[key] = (window, controller)
+        return controller
+
+    def get(self, key: Any) -> Optional[tk.Toplevel]:
+        """Return the open window with the given key, or None."""
+        entry = self._windows.get(key)
+        if entry is None or not entry[0].winfo_exists():
+            return None
+        return entry[0]
+
+    def is_open(self, key: Any) -> bool:
+        """Return whether the window with the given key is open."""
+        return self.get(key) is not None
+
+    def close(self, key: Any) -> None:
+        """Close the window with the given key, if it is open."""
+        entry = self._windows.pop(key, None)
+        if entry is not None and entry[0].winfo_exists():
+            entry[0].destroy()
+
+    def close_all(self) -> None:
+        """Close every window but the root."""
+        for key in list(self._windows):
+            self.close(key)
+
+    def __len__(self) -> int:
+        """Return the number of open windows, not counting the root."""
+        return sum(1 for key in list(self._windows) if self.is_open(key))
+
+    def mainloop(self) -> None:
+        """Run the event loop until the root is closed."""
+        self.root.mainloop()
+
+
+###################################################################################################
+# Main block
+###################################################################################################
+if __name__ == '__main__':
+    import doctest
+
+    doctest.testmod(verbose=True)
+
+    import python_ta
+
+    python_ta.check_all(config={
+        'max-line-length': 120,
+        'extra-imports': ['tkinter']
+    })